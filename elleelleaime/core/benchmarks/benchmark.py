@@ -7,10 +7,13 @@ class Benchmark(ABC):
     pass
 
 
+import math
 import pathlib
+import subprocess
 
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from elleelleaime.core.benchmarks.bug import Bug
+from elleelleaime.core.caching.manifest import Manifest
 
 
 class Benchmark(ABC):
@@ -18,10 +21,17 @@ class Benchmark(ABC):
     The abstract class for representing a benchmark.
     """
 
+    # Timeouts (in seconds) used when no baseline was recorded for a bug
+    DEFAULT_TIMEOUTS: Dict[str, int] = {"compile": 5 * 60, "test": 30 * 60}
+    # Lower bound of the timeouts derived from baselines, to absorb noise in short runs
+    MIN_TIMEOUT: int = 60
+
     def __init__(self, identifier: str, path: pathlib.Path) -> None:
         self.identifier: str = identifier
         self.path: pathlib.Path = path.absolute()
         self.bugs: Dict[str, Bug] = dict()
+        self.manifests: Dict[str, Manifest] = dict()
+        self.timeout_multiplier: Optional[float] = 5.0
 
     def get_identifier(self) -> str:
         return self.identifier
@@ -32,16 +42,81 @@ class Benchmark(ABC):
     def get_bin(self, options: str = "") -> Optional[str]:
         return None
 
+    def get_revision(self) -> Optional[str]:
+        """
+        Returns the revision of the benchmark checkout, or None if it cannot be determined.
+        """
+        run = subprocess.run(
+            f"git -C {self.path} rev-parse HEAD",
+            shell=True,
+            capture_output=True,
+        )
+        if run.returncode != 0:
+            return None
+        return run.stdout.decode("utf-8").strip()
+
+    def get_manifest(self, name: str) -> Manifest:
+        """
+        Returns the on-disk manifest `name`, stored next to the benchmark and tied to its revision.
+        """
+        if name not in self.manifests:
+            self.manifests[name] = Manifest(
+                self.path.parent / f"{self.path.name}.{name}.json",
+                self.get_revision(),
+            )
+        return self.manifests[name]
+
+    def get_baseline(self, bug: Bug) -> Dict[str, float]:
+        """
+        Returns the durations (in seconds) of each phase ("compile", "test") recorded for the fixed version of the bug,
+        along with its peak memory ("max_rss", in bytes) when it was measured.
+        """
+        return (
+            self.get_manifest("baselines")
+            .get("baselines", {})
+            .get(bug.get_identifier(), {})
+        )
+
+    def set_baseline(self, bug: Bug, baseline: Dict[str, float]) -> None:
+        self.get_manifest("baselines").update(
+            "baselines", {bug.get_identifier(): baseline}
+        )
+
+    def get_timeout(self, bug: Bug, phase: str) -> int:
+        """
+        Returns the timeout (in seconds) of `phase` for the bug.
+        If a baseline was recorded, the timeout is `timeout_multiplier` times the baseline, bounded by the default timeout.
+        """
+        default = Benchmark.DEFAULT_TIMEOUTS[phase]
+        baseline = self.get_baseline(bug).get(phase)
+        if baseline is None or self.timeout_multiplier is None:
+            return default
+        return min(
+            default,
+            max(Benchmark.MIN_TIMEOUT, math.ceil(baseline * self.timeout_multiplier)),
+        )
+
     def get_bugs(self) -> List[Bug]:
         return sorted(list(self.bugs.values()))
 
     def get_bug(self, identifier) -> Optional[Bug]:
-        return self.bugs[identifier]
+        # Bugs that have not been loaded yet are materialized on demand
+        if identifier not in self.bugs:
+            self.load_bugs([identifier])
+        return self.bugs.get(identifier)
 
     def add_bug(self, bug: Bug) -> None:
         assert bug.get_identifier() not in self.bugs
         self.bugs[bug.get_identifier()] = bug
 
+    def load_bugs(self, identifiers: Iterable[str]) -> None:
+        """
+        Loads only the bugs with the given identifiers, skipping unknown ones.
+        Benchmarks that cannot load a subset of their bugs fall back to a full initialization.
+        """
+        if len(self.bugs) == 0:
+            self.initialize()
+
     @abstractmethod
     def initialize(self) -> None:
         pass
@@ -31,6 +31,12 @@ class Bug(ABC):
     def is_ground_truth_inverted(self) -> bool:
         return self.ground_truth_inverted
 
+    def get_compile_timeout(self) -> int:
+        return self.benchmark.get_timeout(self, "compile")
+
+    def get_test_timeout(self) -> int:
+        return self.benchmark.get_timeout(self, "test")
+
     @abstractmethod
     def checkout(self, path: str, fixed: bool = False) -> bool:
         pass
@@ -1,14 +1,14 @@
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterable, Optional
 from io import StringIO
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from elleelleaime.core.benchmarks.benchmark import Benchmark
 from elleelleaime.core.benchmarks.defects4j.defects4jbug import Defects4JBug
 
 import subprocess
 import logging
 import tqdm
-import os
-import pandas as pd
+import csv
 
 
 class Defects4J(Benchmark):
@@ -25,9 +25,69 @@ class Defects4J(Benchmark):
     def initialize(self) -> None:
         """
         Initializes the Defects4J benchmark object by collecting the list of all projects and bugs.
+        The collected metadata is stored in a manifest tied to the revision of the Defects4J checkout.
         """
         logging.info("Initializing Defects4J benchmark...")
 
+        manifest = self.get_manifest("manifest")
+        bugs = manifest.get("bugs")
+        if bugs is None:
+            bugs = self.collect_bugs()
+            manifest.set("bugs", bugs)
+        else:
+            logging.info("Loaded %3d bugs from %s" % (len(bugs), manifest.path))
+
+        self.add_bugs(bugs)
+
+    def load_bugs(self, identifiers: Iterable[str]) -> None:
+        """
+        Loads only the bugs with the given identifiers.
+        Without an up-to-date manifest, only the projects of those bugs are queried.
+        """
+        identifiers = [
+            identifier for identifier in identifiers if identifier not in self.bugs
+        ]
+        if len(identifiers) == 0:
+            return
+
+        bugs = self.get_manifest("manifest").get("bugs")
+        if bugs is None:
+            pids = {identifier.rsplit("-", 1)[0] for identifier in identifiers}
+            bugs = {}
+            with ThreadPoolExecutor(max_workers=len(pids)) as executor:
+                for project_bugs in executor.map(self.collect_project_bugs, pids):
+                    bugs.update(project_bugs)
+
+        self.add_bugs(
+            {
+                identifier: bugs[identifier]
+                for identifier in identifiers
+                if identifier in bugs
+            }
+        )
+
+    def add_bugs(self, bugs: Dict[str, dict]) -> None:
+        """
+        Adds the bugs described by the collected metadata, skipping the ones already loaded.
+        """
+        for identifier, info in bugs.items():
+            if identifier in self.bugs:
+                continue
+            self.add_bug(
+                Defects4JBug(
+                    self,
+                    info["pid"],
+                    info["bid"],
+                    info["ground_truth"],
+                    info["failing_tests"],
+                )
+            )
+
+    def collect_bugs(self) -> Dict[str, dict]:
+        """
+        Collects the metadata of all bugs by querying the Defects4J framework.
+        Projects are queried concurrently.
+        """
         # Get all project ids
         run = subprocess.run(
             f"{self.get_bin()} pids",
@@ -35,54 +95,107 @@ class Defects4J(Benchmark):
             capture_output=True,
             check=True,
         )
-        pids = {pid.decode("utf-8") for pid in run.stdout.split()}
+        pids = sorted(pid.decode("utf-8") for pid in run.stdout.split())
         logging.info("Found %3d projects" % len(pids))
 
-        # Get all bug ids for all pids
         bugs = {}
-        for pid in tqdm.tqdm(pids):
-            run = subprocess.run(
-                f"{self.get_bin()} bids -p {pid}",
-                shell=True,
-                capture_output=True,
-                check=True,
+        with ThreadPoolExecutor(max_workers=len(pids)) as executor:
+            futures = [executor.submit(self.collect_project_bugs, pid) for pid in pids]
+            for future in tqdm.tqdm(as_completed(futures), total=len(futures)):
+                bugs.update(future.result())
+
+        # Keep a stable order regardless of the order in which projects finish
+        return {identifier: bugs[identifier] for identifier in sorted(bugs)}
+
+    def collect_project_bugs(self, pid: str) -> Dict[str, dict]:
+        """
+        Collects the metadata of all bugs of project `pid`.
+        """
+        # Get all bug ids
+        run = subprocess.run(
+            f"{self.get_bin()} bids -p {pid}",
+            shell=True,
+            capture_output=True,
+            check=True,
+        )
+        bids = {int(bid.decode("utf-8")) for bid in run.stdout.split()}
+        logging.info("Found %3d bugs for project %s" % (len(bids), pid))
+
+        # Extract failing test and trigger cause, indexing the rows by bug id in a single pass
+        run = subprocess.run(
+            f"{self.get_bin()} query -p {pid} -q 'tests.trigger,tests.trigger.cause'",
+            shell=True,
+            capture_output=True,
+            check=True,
+        )
+        rows = {
+            int(row[0]): row[1:]
+            for row in csv.reader(StringIO(run.stdout.decode("utf-8")))
+            if row
+        }
+
+        bugs = {}
+        for bid in bids:
+            # Extract ground truth diff
+            diff_path = Path(
+                self.path, "framework", "projects", pid, "patches", f"{bid}.src.patch"
             )
-            bugs[pid] = {int(bid.decode("utf-8")) for bid in run.stdout.split()}
-            logging.info("Found %3d bugs for project %s" % (len(bugs[pid]), pid))
+            with open(diff_path, "r", encoding="ISO-8859-1") as diff_file:
+                diff = diff_file.read()
+
+            # Extract failing test cases and trigger causes
+            failing_test_cases, trigger_cause = rows[bid]
+
+            bugs[f"{pid}-{bid}"] = {
+                "pid": pid,
+                "bid": bid,
+                "ground_truth": diff,
+                "failing_tests": self.parse_failing_tests(
+                    failing_test_cases, trigger_cause
+                ),
+            }
 
-        # Initialize dataset
-        for pid in pids:
-            # Extract failing test and trigger cause
+        return bugs
+
+    @staticmethod
+    def parse_failing_tests(failing_test_cases: str, trigger_cause: str) -> dict:
+        """
+        Maps each failing test case to its trigger cause.
+        """
+        failing_tests = {}
+        for failing_test_case in failing_test_cases.split(";"):
+            cause = trigger_cause.split(f"{failing_test_case} --> ")[1]
+            # The trigger cause list elements are separated by ";" but sometimes this char is also included in the element itself and is not espaced
+            # To avoid this we check if there are more any remaining elements and remove them from the string.
+            if " --> " in cause:
+                while " --> " in cause:
+                    cause = cause.split(" --> ")[1]
+                for test in failing_test_case.split(";"):
+                    if test in cause:
+                        cause = cause.replace(test, "")
+            failing_tests[failing_test_case] = cause.strip()
+        return failing_tests
+
+    def export_property(self, bug: Defects4JBug, path: str, name: str) -> str:
+        """
+        Returns the exported property `name` of the checkout at `path`.
+        Exported values are recorded in the properties manifest, so each one is only computed once.
+        """
+        # The exported value depends on the checked-out version (buggy or fixed)
+        with open(Path(path, ".defects4j.config"), "r") as f:
+            config = dict(line.strip().split("=", 1) for line in f if "=" in line)
+        key = f"{bug.get_identifier()}/{config.get('vid', '')}/{name}"
+
+        manifest = self.get_manifest("properties")
+        value = manifest.get("values", {}).get(key)
+        if value is None:
             run = subprocess.run(
-                f"{self.get_bin()} query -p {pid} -q 'tests.trigger,tests.trigger.cause'",
+                f"cd {path} && {self.get_bin()} export -p {name}",
                 shell=True,
                 capture_output=True,
                 check=True,
             )
-            data = run.stdout.decode("utf-8")
-            df = pd.read_csv(StringIO(data), sep=",", names=["bid", "tests", "errors"])
-
-            for bid in bugs[pid]:
-                # Extract ground truth diff
-                diff_path = f"benchmarks/defects4j/framework/projects/{pid}/patches/{bid}.src.patch"
-                with open(diff_path, "r", encoding="ISO-8859-1") as diff_file:
-                    diff = diff_file.read()
-
-                # Extract failing test cases and trigger causes
-                failing_test_cases = df[df["bid"] == bid]["tests"].values[0]
-                trigger_cause = df[df["bid"] == bid]["errors"].values[0]
-
-                failing_tests = {}
-                for failing_test_case in failing_test_cases.split(";"):
-                    cause = trigger_cause.split(f"{failing_test_case} --> ")[1]
-                    # The trigger cause list elements are separated by ";" but sometimes this char is also included in the element itself and is not espaced
-                    # To avoid this we check if there are more any remaining elements and remove them from the string.
-                    if " --> " in cause:
-                        while " --> " in cause:
-                            cause = cause.split(" --> ")[1]
-                        for test in failing_test_case.split(";"):
-                            if test in cause:
-                                cause = cause.replace(test, "")
-                    failing_tests[failing_test_case] = cause.strip()
-
-                self.add_bug(Defects4JBug(self, pid, bid, diff, failing_tests))
+            value = run.stdout.decode("utf-8").strip()
+            manifest.update("values", {key: value})
+
+        return value
@@ -1,5 +1,5 @@
-import subprocess
 import shutil
+import shlex
 import re
 import os
 
@@ -7,6 +7,8 @@ from elleelleaime.core.benchmarks.benchmark import Benchmark
 from elleelleaime.core.benchmarks.bug import RichBug
 from elleelleaime.core.benchmarks.test_result import TestResult
 from elleelleaime.core.benchmarks.compile_result import CompileResult
+from elleelleaime.core.utils.files import normalize_line_endings
+from elleelleaime.core.utils import process
 
 
 class Defects4JBug(RichBug):
@@ -37,7 +39,7 @@ class Defects4JBug(RichBug):
         shutil.rmtree(path, ignore_errors=True)
 
         # Checkout the bug
-        checkout_run = subprocess.run(
+        checkout_run = process.run(
             f"{self.benchmark.get_bin()} checkout -p {self.pid} -v {self.bid}{'f' if fixed else 'b'} -w {path}",
             shell=True,
             capture_output=True,
@@ -45,52 +47,46 @@ class Defects4JBug(RichBug):
         )
 
         # Convert line endings to unix
-        dos2unix_run = subprocess.run(
-            f"find {path} -type f -print0 | xargs -0 -n 1 -P 4 dos2unix",
-            shell=True,
-            capture_output=True,
-            check=True,
-        )
+        normalize_line_endings(path)
 
-        return checkout_run.returncode == 0 and dos2unix_run.returncode == 0
+        return checkout_run.returncode == 0
 
     def compile(self, path: str) -> CompileResult:
-        run = subprocess.run(
-            f"cd {path} && timeout {5*60} {self.benchmark.get_bin()} compile",
+        run = process.run(
+            f"cd {path} && timeout {self.get_compile_timeout()} {self.benchmark.get_bin()} compile",
             shell=True,
             capture_output=True,
             check=False,
+            limited=True,
         )
         return CompileResult(run.returncode == 0)
 
-    def test(self, path: str) -> TestResult:
-        # First run only relevant tests
-        run = subprocess.run(
-            f"cd {path} && timeout {30*60} {self.benchmark.get_bin()} test -r",
+    def run_tests(self, path: str, options: str = "") -> bool:
+        """
+        Runs `defects4j test` with the given options, and returns whether all tests passed.
+        """
+        run = process.run(
+            f"cd {path} && timeout {self.get_test_timeout()} {self.benchmark.get_bin()} test {options}",
             shell=True,
             capture_output=True,
             check=False,
+            limited=True,
         )
         m = re.search(r"Failing tests: ([0-9]+)", run.stdout.decode("utf-8"))
-        if not (run.returncode == 0 and m != None and int(m.group(1)) == 0):
+        return run.returncode == 0 and m != None and int(m.group(1)) == 0
+
+    def test(self, path: str) -> TestResult:
+        # First run each trigger test, since most incorrect patches fail at least one of them
+        for failing_test in self.get_failing_tests():
+            if not self.run_tests(path, f"-t {shlex.quote(failing_test)}"):
+                return TestResult(False)
+
+        # Then run the relevant tests
+        if not self.run_tests(path, "-r"):
             return TestResult(False)
 
         # Only run the whole test suite if the relevant tests pass
-        run = subprocess.run(
-            f"cd {path} && timeout {30*60} {self.benchmark.get_bin()} test",
-            shell=True,
-            capture_output=True,
-            check=False,
-        )
-        m = re.search(r"Failing tests: ([0-9]+)", run.stdout.decode("utf-8"))
-        return TestResult(run.returncode == 0 and m != None and int(m.group(1)) == 0)
+        return TestResult(self.run_tests(path))
 
     def get_src_test_dir(self, path: str) -> str:
-        run = subprocess.run(
-            f"cd {path} && {self.benchmark.get_bin()} export -p dir.src.tests",
-            shell=True,
-            capture_output=True,
-            check=True,
-        )
-
-        return run.stdout.decode("utf-8").strip()
+        return self.benchmark.export_property(self, path, "dir.src.tests")
@@ -0,0 +1,72 @@
+"""
+Exports the info of several GitBug-Java bugs from a single interpreter.
+
+This script runs inside the GitBug-Java virtualenv:
+
+    python export_info.py <gitbug-java path> <output file> [bid ...]
+
+It writes a JSON object mapping each bug id to the output of `gitbug-java info <bid>`.
+If no bug ids are given, all bugs are exported.
+"""
+
+import contextlib
+import inspect
+import json
+import runpy
+import sys
+import os
+import io
+
+
+def load_cli(root: str):
+    # Load the gitbug-java script as a module without triggering its entry point
+    sys.argv = [os.path.join(root, "gitbug-java")]
+    try:
+        module = runpy.run_path(sys.argv[0], run_name="gitbug_java")
+    except SystemExit:
+        raise RuntimeError("gitbug-java ran its entry point while being loaded")
+
+    for obj in module.values():
+        if (
+            inspect.isclass(obj)
+            and callable(getattr(obj, "bids", None))
+            and callable(getattr(obj, "info", None))
+        ):
+            return obj()
+    raise RuntimeError("Could not find the gitbug-java command line interface")
+
+
+def capture(function, *args) -> str:
+    stdout = io.StringIO()
+    with contextlib.redirect_stdout(stdout):
+        result = function(*args)
+    # Fire prints return values, so commands may either print or return their output
+    if result is not None:
+        if isinstance(result, str):
+            stdout.write(result)
+        else:
+            stdout.write("\n".join(str(x) for x in result))
+    return stdout.getvalue()
+
+
+def main():
+    root, output_path, bids = sys.argv[1], sys.argv[2], sys.argv[3:]
+    os.chdir(root)
+    sys.path.insert(0, root)
+
+    cli = load_cli(root)
+    if len(bids) == 0:
+        bids = capture(cli.bids).split()
+
+    infos = {}
+    for bid in bids:
+        try:
+            infos[bid] = capture(cli.info, bid)
+        except Exception as e:
+            print(f"Could not export info of bug {bid}: {e}", file=sys.stderr)
+    with open(output_path, "w") as f:
+        json.dump(infos, f)
+
+
+if __name__ == "__main__":
+    main()
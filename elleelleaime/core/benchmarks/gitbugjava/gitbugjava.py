@@ -1,11 +1,14 @@
 from pathlib import Path
 from elleelleaime.core.benchmarks.benchmark import Benchmark
 from elleelleaime.core.benchmarks.gitbugjava.gitbugjavabug import GitBugJavaBug
+from elleelleaime.core.utils import process
 
-from typing import Optional
+from typing import Dict, Iterable, Optional, Tuple
 
 import subprocess
+import tempfile
 import logging
+import json
 import tqdm
 import re
 import os
@@ -23,71 +26,148 @@ class GitBugJava(Benchmark):
     def get_bin(self, options: str = "") -> Optional[str]:
         return self.bin
 
-    def run_command(
-        self, command: str, check: bool = True, timeout: Optional[int] = None
-    ) -> subprocess.CompletedProcess:
+    def get_env(self) -> dict:
         env = os.environ.copy()
         # We need to clear the VIRTUAL_ENV variable to be able to run gitbug-java commands inside its own virtualenv
         if "VIRTUAL_ENV" in env:
             env.pop("VIRTUAL_ENV")
         # The act binary should be in the path
         env["PATH"] = f"{self.path}:{self.path}/bin:{env['PATH']}"
-        return subprocess.run(
+        return env
+
+    def run_command(
+        self, command: str, check: bool = True, timeout: Optional[int] = None
+    ) -> subprocess.CompletedProcess:
+        return process.run(
             f"{self.bin} {command}",
             shell=True,
             capture_output=True,
             check=check,
-            env=env,
+            env=self.get_env(),
             timeout=timeout,
         )
 
     def initialize(self) -> None:
         """
         Initializes the GitBug-Java benchmark object by collecting the list of all projects and bugs.
+        The collected metadata is stored in a manifest tied to the revision of the GitBug-Java checkout.
         """
         logging.info("Initializing GitBug-Java benchmark...")
 
-        # Get all bug ids
-        run = self.run_command("bids")
-        bids = {bid.decode("utf-8") for bid in run.stdout.split()}
-        logging.info("Found %3d bugs" % len(bids))
+        manifest = self.get_manifest("manifest")
+        bugs = manifest.get("bugs")
+        if bugs is None:
+            bugs = self.collect_bugs()
+            manifest.set("bugs", bugs)
+        else:
+            logging.info("Loaded %3d bugs from %s" % (len(bugs), manifest.path))
+
+        self.add_bugs(bugs)
+
+    def load_bugs(self, identifiers: Iterable[str]) -> None:
+        """
+        Loads only the bugs with the given identifiers.
+        Without an up-to-date manifest, only the info of those bugs is exported.
+        """
+        bids = [bid for bid in identifiers if bid not in self.bugs]
+        if len(bids) == 0:
+            return
+
+        bugs = self.get_manifest("manifest").get("bugs")
+        if bugs is None:
+            bugs = self.collect_bugs(bids)
+
+        self.add_bugs({bid: bugs[bid] for bid in bids if bid in bugs})
+
+    def add_bugs(self, bugs: Dict[str, dict]) -> None:
+        """
+        Adds the bugs described by the collected metadata, skipping the ones already loaded.
+        """
+        for bid, info in bugs.items():
+            if bid in self.bugs:
+                continue
+            self.add_bug(
+                GitBugJavaBug(self, bid, info["ground_truth"], info["failing_tests"])
+            )
+
+    def collect_bugs(self, bids: Optional[Iterable[str]] = None) -> Dict[str, dict]:
+        """
+        Collects the metadata of the given bugs (all bugs if none are given).
+        """
+        try:
+            infos = self.export_info(bids or ())
+        except subprocess.CalledProcessError as e:
+            logging.warning(
+                f"Bulk export of GitBug-Java bug info failed, falling back to one command per bug: {e.stderr.decode('utf-8')}"
+            )
+            if bids is None:
+                # Get all bug ids
+                run = self.run_command("bids")
+                bids = {bid.decode("utf-8") for bid in run.stdout.split()}
+            infos = {}
+            for bid in tqdm.tqdm(bids, "Loading GitBug-Java"):
+                run = self.run_command(f"info {bid}", check=False)
+                if run.returncode != 0:
+                    logging.error(f"Could not load info of bug {bid}")
+                    continue
+                infos[bid] = run.stdout.decode("utf-8")
+        logging.info("Found %3d bugs" % len(infos))
+
+        bugs = {}
+        for bid in sorted(infos):
+            diff, failing_tests = self.parse_info(infos[bid])
+            bugs[bid] = {"ground_truth": diff, "failing_tests": failing_tests}
+        return bugs
 
-        for bid in tqdm.tqdm(bids, "Loading GitBug-Java"):
-            # Run info command
-            run = self.run_command(
-                f"info {bid}",
+    def export_info(self, bids: Iterable[str] = ()) -> Dict[str, str]:
+        """
+        Returns the output of `gitbug-java info` for the given bugs (all bugs if none are given),
+        computed by a single process running inside the GitBug-Java virtualenv.
+        """
+        script = Path(__file__).parent / "export_info.py"
+        with tempfile.NamedTemporaryFile(suffix=".json") as output:
+            subprocess.run(
+                f"cd {self.path} && poetry run python {script} {self.path} {output.name} {' '.join(bids)}",
+                shell=True,
+                capture_output=True,
                 check=True,
+                env=self.get_env(),
             )
-            stdout = run.stdout.decode("utf-8")
-
-            # Get diff (after "### Bug Patch", between triple ticks)
-            diff = stdout.split("### Bug Patch")[1].split("```diff")[1].split("```")[0]
-
-            # Get failing tests
-            # The info command prints out the failing tests in the following format
-            # - failing test
-            #   - type of failure
-            #   - failure message
-            failing_tests = {}
-            stdout = stdout.split("### Failing Tests")[1]
-            for test in re.split(r"(^-)", stdout):
-                # Split the three lines
-                info = test.strip().split("\n")
-
-                # Extract failing test class and method
-                failing_test_case = info[0].replace("-", "", 1).strip()
-                failing_test_case = (
-                    failing_test_case.replace(":", "::")
-                    .replace("#", "::")
-                    .replace("()", "")
-                )
-                # Remove value between '$' and '::' if it exists (happens for jitterted tests)
-                failing_test_case = re.sub(r"\$.*?::", "::", failing_test_case)
-
-                # Extract cause
-                cause = info[2].replace("-", "", 1).strip()
-                if cause == "None":
-                    cause = info[1].replace("-", "", 1).strip()
-                failing_tests[failing_test_case] = cause
-
-            self.add_bug(GitBugJavaBug(self, bid, diff, failing_tests))
+            return json.load(output)
+
+    @staticmethod
+    def parse_info(stdout: str) -> Tuple[str, Dict[str, str]]:
+        """
+        Parses the output of `gitbug-java info` into the ground truth diff and the failing tests.
+        """
+        # Get diff (after "### Bug Patch", between triple ticks)
+        diff = stdout.split("### Bug Patch")[1].split("```diff")[1].split("```")[0]
+
+        # Get failing tests
+        # The info command prints out the failing tests in the following format
+        # - failing test
+        #   - type of failure
+        #   - failure message
+        failing_tests = {}
+        stdout = stdout.split("### Failing Tests")[1]
+        for test in re.split(r"(^-)", stdout):
+            # Split the three lines
+            info = test.strip().split("\n")
+
+            # Extract failing test class and method
+            failing_test_case = info[0].replace("-", "", 1).strip()
+            failing_test_case = (
+                failing_test_case.replace(":", "::")
+                .replace("#", "::")
+                .replace("()", "")
+            )
+            # Remove value between '$' and '::' if it exists (happens for jitterted tests)
+            failing_test_case = re.sub(r"\$.*?::", "::", failing_test_case)
+
+            # Extract cause
+            cause = info[2].replace("-", "", 1).strip()
+            if cause == "None":
+                cause = info[1].replace("-", "", 1).strip()
+            failing_tests[failing_test_case] = cause
+
+        return diff, failing_tests
@@ -47,7 +47,7 @@ class GitBugJavaBug(RichBug):
     def test(self, path: str) -> TestResult:
         try:
             run = self.benchmark.run_command(
-                f"run {path}", check=False, timeout=30 * 60
+                f"run {path}", check=False, timeout=self.get_test_timeout()
             )
 
             m = re.search(r"Failing tests: ([0-9]+)", run.stdout.decode("utf-8"))
@@ -1,9 +1,11 @@
 from pathlib import Path
-from unidiff import PatchSet
+from concurrent.futures import ThreadPoolExecutor
 from elleelleaime.core.benchmarks.benchmark import Benchmark
 from elleelleaime.core.benchmarks.humanevaljava.humanevaljavabug import HumanEvalJavaBug
+from elleelleaime.core.utils.java.java import compute_file_diff
+
+from typing import Iterable
 
-import subprocess
 import logging
 
 
@@ -29,52 +31,55 @@ class HumanEvalJava(Benchmark):
         )
         with open(locfile_path, "r") as locfile:
             # Each line is a sample
-            for line in locfile.readlines():
-                # Assert that the bug exists
-                bid = line.split()[0]
-                assert Path(
-                    self.get_path(),
-                    "src",
-                    "main",
-                    "java",
-                    "humaneval",
-                    "correct",
-                    f"{bid}.java",
-                ).exists()
-                assert Path(
-                    self.get_path(),
-                    "src",
-                    "main",
-                    "java",
-                    "humaneval",
-                    "buggy",
-                    f"{bid}.java",
-                ).exists()
+            bids = [line.split()[0] for line in locfile.readlines()]
 
-                # Compute the diff
-                # Note: we compute an inverted diff to be consistent with Defects4J
-                # Replace the package name temporarily to generate a clean diff
-                subprocess.run(
-                    f"sed -i 's/package humaneval\\.correct/package humaneval\\.buggy/g' {self.get_path()}/src/main/java/humaneval/correct/{bid}.java",
-                    shell=True,
-                    capture_output=True,
-                    check=True,
-                )
+        self.load_bugs(bids)
 
-                run = subprocess.run(
-                    f"cd {self.get_path()} && diff --unified src/main/java/humaneval/correct/{bid}.java src/main/java/humaneval/buggy/{bid}.java",
-                    shell=True,
-                    capture_output=True,
-                )
-                diff = PatchSet(run.stdout.decode("utf-8"))
-                # Change the source file path to point to the buggy version
-                diff[0].source_file = f"src/main/java/humaneval/buggy/{bid}.java"
+    def load_bugs(self, identifiers: Iterable[str]) -> None:
+        """
+        Loads only the bugs with the given identifiers.
+        """
+        bids = [
+            bid
+            for bid in identifiers
+            if bid not in self.bugs
+            and Path(
+                self.get_path(),
+                "src",
+                "main",
+                "java",
+                "humaneval",
+                "buggy",
+                f"{bid}.java",
+            ).exists()
+        ]
 
-                run = subprocess.run(
-                    f"sed -i 's/package humaneval\\.buggy/package humaneval\\.correct/g' {self.get_path()}/src/main/java/humaneval/correct/{bid}.java",
-                    shell=True,
-                    capture_output=True,
-                    check=True,
-                )
+        with ThreadPoolExecutor() as executor:
+            for bug in executor.map(self.load_bug, bids):
+                self.add_bug(bug)
+
+    def load_bug(self, bid: str) -> HumanEvalJavaBug:
+        """
+        Loads the bug `bid`, computing its ground truth diff from the benchmark files.
+        """
+        buggy_file = Path("src", "main", "java", "humaneval", "buggy", f"{bid}.java")
+        fixed_file = Path("src", "main", "java", "humaneval", "correct", f"{bid}.java")
+        # Assert that the bug exists
+        assert Path(self.get_path(), fixed_file).exists()
+        assert Path(self.get_path(), buggy_file).exists()
+
+        # Compute the diff
+        # Note: we compute an inverted diff to be consistent with Defects4J
+        # The package name of the correct version is replaced in memory to generate a clean diff
+        fixed_code = (
+            Path(self.get_path(), fixed_file)
+            .read_text(encoding="utf-8")
+            .replace("package humaneval.correct", "package humaneval.buggy")
+        )
+        buggy_code = Path(self.get_path(), buggy_file).read_text(encoding="utf-8")
+        # Both sides of the diff point to the buggy version
+        diff = compute_file_diff(
+            fixed_code, buggy_code, str(buggy_file), str(buggy_file)
+        )
 
-                self.add_bug(HumanEvalJavaBug(self, bid, str(diff)))
+        return HumanEvalJavaBug(self, bid, diff)
@@ -1,4 +1,3 @@
-import subprocess
 import shutil
 import os
 from elleelleaime.core.benchmarks.benchmark import Benchmark
@@ -6,6 +5,7 @@ from elleelleaime.core.benchmarks.benchmark import Benchmark
 from elleelleaime.core.benchmarks.bug import Bug
 from elleelleaime.core.benchmarks.test_result import TestResult
 from elleelleaime.core.benchmarks.compile_result import CompileResult
+from elleelleaime.core.utils import process
 
 
 class HumanEvalJavaBug(Bug):
@@ -20,7 +20,7 @@ class HumanEvalJavaBug(Bug):
         # Remove the directory if it exists
         shutil.rmtree(path, ignore_errors=True)
         # Make the directory
-        subprocess.run(
+        process.run(
             f"mkdir -p {path}",
             shell=True,
             capture_output=True,
@@ -28,7 +28,7 @@ class HumanEvalJavaBug(Bug):
         )
 
         # Checkout the bug is the same as copying the entire benchmark
-        checkout_run = subprocess.run(
+        checkout_run = process.run(
             f"cp -r {self.benchmark.get_path()}/* {path}",
             shell=True,
             capture_output=True,
@@ -44,7 +44,7 @@ class HumanEvalJavaBug(Bug):
             )
 
             # We only needd to change the package name
-            subprocess.run(
+            process.run(
                 f"sed -i 's/package humaneval\\.correct/package humaneval\\.buggy/g' {path}/src/main/java/humaneval/buggy/{self.get_identifier()}.java",
                 shell=True,
                 capture_output=True,
@@ -54,16 +54,16 @@ class HumanEvalJavaBug(Bug):
         return checkout_run.returncode == 0
 
     def compile(self, path: str) -> CompileResult:
-        run = subprocess.run(
-            f'docker run -u {os.getuid()}:{os.getgid()} --rm --volume "{path}:{path}" --workdir "{path}" maven:3.9.8-eclipse-temurin-8 timeout {5*60} mvn compile',
+        run = process.run(
+            f'docker run -u {os.getuid()}:{os.getgid()} --rm {process.get_docker_flags()} --volume "{path}:{path}" --workdir "{path}" maven:3.9.8-eclipse-temurin-8 timeout {self.get_compile_timeout()} mvn compile',
             shell=True,
             capture_output=True,
         )
         return CompileResult(run.returncode == 0)
 
     def test(self, path: str) -> TestResult:
-        run = subprocess.run(
-            f'docker run -u {os.getuid()}:{os.getgid()} --rm --volume "{path}:{path}" --workdir "{path}" maven:3.9.8-eclipse-temurin-8 timeout {30*60} mvn test -Dtest=TEST_{self.get_identifier()}',
+        run = process.run(
+            f'docker run -u {os.getuid()}:{os.getgid()} --rm {process.get_docker_flags()} --volume "{path}:{path}" --workdir "{path}" maven:3.9.8-eclipse-temurin-8 timeout {self.get_test_timeout()} mvn test -Dtest=TEST_{self.get_identifier()}',
             shell=True,
             capture_output=True,
         )
@@ -1,9 +1,11 @@
 from pathlib import Path
-from unidiff import PatchSet
+from concurrent.futures import ThreadPoolExecutor
 from elleelleaime.core.benchmarks.benchmark import Benchmark
 from elleelleaime.core.benchmarks.quixbugs.quixbugsbug import QuixBugsBug
+from elleelleaime.core.utils.java.java import compute_file_diff
+
+from typing import Iterable
 
-import subprocess
 import logging
 
 
@@ -28,22 +30,42 @@ class QuixBugs(Benchmark):
             if ".java" in str(x) and x.stem.isupper()
         ]
 
-        for algo in algos:
-            buggy_file = Path(self.path, "java_programs", f"{algo}.java")
-            fixed_file = Path(self.path, "correct_java_programs", f"{algo}.java")
-            # Assert that the bug exists
-            assert buggy_file.exists()
-            assert fixed_file.exists()
-
-            # Compute the diff
-            # Note: we compute an inverted diff to be consistent with Defects4J
-            run = subprocess.run(
-                f"cd {self.get_path()} && diff --unified {fixed_file.relative_to(self.path)} {buggy_file.relative_to(self.path)}",
-                shell=True,
-                capture_output=True,
-            )
-            diff = PatchSet(run.stdout.decode("utf-8"))
-            # Change the source file path to point to the buggy version
-            diff[0].source_file = f"{buggy_file.relative_to(self.path)}"
-
-            self.add_bug(QuixBugsBug(self, algo, str(diff)))
+        self.load_bugs(algos)
+
+    def load_bugs(self, identifiers: Iterable[str]) -> None:
+        """
+        Loads only the bugs with the given identifiers.
+        """
+        algos = [
+            algo
+            for algo in identifiers
+            if algo not in self.bugs
+            and algo.isupper()
+            and Path(self.path, "java_programs", f"{algo}.java").exists()
+        ]
+
+        with ThreadPoolExecutor() as executor:
+            for bug in executor.map(self.load_bug, algos):
+                self.add_bug(bug)
+
+    def load_bug(self, algo: str) -> QuixBugsBug:
+        """
+        Loads the bug `algo`, computing its ground truth diff from the benchmark files.
+        """
+        buggy_file = Path("java_programs", f"{algo}.java")
+        fixed_file = Path("correct_java_programs", f"{algo}.java")
+        # Assert that the bug exists
+        assert Path(self.path, buggy_file).exists()
+        assert Path(self.path, fixed_file).exists()
+
+        # Compute the diff
+        # Note: we compute an inverted diff to be consistent with Defects4J
+        # Both sides of the diff point to the buggy version
+        diff = compute_file_diff(
+            Path(self.path, fixed_file).read_text(encoding="utf-8"),
+            Path(self.path, buggy_file).read_text(encoding="utf-8"),
+            str(buggy_file),
+            str(buggy_file),
+        )
+
+        return QuixBugsBug(self, algo, diff)
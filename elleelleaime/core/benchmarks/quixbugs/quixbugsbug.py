@@ -1,10 +1,10 @@
-import subprocess
 import shutil
 from elleelleaime.core.benchmarks.benchmark import Benchmark
 
 from elleelleaime.core.benchmarks.bug import Bug
 from elleelleaime.core.benchmarks.test_result import TestResult
 from elleelleaime.core.benchmarks.compile_result import CompileResult
+from elleelleaime.core.utils import process
 
 
 class QuixBugsBug(Bug):
@@ -31,7 +31,7 @@ class QuixBugsBug(Bug):
         # Remove the directory if it exists
         shutil.rmtree(path, ignore_errors=True)
         # Make the directory
-        subprocess.run(
+        process.run(
             f"mkdir -p {path}",
             shell=True,
             capture_output=True,
@@ -41,32 +41,34 @@ class QuixBugsBug(Bug):
         # Checkout the bug is the same as copying the entire benchmark
         # Copy source files
         cmd = f"cd {self.benchmark.get_path()}; mkdir {path}/java_programs; cp {'correct_java_programs' if fixed else 'java_programs'}/{self.identifier}.java {path}/java_programs/"
-        run = subprocess.run(cmd, shell=True, capture_output=True, check=True)
+        run = process.run(cmd, shell=True, capture_output=True, check=True)
         # Copy graph source files if bug is graph-based
         if self.identifier.lower() in self.graph_bugs:
             cmd = f"cd {self.benchmark.get_path()}; cp java_programs/Node.java {path}/java_programs/; cp java_programs/WeightedEdge.java {path}/java_programs/"
-            run = subprocess.run(cmd, shell=True, capture_output=True, check=True)
+            run = process.run(cmd, shell=True, capture_output=True, check=True)
         # Copy test files
         cmd = f"cd {self.benchmark.get_path()}; mkdir -p {path}/java_testcases/junit; cp java_testcases/junit/{self.identifier}_TEST.java {path}/java_testcases/junit; cp java_testcases/junit/QuixFixOracleHelper.java {path}/java_testcases/junit"
-        run = subprocess.run(cmd, shell=True, capture_output=True, check=True)
+        run = process.run(cmd, shell=True, capture_output=True, check=True)
         # Copy pom.xml
         cmd = f"cd {self.benchmark.get_path()}; cp pom.xml {path}/"
-        run = subprocess.run(cmd, shell=True, capture_output=True, check=True)
+        run = process.run(cmd, shell=True, capture_output=True, check=True)
 
         return run.returncode == 0
 
     def compile(self, path: str) -> CompileResult:
-        run = subprocess.run(
-            f"cd {path}; timeout {5*60} mvn compile",
+        run = process.run(
+            f"cd {path}; timeout {self.get_compile_timeout()} mvn compile",
             shell=True,
             capture_output=True,
+            limited=True,
         )
         return CompileResult(run.returncode == 0)
 
     def test(self, path: str) -> TestResult:
-        run = subprocess.run(
-            f"cd {path}; timeout {30*60} mvn test",
+        run = process.run(
+            f"cd {path}; timeout {self.get_test_timeout()} mvn test",
             shell=True,
             capture_output=True,
+            limited=True,
         )
         return TestResult(run.returncode == 0)
@@ -0,0 +1,111 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+import functools
+
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from elleelleaime.core.benchmarks.bug import Bug, RichBug
+
+# Bump when the extraction logic changes in a way that invalidates stored assets
+ASSETS_VERSION = "1"
+
+
+@functools.lru_cache(maxsize=None)
+def get_extractor_version(jar: str = "extractor.jar") -> str:
+    """
+    Returns the version of the extraction logic, i.e. ASSETS_VERSION and the digest of the extractor jar.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(jar, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    except OSError:
+        logging.warning(
+            f"Could not read {jar}, assets are keyed on ASSETS_VERSION only"
+        )
+        return ASSETS_VERSION
+    return f"{ASSETS_VERSION}-{digest.hexdigest()}"
+
+
+class AssetStore:
+    """
+    On-disk store for the artifacts extracted from bug checkouts (e.g. the buggy and fixed functions).
+
+    Assets are stored per benchmark and bug, under a key that hashes the asset name, the extractor
+    version, and the ground truth and failing tests of the bug, so changing any of them never serves stale assets.
+    Building prompts from stored assets needs no checkout nor container.
+    """
+
+    __STORES: Dict[str, "AssetStore"] = {}
+    __STORES_LOCK = threading.Lock()
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @classmethod
+    def get_store(cls, path: Path) -> "AssetStore":
+        """
+        Returns the store at `path`, shared by all users in this process.
+        """
+        with cls.__STORES_LOCK:
+            key = str(Path(path).absolute())
+            if key not in cls.__STORES:
+                cls.__STORES[key] = AssetStore(path)
+            return cls.__STORES[key]
+
+    def get_asset_path(self, bug: Bug, name: str) -> Path:
+        failing_tests = (
+            sorted(bug.get_failing_tests()) if isinstance(bug, RichBug) else []
+        )
+        key = hashlib.sha256(
+            json.dumps(
+                [name, get_extractor_version(), bug.get_ground_truth(), failing_tests]
+            ).encode("utf-8")
+        ).hexdigest()
+        return Path(
+            self.path,
+            bug.benchmark.get_identifier(),
+            bug.get_identifier(),
+            f"{name}-{key}.json",
+        )
+
+    def __load(self, path: Path) -> Any:
+        with open(path, "r") as f:
+            return json.load(f)["value"]
+
+    def __save(self, path: Path, value: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a partial asset
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"value": value}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def get_or_compute(self, bug: Bug, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the asset `name` of the bug, computing and storing it if it is not stored yet.
+
+        Empty results (e.g. None for bugs that do not change a single function) are stored too, so that
+        they are not extracted again. If `compute` raises (e.g. an ExtractorError when the extractor could not run),
+        nothing is stored and the error is propagated.
+        """
+        path = self.get_asset_path(bug, name)
+        if path.exists():
+            try:
+                return self.__load(path)
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                logging.warning(f"Ignoring unreadable asset {path}: {e}")
+
+        value = compute()
+        self.__save(path, value)
+        return value
@@ -0,0 +1,83 @@
+import os
+import json
+import logging
+import tempfile
+import threading
+
+from pathlib import Path
+from typing import Any, Optional
+
+
+class Manifest:
+    """
+    On-disk JSON store for benchmark metadata.
+
+    The stored data is tied to a revision of the benchmark checkout. When the
+    revision on disk does not match the current one, the stored data is ignored
+    and is rebuilt by the caller.
+    """
+
+    def __init__(self, path: Path, revision: Optional[str]):
+        self.path = Path(path)
+        self.revision = revision
+        self.lock = threading.RLock()
+        self.data: Optional[dict] = None
+
+    def __load(self) -> dict:
+        if self.data is not None:
+            return self.data
+
+        self.data = {}
+        if self.revision is None or not self.path.exists():
+            return self.data
+
+        try:
+            with open(self.path, "r") as f:
+                stored = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Ignoring unreadable manifest {self.path}: {e}")
+            return self.data
+
+        if stored.get("revision") != self.revision:
+            logging.info(
+                f"Manifest {self.path} is outdated (revision {stored.get('revision')} != {self.revision})"
+            )
+            return self.data
+
+        self.data = stored.get("entries", {})
+        return self.data
+
+    def __save(self) -> None:
+        # Without a revision we cannot tell when the data gets stale, so we never persist it
+        if self.revision is None:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a partial manifest
+        fd, tmp_path = tempfile.mkstemp(
+            dir=self.path.parent, prefix=f".{self.path.name}."
+        )
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"revision": self.revision, "entries": self.data}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self.lock:
+            return self.__load().get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self.lock:
+            self.__load()[key] = value
+            self.__save()
+
+    def update(self, key: str, values: dict) -> None:
+        """
+        Merges `values` into the dictionary stored under `key`.
+        """
+        with self.lock:
+            self.__load().setdefault(key, {}).update(values)
+            self.__save()
@@ -0,0 +1,130 @@
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_RESPONSE_CACHE_PATH = (
+    Path(__file__).parent.parent.parent.parent / "cache" / "responses"
+)
+
+
+class ResponseCache:
+    """
+    On-disk cache of the responses of generation APIs.
+
+    Responses are keyed by the API, the request parameters (model, prompt, decoding parameters)
+    and the index of the sample, so identical reruns send no request. Hits and misses are counted
+    to report the hit rate of a run.
+
+    The batches submitted to a provider's batch API are recorded too, with the cache key of each of their
+    requests, so that an interrupted run can wait for them instead of submitting the requests again.
+    """
+
+    __CACHES: Dict[str, "ResponseCache"] = {}
+    __CACHES_LOCK = threading.Lock()
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def get_cache(cls, path: Optional[Path] = None) -> "ResponseCache":
+        """
+        Returns the cache at `path` (DEFAULT_RESPONSE_CACHE_PATH by default), shared by all users in this process.
+        """
+        path = Path(path or DEFAULT_RESPONSE_CACHE_PATH)
+        with cls.__CACHES_LOCK:
+            key = str(path.absolute())
+            if key not in cls.__CACHES:
+                cls.__CACHES[key] = ResponseCache(path)
+            return cls.__CACHES[key]
+
+    def get_key(self, api: str, params: dict, index: int) -> str:
+        return hashlib.sha256(
+            json.dumps([api, params, index], sort_keys=True, default=str).encode(
+                "utf-8"
+            )
+        ).hexdigest()
+
+    def __get_path(self, api: str, key: str) -> Path:
+        return Path(self.path, api, key[:2], f"{key}.json")
+
+    def load(self, api: str, key: str) -> Tuple[bool, Any]:
+        """
+        Returns whether the response of `key` is cached, and the response.
+        """
+        path = self.__get_path(api, key)
+        response = None
+        hit = False
+        if path.exists():
+            try:
+                with open(path, "r") as f:
+                    response = json.load(f)["response"]
+                hit = True
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                logging.warning(f"Ignoring unreadable cached response {path}: {e}")
+
+        with self.lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return hit, response
+
+    def __write(self, path: Path, data: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def save(self, api: str, key: str, response: Any) -> None:
+        self.__write(self.__get_path(api, key), {"response": response})
+
+    def __get_batch_path(self, api: str, batch_id: str) -> Path:
+        return Path(self.path, api, "batches", f"{batch_id}.json")
+
+    def save_batch(self, api: str, batch_id: str, keys: Dict[str, str]) -> None:
+        """
+        Records a submitted batch, with the cache key of each of its custom ids.
+        """
+        self.__write(self.__get_batch_path(api, batch_id), {"keys": keys})
+
+    def load_batches(self, api: str) -> Dict[str, Dict[str, str]]:
+        """
+        Returns the recorded batches of `api` whose responses are not cached yet, by batch id.
+        """
+        batches = {}
+        for path in sorted(Path(self.path, api, "batches").glob("*.json")):
+            try:
+                with open(path, "r") as f:
+                    batches[path.stem] = json.load(f)["keys"]
+            except (OSError, json.JSONDecodeError, KeyError) as e:
+                logging.warning(f"Ignoring unreadable batch record {path}: {e}")
+        return batches
+
+    def remove_batch(self, api: str, batch_id: str) -> None:
+        self.__get_batch_path(api, batch_id).unlink(missing_ok=True)
+
+    def reset_stats(self) -> None:
+        with self.lock:
+            self.hits = 0
+            self.misses = 0
+
+    def get_report(self) -> str:
+        with self.lock:
+            total = self.hits + self.misses
+            rate = 100 * self.hits / total if total > 0 else 0
+            return f"Response cache: {self.hits} hits, {self.misses} misses ({rate:.1f}% hit rate)"
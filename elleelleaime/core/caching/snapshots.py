@@ -0,0 +1,175 @@
+import os
+import shutil
+import hashlib
+import logging
+import threading
+import subprocess
+
+from uuid import uuid4
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from elleelleaime.core.benchmarks.bug import Bug
+
+
+def compute_tree_digest(path: Path) -> str:
+    """
+    Computes a digest of the contents of all files under `path`.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(path):
+        dirs.sort()
+        for name in sorted(files):
+            file_path = Path(root, name)
+            digest.update(str(file_path.relative_to(path)).encode("utf-8"))
+            if file_path.is_symlink():
+                digest.update(os.readlink(file_path).encode("utf-8"))
+                continue
+            with open(file_path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(block)
+    return digest.hexdigest()
+
+
+def clone_tree(
+    source: Path, destination: Path, mode: str = "copy", writable: Iterable[str] = ()
+) -> None:
+    """
+    Clones the directory `source` into `destination`.
+
+    In "copy" mode, files are reflinked (copy-on-write) when the filesystem supports it, and copied otherwise.
+    In "hardlink" mode, files are hard links to the source, except the `writable` ones (relative paths) which are copied.
+    Hard-linked files must never be modified in place, since that would modify the source.
+    """
+    shutil.rmtree(destination, ignore_errors=True)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+
+    if mode == "hardlink":
+        run = subprocess.run(
+            f'cp -al "{source}" "{destination}"', shell=True, capture_output=True
+        )
+        if run.returncode == 0:
+            for relative_path in writable:
+                target = Path(destination, relative_path)
+                if target.exists():
+                    # Break the link so that writes do not reach the source
+                    target.unlink()
+                    shutil.copy2(Path(source, relative_path), target)
+            return
+    else:
+        run = subprocess.run(
+            f'cp -a --reflink=auto "{source}" "{destination}"',
+            shell=True,
+            capture_output=True,
+        )
+        if run.returncode == 0:
+            return
+
+    # Fallback for platforms without GNU cp
+    shutil.rmtree(destination, ignore_errors=True)
+    shutil.copytree(source, destination, symlinks=True)
+
+
+class SnapshotStore:
+    """
+    Store of pristine bug checkouts.
+
+    Each version of a bug is checked out once into the store, and workspaces are then cloned from that snapshot.
+    The digest of each snapshot is recorded when it is built and verified the first time it is used by a process.
+    """
+
+    __STORES: Dict[str, "SnapshotStore"] = {}
+    __STORES_LOCK = threading.Lock()
+
+    def __init__(self, path: Path, mode: str = "copy"):
+        assert mode in {"copy", "hardlink"}, f"Unknown snapshot mode {mode}"
+        self.path = Path(path)
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.snapshot_locks: Dict[Path, threading.Lock] = {}
+        self.verified: set = set()
+
+    @classmethod
+    def get_store(cls, path: Path, mode: str = "copy") -> "SnapshotStore":
+        """
+        Returns the store at `path`, shared by all users in this process.
+        """
+        with cls.__STORES_LOCK:
+            key = f"{Path(path).absolute()}:{mode}"
+            if key not in cls.__STORES:
+                cls.__STORES[key] = SnapshotStore(path, mode)
+            return cls.__STORES[key]
+
+    def get_snapshot_path(self, bug: Bug, fixed: bool = False) -> Path:
+        return Path(
+            self.path,
+            bug.benchmark.get_identifier(),
+            bug.get_identifier(),
+            "fixed" if fixed else "buggy",
+        )
+
+    def __get_lock(self, snapshot: Path) -> threading.Lock:
+        with self.lock:
+            if snapshot not in self.snapshot_locks:
+                self.snapshot_locks[snapshot] = threading.Lock()
+            return self.snapshot_locks[snapshot]
+
+    def __is_valid(self, snapshot: Path) -> bool:
+        digest_path = snapshot.with_suffix(".sha256")
+        if not snapshot.exists() or not digest_path.exists():
+            return False
+        if snapshot in self.verified:
+            return True
+
+        if compute_tree_digest(snapshot) != digest_path.read_text().strip():
+            logging.warning(f"Snapshot {snapshot} was modified, rebuilding it")
+            return False
+        self.verified.add(snapshot)
+        return True
+
+    def __build(self, bug: Bug, snapshot: Path, fixed: bool) -> None:
+        shutil.rmtree(snapshot, ignore_errors=True)
+        # Build the snapshot next to its final location, and move it in place once it is complete
+        tmp_path = snapshot.with_name(f".{snapshot.name}-{uuid4()}")
+        try:
+            bug.checkout(str(tmp_path), fixed=fixed)
+            snapshot.with_suffix(".sha256").write_text(compute_tree_digest(tmp_path))
+            try:
+                os.rename(tmp_path, snapshot)
+            except OSError:
+                # Another process built the same snapshot in the meantime, keep theirs
+                logging.info(f"Snapshot {snapshot} was built concurrently")
+                snapshot.with_suffix(".sha256").write_text(
+                    compute_tree_digest(snapshot)
+                )
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        self.verified.discard(snapshot)
+
+    def get_snapshot(self, bug: Bug, fixed: bool = False) -> Path:
+        """
+        Returns the path of the pristine snapshot of the bug, building it if needed.
+        """
+        snapshot = self.get_snapshot_path(bug, fixed)
+        with self.__get_lock(snapshot):
+            if not self.__is_valid(snapshot):
+                snapshot.parent.mkdir(parents=True, exist_ok=True)
+                self.__build(bug, snapshot, fixed)
+                if not self.__is_valid(snapshot):
+                    raise RuntimeError(f"Could not build snapshot {snapshot}")
+        return snapshot
+
+    def checkout(
+        self,
+        bug: Bug,
+        path: str,
+        fixed: bool = False,
+        writable: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        Checks out the bug into `path` by cloning its snapshot.
+        In hardlink mode, `writable` lists the files (relative to `path`) that the caller will modify.
+        """
+        snapshot = self.get_snapshot(bug, fixed)
+        clone_tree(snapshot, Path(path), mode=self.mode, writable=writable or ())
+        return True
@@ -0,0 +1,147 @@
+import os
+import time
+import shutil
+import logging
+import threading
+
+from pathlib import Path
+from collections import OrderedDict
+from typing import Callable, Dict, List
+
+from elleelleaime.core.benchmarks.bug import Bug
+
+
+class Workspace:
+    """
+    Checkout of a bug in which a single file is modified.
+    """
+
+    def __init__(self, path: str, modified_file: str):
+        self.path = path
+        self.modified_file = modified_file
+        with open(self.get_modified_file_path(), "rb") as f:
+            self.original = f.read()
+
+    def get_modified_file_path(self) -> str:
+        return os.path.join(self.path, self.modified_file)
+
+    def restore(self) -> None:
+        """
+        Restores the modified file to its original content, keeping everything else (e.g. build outputs).
+        """
+        with open(self.get_modified_file_path(), "rb") as f:
+            if f.read() == self.original:
+                return
+        with open(self.get_modified_file_path(), "wb") as f:
+            f.write(self.original)
+
+    def touch(self) -> None:
+        """
+        Marks the modified file as newer than any build output.
+        Incremental builds (e.g. ant) compare timestamps with a granularity of up to a second,
+        so a file rewritten shortly after the previous build could otherwise be considered up to date.
+        """
+        stamp = time.time() + 2
+        os.utime(self.get_modified_file_path(), (stamp, stamp))
+
+
+class WorkspacePool:
+    """
+    Pool of warm workspaces, kept per worker thread and per bug.
+
+    Between candidates of the same bug, only the modified file is restored, so build outputs
+    and the OS page cache stay warm. Each thread keeps at most `capacity` workspaces, evicting
+    the least recently used one.
+    """
+
+    __POOLS: Dict[str, "WorkspacePool"] = {}
+    __POOLS_LOCK = threading.Lock()
+
+    def __init__(self, path: Path, capacity: int = 2):
+        self.path = Path(path)
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        self.workspaces: Dict[int, OrderedDict[str, Workspace]] = {}
+
+    @classmethod
+    def get_pool(cls, path: Path, capacity: int = 2) -> "WorkspacePool":
+        """
+        Returns the pool at `path`, shared by all users in this process.
+        """
+        with cls.__POOLS_LOCK:
+            key = str(Path(path).absolute())
+            if key not in cls.__POOLS:
+                cls.__POOLS[key] = WorkspacePool(path, capacity)
+            return cls.__POOLS[key]
+
+    @classmethod
+    def clear_pools(cls) -> None:
+        """
+        Removes the workspaces of all pools.
+        """
+        with cls.__POOLS_LOCK:
+            pools = list(cls.__POOLS.values())
+        for pool in pools:
+            pool.clear()
+
+    def __get_thread_workspaces(self) -> "OrderedDict[str, Workspace]":
+        with self.lock:
+            return self.workspaces.setdefault(threading.get_ident(), OrderedDict())
+
+    def acquire(
+        self, bug: Bug, modified_file: str, checkout: Callable[[str], bool]
+    ) -> Workspace:
+        """
+        Returns a workspace of the bug for the calling thread, with `modified_file` in its original state.
+        If the thread has no workspace for the bug yet, one is created by calling `checkout` with its path.
+        """
+        workspaces = self.__get_thread_workspaces()
+        workspace = workspaces.get(bug.get_identifier())
+
+        if workspace is not None and workspace.modified_file == modified_file:
+            workspaces.move_to_end(bug.get_identifier())
+            workspace.restore()
+            return workspace
+
+        if workspace is not None:
+            self.discard(bug)
+        while len(workspaces) >= self.capacity:
+            _, evicted = workspaces.popitem(last=False)
+            shutil.rmtree(evicted.path, ignore_errors=True)
+
+        path = str(
+            Path(
+                self.path,
+                f"worker-{threading.get_ident()}",
+                bug.benchmark.get_identifier(),
+                bug.get_identifier(),
+            )
+        )
+        shutil.rmtree(path, ignore_errors=True)
+        checkout(path)
+        workspace = Workspace(path, modified_file)
+        workspaces[bug.get_identifier()] = workspace
+        return workspace
+
+    def discard(self, bug: Bug) -> None:
+        """
+        Removes the calling thread's workspace of the bug, e.g. when it may be in an inconsistent state.
+        """
+        workspace = self.__get_thread_workspaces().pop(bug.get_identifier(), None)
+        if workspace is not None:
+            shutil.rmtree(workspace.path, ignore_errors=True)
+
+    def clear(self) -> None:
+        """
+        Removes the workspaces of all threads.
+        """
+        with self.lock:
+            workspaces: List[Workspace] = [
+                workspace
+                for thread_workspaces in self.workspaces.values()
+                for workspace in thread_workspaces.values()
+            ]
+            self.workspaces = {}
+        for workspace in workspaces:
+            shutil.rmtree(workspace.path, ignore_errors=True)
+        logging.info(f"Removed {len(workspaces)} workspaces from {self.path}")
@@ -1,21 +1,19 @@
 from elleelleaime.core.benchmarks.benchmark import Benchmark
-from elleelleaime.core.benchmarks.defects4j.defects4j import Defects4J
-from elleelleaime.core.benchmarks.humanevaljava.humanevaljava import HumanEvalJava
-from elleelleaime.core.benchmarks.quixbugs.quixbugs import QuixBugs
-from elleelleaime.core.benchmarks.gitbugjava.gitbugjava import GitBugJava
+from elleelleaime.core.utils.imports import import_object
 
 from typing import Optional
 
+# Benchmarks are only imported when they are requested
 benchmarks = {
-    "Defects4J": Defects4J,
-    "HumanEvalJava": HumanEvalJava,
-    "QuixBugs": QuixBugs,
-    "GitBugJava": GitBugJava,
+    "Defects4J": "elleelleaime.core.benchmarks.defects4j.defects4j.Defects4J",
+    "HumanEvalJava": "elleelleaime.core.benchmarks.humanevaljava.humanevaljava.HumanEvalJava",
+    "QuixBugs": "elleelleaime.core.benchmarks.quixbugs.quixbugs.QuixBugs",
+    "GitBugJava": "elleelleaime.core.benchmarks.gitbugjava.gitbugjava.GitBugJava",
 }
 
 
 def get_benchmark(benchmark: str) -> Optional[Benchmark]:
     for b in benchmarks:
         if benchmark.lower() == b.lower():
-            return benchmarks[b]()
+            return import_object(benchmarks[b])()
     return None
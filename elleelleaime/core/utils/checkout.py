@@ -0,0 +1,63 @@
+import shutil
+import getpass
+import tempfile
+
+from uuid import uuid4
+from pathlib import Path
+from typing import Dict
+
+from elleelleaime.core.benchmarks.bug import Bug
+from elleelleaime.core.utils.java.classindex import JavaClassIndex
+
+
+class BugCheckout:
+    """
+    Buggy and fixed checkouts of a bug, shared by several steps that only read them.
+
+    Each version is checked out the first time it is requested, and both are removed when the context exits.
+    The test class index of each version is built once, the first time it is requested.
+    """
+
+    def __init__(self, bug: Bug):
+        self.bug = bug
+        self.paths: Dict[bool, Path] = {}
+        self.test_class_indexes: Dict[bool, JavaClassIndex] = {}
+
+    def get_path(self, fixed: bool = False) -> Path:
+        """
+        Returns the path of the checkout of the buggy (or fixed) version, checking it out if needed.
+        """
+        if fixed not in self.paths:
+            path = Path(
+                tempfile.gettempdir(),
+                f"elleelleaime-{getpass.getuser()}",
+                self.bug.get_identifier(),
+                str(uuid4()),
+            )
+            # Record the path first, so that a failed checkout is still cleaned up
+            self.paths[fixed] = path
+            self.bug.checkout(str(path), fixed=fixed)
+        return self.paths[fixed]
+
+    def get_test_class_index(self, fixed: bool = False) -> JavaClassIndex:
+        """
+        Returns the index of the test classes of the buggy (or fixed) version, building it if needed.
+        """
+        if fixed not in self.test_class_indexes:
+            path = self.get_path(fixed=fixed)
+            self.test_class_indexes[fixed] = JavaClassIndex(
+                Path(path, self.bug.get_src_test_dir(str(path)))
+            )
+        return self.test_class_indexes[fixed]
+
+    def close(self) -> None:
+        for path in self.paths.values():
+            shutil.rmtree(path, ignore_errors=True)
+        self.paths = {}
+        self.test_class_indexes = {}
+
+    def __enter__(self) -> "BugCheckout":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
@@ -0,0 +1,44 @@
+import os
+
+from concurrent.futures import ThreadPoolExecutor
+
+UTF8_BOM = b"\xef\xbb\xbf"
+
+
+def normalize_file_line_endings(file_path: str) -> bool:
+    """
+    Converts the line endings of a text file to unix and removes its UTF-8 BOM, like dos2unix.
+    Binary files are left untouched. Returns whether the file was rewritten.
+    """
+    with open(file_path, "rb") as f:
+        content = f.read()
+
+    # Same heuristic as dos2unix: files with NUL bytes are binary
+    if b"\x00" in content:
+        return False
+    if b"\r\n" not in content and not content.startswith(UTF8_BOM):
+        return False
+
+    if content.startswith(UTF8_BOM):
+        content = content[len(UTF8_BOM) :]
+    with open(file_path, "wb") as f:
+        f.write(content.replace(b"\r\n", b"\n"))
+    return True
+
+
+def normalize_line_endings(path: str, n_workers: int = 4) -> int:
+    """
+    Normalizes the line endings of all text files under `path`, skipping symlinks and git metadata.
+    Returns the number of rewritten files.
+    """
+    file_paths = []
+    for root, dirs, files in os.walk(path):
+        if ".git" in dirs:
+            dirs.remove(".git")
+        for name in files:
+            file_path = os.path.join(root, name)
+            if not os.path.islink(file_path):
+                file_paths.append(file_path)
+
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        return sum(executor.map(normalize_file_line_endings, file_paths))
@@ -0,0 +1,13 @@
+import importlib
+
+from typing import Any
+
+
+def import_object(path: str) -> Any:
+    """
+    Imports and returns the object at the dotted `path` (e.g. "package.module.Class").
+
+    Registries use this to only import a backend (and its dependencies) once it is actually used.
+    """
+    module_name, _, object_name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), object_name)
@@ -0,0 +1,90 @@
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.PrintStream;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.nio.charset.StandardCharsets;
+import java.security.Permission;
+import java.util.jar.JarFile;
+
+/**
+ * Runs the main class of a jar for many requests in a single JVM.
+ *
+ * <p>Usage: java -cp tool.jar JarServer.java tool.jar
+ *
+ * <p>Each line read from stdin holds the tab-separated arguments of one invocation of the main
+ * method. For each request, the server writes "status length\n" followed by `length` bytes with
+ * what the invocation printed to stdout. The status is 0 on success, the requested exit code if
+ * the tool called System.exit, and -1 if it threw an exception.
+ */
+public class JarServer {
+    static class ExitException extends SecurityException {
+        final int status;
+
+        ExitException(int status) {
+            super("exit " + status);
+            this.status = status;
+        }
+    }
+
+    public static void main(String[] args) throws Exception {
+        String mainClassName;
+        try (JarFile jar = new JarFile(args[0])) {
+            mainClassName = jar.getManifest().getMainAttributes().getValue("Main-Class");
+        }
+        Method main = Class.forName(mainClassName).getMethod("main", String[].class);
+
+        // Tools call System.exit when they are done, which must not stop the server
+        System.setSecurityManager(
+                new SecurityManager() {
+                    @Override
+                    public void checkPermission(Permission permission) {}
+
+                    @Override
+                    public void checkPermission(Permission permission, Object context) {}
+
+                    @Override
+                    public void checkExit(int status) {
+                        throw new ExitException(status);
+                    }
+                });
+
+        PrintStream stdout =
+                new PrintStream(new FileOutputStream(FileDescriptor.out), false, "UTF-8");
+        BufferedReader stdin =
+                new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String line;
+        while ((line = stdin.readLine()) != null) {
+            String[] request = line.isEmpty() ? new String[0] : line.split("\t", -1);
+            ByteArrayOutputStream buffer = new ByteArrayOutputStream();
+            int status = 0;
+            System.setOut(new PrintStream(buffer, true, "UTF-8"));
+            try {
+                main.invoke(null, (Object) request);
+            } catch (InvocationTargetException e) {
+                if (e.getCause() instanceof ExitException) {
+                    status = ((ExitException) e.getCause()).status;
+                } else {
+                    status = -1;
+                    e.getCause().printStackTrace();
+                }
+            } catch (ExitException e) {
+                status = e.status;
+            } finally {
+                System.out.flush();
+                System.setOut(stdout);
+            }
+
+            byte[] payload = buffer.toByteArray();
+            stdout.write((status + " " + payload.length + "\n").getBytes(StandardCharsets.UTF_8));
+            stdout.write(payload);
+            stdout.flush();
+        }
+
+        // Tools may leave non-daemon threads behind, and System.exit is blocked
+        Runtime.getRuntime().halt(0);
+    }
+}
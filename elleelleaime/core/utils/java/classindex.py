@@ -0,0 +1,59 @@
+import os
+import logging
+
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class JavaClassIndex:
+    """
+    Index of the Java classes under a directory, mapping class names to the files declaring them.
+
+    Classes are indexed by every dotted suffix of their path relative to the directory
+    (e.g. `src/test/java/org/foo/BarTest.java` is indexed as `BarTest`, `foo.BarTest`, `org.foo.BarTest`, ...),
+    so a fully qualified class name is found regardless of where the source root is.
+    The directory is walked once, when the index is built.
+    """
+
+    def __init__(self, base_dir: Path):
+        self.base_dir = Path(base_dir)
+        self.classes: Dict[str, List[Path]] = {}
+
+        for root, dirs, files in os.walk(self.base_dir):
+            # Hidden directories (e.g. .git) do not contain sources
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            parts = Path(root).relative_to(self.base_dir).parts
+            for file in files:
+                if not file.endswith(".java"):
+                    continue
+                path = Path(root, file)
+                names = [*parts, file[: -len(".java")]]
+                for i in range(len(names)):
+                    self.classes.setdefault(".".join(names[i:]), []).append(path)
+
+    def get_candidates(self, class_name: str) -> List[Path]:
+        """
+        Returns the files declaring `class_name`, in a deterministic order:
+        files under a `test` directory first, then the shallowest, then by path.
+        """
+
+        def key(path: Path):
+            parts = path.relative_to(self.base_dir).parts
+            return ("test" not in parts, len(parts), path.as_posix())
+
+        return sorted(self.classes.get(class_name, []), key=key)
+
+    def find(self, class_name: str) -> Optional[Path]:
+        """
+        Returns the file declaring `class_name`, or None if there is none.
+        If several files match, the first candidate (see `get_candidates`) is returned.
+        """
+        candidates = self.get_candidates(class_name)
+        if len(candidates) == 0:
+            logging.error(f"No test class found for {class_name}")
+            return None
+        elif len(candidates) > 1:
+            logging.warning(
+                f"Multiple test classes found for {class_name}, using {candidates[0]}"
+            )
+        return candidates[0]
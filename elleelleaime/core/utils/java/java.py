@@ -1,13 +1,15 @@
 from typing import Optional, Tuple, List
 from unidiff import PatchSet
-from uuid import uuid4
 from pathlib import Path
 import logging
-import getpass, tempfile, difflib, shutil
+import difflib
 import subprocess
 import re
 
 from elleelleaime.core.benchmarks.bug import Bug, RichBug
+from elleelleaime.core.utils.java.server import JavaJarServer
+from elleelleaime.core.utils.java.classindex import JavaClassIndex
+from elleelleaime.core.utils.checkout import BugCheckout
 
 
 def compute_diff(
@@ -30,6 +32,33 @@ def compute_diff(
     )
 
 
+def compute_file_diff(
+    source: str, target: str, source_file: str, target_file: str
+) -> str:
+    """
+    Computes the unified diff between the contents of two files, in the format of `diff --unified`.
+    """
+
+    def split_lines(content: str) -> List[str]:
+        if content == "":
+            return []
+        lines = [line + "\n" for line in content.split("\n")]
+        if content.endswith("\n"):
+            lines.pop()
+        elif len(lines) > 0:
+            lines[-1] = lines[-1][:-1] + "\n\\ No newline at end of file\n"
+        return lines
+
+    return "".join(
+        difflib.unified_diff(
+            split_lines(source),
+            split_lines(target),
+            fromfile=source_file,
+            tofile=target_file,
+        )
+    )
+
+
 # Check if the computed diff is equivalent to the original diff
 def assert_same_diff(
     original_diff: PatchSet, function_diff: List[str], original_inverted: bool = False
@@ -140,173 +169,190 @@ def get_modified_target_lines(diff: PatchSet) -> List[int]:
     return added_lines if len(added_lines) > 0 else context_lines
 
 
-def extract_single_function(bug: Bug) -> Optional[Tuple[str, str]]:
+# Exit statuses of `docker run` when the container could not run (125-127) or was killed (137, e.g. out of memory)
+DOCKER_ERRORS = {125, 126, 127, 137}
+
+
+class ExtractorError(Exception):
+    """
+    Raised when the extractor could not run, as opposed to running and finding nothing to extract.
     """
-    Extracts the buggy and fixed code of single-function bugs.
-    Returns None is bug is not single-function
 
-    Args:
-        bug (Bug): THe bug to extract the code from
+    pass
 
-    Returns:
-        Optional[Tuple[str, str]]: None if the bug is not single-function, otherwise a tuple of the form (buggy_code, fixed_code)
+
+def run_extractor(requests: List[List[str]]) -> List[Optional[str]]:
     """
-    buggy_path = Path(
-        tempfile.gettempdir(),
-        f"elleelleaime-{getpass.getuser()}",
-        bug.get_identifier(),
-        str(uuid4()),
-    )
-    fixed_path = Path(
-        tempfile.gettempdir(),
-        f"elleelleaime-{getpass.getuser()}",
-        bug.get_identifier(),
-        str(uuid4()),
-    )
+    Runs extractor.jar with the arguments of each request, and returns the outputs in order (None for failed requests).
 
+    The requests are sent in a single batch to the calling thread's long-lived extractor JVM,
+    falling back to one container per request if the server fails.
+    Files given with `-i` must be under the temporary directory, which is mounted in the server's container.
+    Raises ExtractorError if a fallback container could not run, so that such failures are never taken for results.
+    """
     try:
-        # Checkout the buggy and fixed versions of the bug
-        bug.checkout(str(buggy_path), fixed=False)
-        bug.checkout(str(fixed_path), fixed=True)
-
-        # Note: this diff is inverted, i.e. the target file is the buggy file
-        diff = PatchSet(bug.get_ground_truth())
-
-        if bug.is_ground_truth_inverted():
-            buggy_file_path = Path(buggy_path, get_target_filename(diff))
-            modified_buggy_lines = get_modified_target_lines(diff)
-            fixed_file_path = Path(fixed_path, get_source_filename(diff))
-            modified_fixed_lines = get_modified_source_lines(diff)
-        else:
-            buggy_file_path = Path(buggy_path, get_source_filename(diff))
-            modified_buggy_lines = get_modified_source_lines(diff)
-            fixed_file_path = Path(fixed_path, get_target_filename(diff))
-            modified_fixed_lines = get_modified_target_lines(diff)
+        return [
+            output if status == 0 else None
+            for status, output in JavaJarServer.get_server("extractor.jar").call_batch(
+                requests
+            )
+        ]
+    except Exception as e:
+        logging.warning(f"Extractor server failed, falling back to one-off runs: {e}")
 
-        # Run code extractor for the buggy function
-        lines_args = " ".join([f"--lines {line}" for line in modified_buggy_lines])
+    outputs = []
+    for args in requests:
+        input_path = Path(args[args.index("-i") + 1])
         run = subprocess.run(
-            f'docker run --rm --volume ".:/elleelleaime" --volume "{buggy_file_path.parent.absolute()}:{buggy_file_path.parent.absolute()}" --workdir "/elleelleaime"'
-            + f" openjdk:11 java -jar extractor.jar -i {buggy_file_path.absolute()} {lines_args}",
+            f'docker run --rm --volume ".:/elleelleaime" --volume "{input_path.parent.absolute()}:{input_path.parent.absolute()}" --workdir "/elleelleaime"'
+            + f" openjdk:11 java -jar extractor.jar {' '.join(args)}",
             shell=True,
             capture_output=True,
         )
-        if run.returncode != 0:
-            buggy_code = ""
-        else:
-            buggy_code = run.stdout.decode("utf-8")
+        if run.returncode in DOCKER_ERRORS:
+            raise ExtractorError(
+                f"Extractor container failed with status {run.returncode}: {run.stderr.decode('utf-8')}"
+            )
+        outputs.append(run.stdout.decode("utf-8") if run.returncode == 0 else None)
+    return outputs
 
-        # Run code extractor for the fixed function
-        lines_args = " ".join([f"--lines {line}" for line in modified_fixed_lines])
-        run = subprocess.run(
-            f'docker run --rm --volume ".:/elleelleaime" --volume "{fixed_file_path.parent.absolute()}:{fixed_file_path.parent.absolute()}" --workdir "/elleelleaime"'
-            + f" openjdk:11 java -jar extractor.jar -i {fixed_file_path.absolute()} {lines_args}",
-            shell=True,
-            capture_output=True,
-        )
-        if run.returncode != 0:
-            fixed_code = ""
-        else:
-            fixed_code = run.stdout.decode("utf-8")
-
-        # HACK: sometimes we are not able to properly retrieve the code at the function-level
-        # This happens in cases suchas Closure-46 where a whole function is removed
-        # To detected and circumvent such cases, we check that the function_diff is equivalent to the original diff
-        # If the diffs are not equivalent, we try to fix the function diff by setting the fixed_code and buggy_code to empty
-        # If on of these works we assume it as correct (since the diff is now equivalent to the original one)
-        fdiff = compute_diff(buggy_code, fixed_code)
-        if not assert_same_diff(
+
+def extract_single_function(
+    bug: Bug, checkout: Optional[BugCheckout] = None
+) -> Optional[Tuple[str, str]]:
+    """
+    Extracts the buggy and fixed code of single-function bugs.
+    Returns None is bug is not single-function
+
+    Args:
+        bug (Bug): THe bug to extract the code from
+        checkout (Optional[BugCheckout]): Checkouts of the bug shared with other steps. If None, the bug is checked out and removed afterwards
+
+    Returns:
+        Optional[Tuple[str, str]]: None if the bug is not single-function, otherwise a tuple of the form (buggy_code, fixed_code)
+    """
+    if checkout is None:
+        with BugCheckout(bug) as checkout:
+            return extract_single_function(bug, checkout)
+
+    # Checkout the buggy and fixed versions of the bug
+    buggy_path = checkout.get_path(fixed=False)
+    fixed_path = checkout.get_path(fixed=True)
+
+    # Note: this diff is inverted, i.e. the target file is the buggy file
+    diff = PatchSet(bug.get_ground_truth())
+
+    if bug.is_ground_truth_inverted():
+        buggy_file_path = Path(buggy_path, get_target_filename(diff))
+        modified_buggy_lines = get_modified_target_lines(diff)
+        fixed_file_path = Path(fixed_path, get_source_filename(diff))
+        modified_fixed_lines = get_modified_source_lines(diff)
+    else:
+        buggy_file_path = Path(buggy_path, get_source_filename(diff))
+        modified_buggy_lines = get_modified_source_lines(diff)
+        fixed_file_path = Path(fixed_path, get_target_filename(diff))
+        modified_fixed_lines = get_modified_target_lines(diff)
+
+    # Run code extractor for the buggy and fixed functions
+    buggy_code, fixed_code = run_extractor(
+        [
+            ["-i", str(file_path.absolute())]
+            + [arg for line in lines for arg in ["--lines", str(line)]]
+            for file_path, lines in [
+                (buggy_file_path, modified_buggy_lines),
+                (fixed_file_path, modified_fixed_lines),
+            ]
+        ]
+    )
+    buggy_code = buggy_code if buggy_code is not None else ""
+    fixed_code = fixed_code if fixed_code is not None else ""
+
+    # HACK: sometimes we are not able to properly retrieve the code at the function-level
+    # This happens in cases suchas Closure-46 where a whole function is removed
+    # To detected and circumvent such cases, we check that the function_diff is equivalent to the original diff
+    # If the diffs are not equivalent, we try to fix the function diff by setting the fixed_code and buggy_code to empty
+    # If on of these works we assume it as correct (since the diff is now equivalent to the original one)
+    fdiff = compute_diff(buggy_code, fixed_code)
+    if not assert_same_diff(
+        diff, fdiff, original_inverted=bug.is_ground_truth_inverted()
+    ):
+        fdiff = compute_diff(buggy_code, "")
+        if assert_same_diff(
             diff, fdiff, original_inverted=bug.is_ground_truth_inverted()
         ):
-            fdiff = compute_diff(buggy_code, "")
+            fixed_code = ""
+        else:
+            fdiff = compute_diff("", fixed_code)
             if assert_same_diff(
                 diff, fdiff, original_inverted=bug.is_ground_truth_inverted()
             ):
-                fixed_code = ""
+                buggy_code = ""
             else:
-                fdiff = compute_diff("", fixed_code)
-                if assert_same_diff(
-                    diff, fdiff, original_inverted=bug.is_ground_truth_inverted()
-                ):
-                    buggy_code = ""
-                else:
-                    return None
-
-        return buggy_code, fixed_code
+                return None
 
-    finally:
-        # Remove the checked-out bugs
-        shutil.rmtree(buggy_path, ignore_errors=True)
-        shutil.rmtree(fixed_path, ignore_errors=True)
+    return buggy_code, fixed_code
 
 
-def find_test_class(path: Path, bug, class_name: str) -> Optional[Path]:
-    # Get the base test directory
-    base_test_dir = Path(path, bug.get_src_test_dir(str(path)))
-
-    # Convert class name to the relative path format
-    class_relative_path = f"{class_name.replace('.', '/')}.java"
+def find_test_class(
+    path: Path, bug, class_name: str, index: Optional[JavaClassIndex] = None
+) -> Optional[Path]:
+    """
+    Finds the file of a test class in a checkout of the bug.
 
-    # Iterate through all the subdirectories under the base test directory
-    candidates = []
-    for java_file in base_test_dir.rglob("*.java"):
-        # Check if the file ends with the class relative path
-        if java_file.as_posix().endswith(class_relative_path):
-            candidates.append(
-                java_file
-            )  # Return the full path to the matched Java file
+    Args:
+        path (Path): The path of the checkout
+        bug (Bug): The bug the checkout belongs to
+        class_name (str): The fully qualified name of the test class
+        index (Optional[JavaClassIndex]): Index of the test classes of the checkout. If None, it is built for this lookup
 
-    if len(candidates) == 0:
-        logging.error(f"No test class found for {class_name}")
-        return None
-    elif len(candidates) == 1:
-        return candidates[0]
-    else:
-        logging.error(f"Multiple test classes found for {class_name}")
-        return None
+    Returns:
+        Optional[Path]: The path of the test class, or None if it is not found
+    """
+    if index is None:
+        index = JavaClassIndex(Path(path, bug.get_src_test_dir(str(path))))
+    return index.find(class_name)
 
 
-def extract_failing_test_cases(bug: RichBug) -> dict[str, str]:
+def extract_failing_test_cases(
+    bug: RichBug, checkout: Optional[BugCheckout] = None
+) -> dict[str, str]:
     """
     Extracts the code of the failing test cases of a bug.
 
     Args:
         bug (Bug): The bug to extract the failing test cases from
+        checkout (Optional[BugCheckout]): Checkouts of the bug shared with other steps. If None, the bug is checked out and removed afterwards
 
     Returns:
         dict[str, str]: A dictionary mapping failing test cases to their code
     """
-    failing_test_cases = {}
-    failing_tests = bug.get_failing_tests()
-
+    if checkout is None:
+        with BugCheckout(bug) as checkout:
+            return extract_failing_test_cases(bug, checkout)
+
+    failing_tests = list(bug.get_failing_tests())
+    if len(failing_tests) == 0:
+        return {}
+
+    # All failing test cases are extracted from the same checkout of the buggy version
+    path = checkout.get_path(fixed=False)
+    index = checkout.get_test_class_index(fixed=False)
+    requests = []
     for failing_test in failing_tests:
         class_name, method_name = failing_test.split("::")
-
-        path = Path(
-            tempfile.gettempdir(),
-            f"elleelleaime-{getpass.getuser()}",
-            bug.get_identifier(),
-            str(uuid4()),
+        test_class_path = find_test_class(path, bug, class_name, index)
+        if test_class_path is None:
+            return {}
+        requests.append(
+            ["-i", str(test_class_path.absolute()), "--method", method_name]
         )
-        try:
-            bug.checkout(str(path), fixed=False)
-            test_class_path = find_test_class(path, bug, class_name)
-            if test_class_path is None:
-                return {}
-
-            # Run code extractor for the failing test case
-            run = subprocess.run(
-                f'docker run --rm --volume ".:/elleelleaime" --volume "{test_class_path.parent.absolute()}:{test_class_path.parent.absolute()}" --workdir "/elleelleaime"'
-                + f" openjdk:11 java -jar extractor.jar -i {test_class_path.absolute()} --method {method_name}",
-                shell=True,
-                capture_output=True,
-            )
-            if run.returncode == 0:
-                failing_test_cases[failing_test] = run.stdout.decode("utf-8")
-            else:
-                return {}
-        finally:
-            shutil.rmtree(path, ignore_errors=True)
+
+    # Run code extractor for all failing test cases at once
+    failing_test_cases = {}
+    for failing_test, test_code in zip(failing_tests, run_extractor(requests)):
+        if test_code is None:
+            return {}
+        failing_test_cases[failing_test] = test_code
 
     return failing_test_cases
 
@@ -391,3 +437,35 @@ def remove_java_comments(source: str) -> Optional[str]:
 def remove_empty_lines(source):
     """Remove all empty lines from Java source code."""
     return re.sub(r"^\s*$\n", "", source, flags=re.MULTILINE)
+
+
+JAVA_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<comment>//[^\n]*|/\*.*?\*/)
+    | (?P<text_block>\"\"\"(?:\\.|[^\\])*?\"\"\")
+    | (?P<string>"(?:\\.|[^"\\\n])*")
+    | (?P<char>'(?:\\.|[^'\\\n])+')
+    | (?P<number>\.?\d(?:[eEpP][+-]|[\w.])*)
+    | (?P<identifier>[^\W\d][\w$]*|\$[\w$]*)
+    | (?P<operator>>>>=|<<=|>>=|>>>|\.\.\.|->|::|\+\+|--|&&|\|\||[=!<>+\-*/&|^%]=|<<|>>|[{}()\[\];,.@=<>!~?:+\-*/&|^%])
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+def tokenize_java(source: str) -> Optional[List[str]]:
+    """
+    Splits Java source code into tokens, dropping whitespace and comments.
+    Returns None if the code contains something that cannot be tokenized (e.g. an unterminated string literal).
+    """
+    tokens = []
+    position = 0
+    while position < len(source):
+        match = JAVA_TOKEN_PATTERN.match(source, position)
+        if match is None:
+            return None
+        if match.lastgroup not in {"space", "comment"}:
+            tokens.append(match.group())
+        position = match.end()
+    return tokens
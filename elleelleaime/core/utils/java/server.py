@@ -0,0 +1,190 @@
+import os
+import time
+import atexit
+import select
+import logging
+import tempfile
+import threading
+import subprocess
+
+from uuid import uuid4
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+SERVER_SOURCE = Path(__file__).parent / "JarServer.java"
+
+
+class JavaJarServer:
+    """
+    Long-lived JVM that runs the main class of a jar for many requests, see JarServer.java.
+
+    The JVM runs in an openjdk:11 container, like the one-shot `docker run ... java -jar` invocations it replaces.
+    The current directory is mounted at /elleelleaime (where the jars live), and the temporary directory and
+    `mounts` are mounted at the same paths, so file arguments can be passed as absolute paths.
+    A server handles one request at a time, so each thread gets its own server (see `get_server`).
+    """
+
+    __SERVERS: List["JavaJarServer"] = []
+    __SERVERS_LOCK = threading.Lock()
+    __LOCAL = threading.local()
+
+    def __init__(self, jar: str, mounts: Iterable[str] = ()):
+        self.jar = jar
+        self.mounts = sorted({tempfile.gettempdir(), *map(str, mounts)})
+        self.process: Optional[subprocess.Popen] = None
+        self.name: Optional[str] = None
+
+    @classmethod
+    def get_server(cls, jar: str, mounts: Iterable[str] = ()) -> "JavaJarServer":
+        """
+        Returns the calling thread's server for `jar`, starting it if needed.
+        """
+        servers: Optional[Dict[str, JavaJarServer]] = getattr(
+            cls.__LOCAL, "servers", None
+        )
+        if servers is None:
+            servers = cls.__LOCAL.servers = {}
+        server = servers.get(jar)
+        if server is None or not set(map(str, mounts)).issubset(server.mounts):
+            if server is not None:
+                server.close()
+            server = JavaJarServer(jar, mounts)
+            servers[jar] = server
+            with cls.__SERVERS_LOCK:
+                cls.__SERVERS.append(server)
+        return server
+
+    @classmethod
+    def close_servers(cls) -> None:
+        with cls.__SERVERS_LOCK:
+            servers, cls.__SERVERS = cls.__SERVERS, []
+        for server in servers:
+            server.close()
+
+    def is_running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        # Named containers can be killed when a request hangs, which the docker client alone would not do
+        self.name = f"elleelleaime-{Path(self.jar).stem}-{uuid4()}"
+        volumes = []
+        for mount in [str(SERVER_SOURCE.parent), *self.mounts]:
+            volumes += ["--volume", f"{mount}:{mount}"]
+        self.process = subprocess.Popen(
+            [
+                "docker",
+                "run",
+                "-i",
+                "--rm",
+                "--name",
+                self.name,
+                "--volume",
+                f"{os.getcwd()}:/elleelleaime",
+                *volumes,
+                "--workdir",
+                "/elleelleaime",
+                "openjdk:11",
+                "java",
+                "-cp",
+                self.jar,
+                str(SERVER_SOURCE),
+                self.jar,
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        logging.info(f"Started Java server for {self.jar}")
+
+    def kill(self) -> None:
+        if self.process is None:
+            return
+        subprocess.run(["docker", "kill", self.name], capture_output=True)
+        self.process.kill()
+        self.process.wait()
+        self.process = None
+
+    def close(self) -> None:
+        if self.process is None:
+            return
+        try:
+            if self.process.stdin is not None:
+                self.process.stdin.close()
+            self.process.wait(timeout=10)
+            self.process = None
+        except (OSError, subprocess.TimeoutExpired):
+            self.kill()
+
+    def __read(self, size: Optional[int], deadline: Optional[float]) -> bytes:
+        """
+        Reads `size` bytes, or a line if `size` is None, from the server before the deadline.
+        """
+        assert self.process is not None and self.process.stdout is not None
+        data = b""
+        fd = self.process.stdout.fileno()
+        while (size is None and not data.endswith(b"\n")) or (
+            size is not None and len(data) < size
+        ):
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                    raise TimeoutError(f"Java server for {self.jar} timed out")
+            chunk = os.read(fd, 1 if size is None else min(size - len(data), 1 << 16))
+            if len(chunk) == 0:
+                raise EOFError(f"Java server for {self.jar} exited")
+            data += chunk
+        return data
+
+    def call(self, args: List[str], timeout: Optional[float] = 60) -> Tuple[int, str]:
+        """
+        Runs the main class of the jar with `args`, and returns its exit status and stdout.
+        The server is restarted if it died, and killed if the request times out.
+        """
+        return self.call_batch([args], timeout=timeout)[0]
+
+    def call_batch(
+        self, requests: List[List[str]], timeout: Optional[float] = 60
+    ) -> List[Tuple[int, str]]:
+        """
+        Runs several requests back to back, and returns their exit statuses and stdouts in order.
+        The requests are all sent before reading the responses, and `timeout` applies to each request.
+        """
+        if len(requests) == 0:
+            return []
+        assert all(
+            "\t" not in arg and "\n" not in arg for args in requests for arg in args
+        ), "Arguments cannot contain tabs or newlines"
+        if not self.is_running():
+            self.start()
+        assert self.process is not None and self.process.stdin is not None
+
+        # Write from another thread, so that large batches cannot deadlock on full pipes
+        stdin = self.process.stdin
+        payload = "".join("\t".join(args) + "\n" for args in requests).encode("utf-8")
+
+        def write():
+            try:
+                stdin.write(payload)
+                stdin.flush()
+            except OSError:
+                pass
+
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        responses = []
+        try:
+            for _ in requests:
+                deadline = time.monotonic() + timeout if timeout is not None else None
+                status, length = self.__read(None, deadline).decode("utf-8").split()
+                output = self.__read(int(length), deadline).decode("utf-8")
+                responses.append((int(status), output))
+        except BaseException:
+            # The server is in an unknown state, start a new one for the next request
+            self.kill()
+            raise
+        finally:
+            writer.join()
+        return responses
+
+
+atexit.register(JavaJarServer.close_servers)
@@ -2,6 +2,7 @@ from typing import Iterable, Dict
 import gzip
 import json
 import os
+import threading
 
 """
 Code from HumanEval:
@@ -44,3 +45,50 @@ def write_jsonl(filename: str, data: Iterable[Dict], append: bool = False):
         with open(filename, mode) as fp:
             for x in data:
                 fp.write((json.dumps(x) + "\n").encode("utf-8"))
+
+
+class JsonlAppender:
+    """
+    Appends dictionaries to a (non-compressed) jsonl file, durably and one line at a time.
+
+    Each line is flushed and synced to disk before `write` returns, so a crash loses at most the line being written.
+    Writes from several threads are serialized.
+    """
+
+    def __init__(self, filename: str, append: bool = True):
+        self.filename = os.path.expanduser(filename)
+        self.lock = threading.Lock()
+        self.fp = open(self.filename, "ab" if append else "wb")
+
+    def write(self, x: Dict) -> None:
+        line = (json.dumps(x) + "\n").encode("utf-8")
+        with self.lock:
+            self.fp.write(line)
+            self.fp.flush()
+            os.fsync(self.fp.fileno())
+
+    def close(self) -> None:
+        with self.lock:
+            self.fp.close()
+
+    def __enter__(self) -> "JsonlAppender":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+def stream_jsonl_safe(filename: str) -> Iterable[Dict]:
+    """
+    Like `stream_jsonl`, but skips a truncated last line (e.g. left by a crash while appending).
+    """
+    with open(filename, "r") as fp:
+        lines = fp.readlines()
+    for i, line in enumerate(lines):
+        if not any(not x.isspace() for x in line):
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            if i != len(lines) - 1:
+                raise
@@ -0,0 +1,270 @@
+import os
+import math
+import time
+import shutil
+import signal
+import logging
+import threading
+import functools
+import itertools
+import contextlib
+import subprocess
+
+from typing import Iterator, List, Optional, Tuple, Union
+
+# Stats of the commands run by each thread, see `collect_stats`
+_stats = threading.local()
+# Seconds to wait for the outputs of a command once it is killed on timeout
+READER_TIMEOUT = 5.0
+
+
+class ResourceLimits:
+    """
+    Memory (in bytes) and CPU (in cores) limits of each limited command.
+    """
+
+    def __init__(self, memory: Optional[int] = None, cpus: Optional[float] = None):
+        self.memory = memory
+        self.cpus = cpus
+
+    def is_empty(self) -> bool:
+        return self.memory is None and self.cpus is None
+
+    def __repr__(self) -> str:
+        return f"ResourceLimits(memory={self.memory}, cpus={self.cpus})"
+
+
+_limits = ResourceLimits()
+# Round-robin counter used to spread affinity-limited commands over the cores
+_affinity_counter = itertools.count()
+
+
+def parse_size(size: Union[int, float, str]) -> int:
+    """
+    Parses a size in bytes, optionally with a K, M, G or T suffix (e.g. "4G").
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+    size = size.strip().upper().removesuffix("B")
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+    if size and size[-1] in units:
+        return int(float(size[:-1]) * units[size[-1]])
+    return int(size)
+
+
+def set_limits(
+    memory: Optional[Union[int, str]] = None, cpus: Optional[float] = None
+) -> None:
+    """
+    Sets the limits applied to the commands run with `run(..., limited=True)`.
+    """
+    global _limits
+    _limits = ResourceLimits(
+        parse_size(memory) if memory is not None else None,
+        float(cpus) if cpus is not None else None,
+    )
+    logging.info(f"Limiting compile and test commands to {_limits}")
+
+
+def get_limits() -> ResourceLimits:
+    return _limits
+
+
+@functools.lru_cache(maxsize=None)
+def get_systemd_run() -> Optional[Tuple[str, ...]]:
+    """
+    Returns the systemd-run command that can place commands in a transient cgroup scope, if any.
+    """
+    if shutil.which("systemd-run") is None:
+        return None
+    candidates = [("systemd-run", "--user", "--scope", "--quiet")]
+    if os.geteuid() == 0:
+        candidates.append(("systemd-run", "--scope", "--quiet"))
+    for candidate in candidates:
+        check = subprocess.run(
+            [*candidate, "-p", "MemoryMax=infinity", "true"], capture_output=True
+        )
+        if check.returncode == 0:
+            return candidate
+    return None
+
+
+def get_docker_flags() -> str:
+    """
+    Returns the `docker run` flags that apply the current limits to a container.
+    """
+    flags = []
+    if _limits.memory is not None:
+        flags.append(f"--memory {_limits.memory}")
+    if _limits.cpus is not None:
+        flags.append(f"--cpus {_limits.cpus}")
+    return " ".join(flags)
+
+
+def apply_limits(args, shell: bool, env: Optional[dict]) -> Tuple[list, dict]:
+    """
+    Wraps the command so that it runs under the current limits.
+
+    When systemd-run can create cgroup scopes, the limits are enforced by the kernel (MemoryMax, CPUQuota).
+    Otherwise, the data segment of each process is capped with prlimit, the command is pinned to a subset
+    of the cores with taskset, and JVMs are told the available memory and cores through JAVA_TOOL_OPTIONS
+    so that they size their heap and threads accordingly.
+    """
+    if shell:
+        args = ["/bin/sh", "-c", args]
+    elif isinstance(args, str):
+        args = [args]
+    env = dict(os.environ if env is None else env)
+
+    systemd_run = get_systemd_run()
+    if systemd_run is not None:
+        properties = []
+        if _limits.memory is not None:
+            properties += ["-p", f"MemoryMax={_limits.memory}", "-p", "MemorySwapMax=0"]
+        if _limits.cpus is not None:
+            properties += ["-p", f"CPUQuota={int(_limits.cpus * 100)}%"]
+        return [*systemd_run, *properties, "--", *args], env
+
+    java_options = []
+    if _limits.memory is not None:
+        java_options.append(f"-XX:MaxRAM={_limits.memory}")
+        # RLIMIT_DATA only counts committed memory, unlike RLIMIT_AS which breaks the JVM's address space reservations
+        if shutil.which("prlimit") is not None:
+            args = ["prlimit", f"--data={_limits.memory}", *args]
+    if _limits.cpus is not None:
+        n_cpus = max(1, math.ceil(_limits.cpus))
+        java_options.append(f"-XX:ActiveProcessorCount={n_cpus}")
+        cpus = sorted(os.sched_getaffinity(0))
+        if shutil.which("taskset") is not None and n_cpus < len(cpus):
+            start = next(_affinity_counter) * n_cpus
+            selected = [cpus[(start + i) % len(cpus)] for i in range(n_cpus)]
+            args = ["taskset", "-c", ",".join(map(str, selected)), *args]
+    if java_options:
+        env["JAVA_TOOL_OPTIONS"] = " ".join(
+            filter(None, [env.get("JAVA_TOOL_OPTIONS"), *java_options])
+        )
+    return args, env
+
+
+@contextlib.contextmanager
+def collect_stats() -> Iterator[List[dict]]:
+    """
+    Collects the stats of the commands run with `run` by the calling thread.
+    Each command is recorded as a dict with its wall time (seconds), peak RSS (bytes), return code and whether it timed out.
+    """
+    previous = getattr(_stats, "records", None)
+    records: List[dict] = []
+    _stats.records = records
+    try:
+        yield records
+    finally:
+        _stats.records = previous
+
+
+def run(
+    args,
+    shell: bool = False,
+    capture_output: bool = False,
+    check: bool = False,
+    timeout: Optional[float] = None,
+    cwd: Optional[str] = None,
+    env: Optional[dict] = None,
+    limited: bool = False,
+) -> subprocess.CompletedProcess:
+    """
+    Drop-in replacement for `subprocess.run` that also measures the resource usage of the command.
+    If `limited` is set, the command runs under the limits set with `set_limits`.
+
+    The peak RSS is the largest of the command and its descendants that it waited for,
+    so it does not include processes running outside of the process tree (e.g. docker containers).
+    On Linux, it is never lower than the RSS of this process when the command is forked.
+
+    The command runs in its own process group, which is killed as a whole on timeout, so that
+    descendants holding the output pipes (e.g. a shell's children) do not outlive the timeout.
+    """
+    start = time.monotonic()
+    command = args
+    if limited and not _limits.is_empty():
+        command, env = apply_limits(args, shell, env)
+        shell = False
+    process = subprocess.Popen(
+        command,
+        shell=shell,
+        cwd=cwd,
+        env=env,
+        stdout=subprocess.PIPE if capture_output else None,
+        stderr=subprocess.PIPE if capture_output else None,
+        start_new_session=True,
+    )
+
+    # Read the outputs in the background, since the process is reaped with wait4 to get its resource usage
+    outputs = {}
+
+    def read(name, pipe):
+        outputs[name] = pipe.read()
+        pipe.close()
+
+    readers = [
+        threading.Thread(target=read, args=(name, pipe), daemon=True)
+        for name, pipe in [("stdout", process.stdout), ("stderr", process.stderr)]
+        if pipe is not None
+    ]
+    for reader in readers:
+        reader.start()
+
+    # The lock ensures that the process is never killed once it has been reaped (its pid could be reused)
+    lock = threading.Lock()
+    timed_out = False
+
+    def kill_group():
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def kill():
+        nonlocal timed_out
+        with lock:
+            if process.returncode is None:
+                timed_out = True
+                kill_group()
+
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+        with lock:
+            process.returncode = os.waitstatus_to_exitcode(status)
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if process.returncode is None:
+            kill_group()
+            process.wait()
+    for reader in readers:
+        # Descendants that left the process group may still hold the pipes after a timeout
+        reader.join(READER_TIMEOUT if timed_out else None)
+
+    records = getattr(_stats, "records", None)
+    if records is not None:
+        records.append(
+            {
+                "args": args,
+                "wall_time": time.monotonic() - start,
+                # ru_maxrss is in kilobytes on Linux
+                "max_rss": rusage.ru_maxrss * 1024,
+                "returncode": process.returncode,
+                "timed_out": timed_out,
+            }
+        )
+
+    stdout, stderr = outputs.get("stdout"), outputs.get("stderr")
+    if timed_out:
+        raise subprocess.TimeoutExpired(args, timeout, output=stdout, stderr=stderr)
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(
+            process.returncode, args, output=stdout, stderr=stderr
+        )
+    return subprocess.CompletedProcess(args, process.returncode, stdout, stderr)
@@ -0,0 +1,112 @@
+import os
+import time
+import logging
+import threading
+import contextlib
+
+from typing import Dict, Iterable, Iterator, Optional
+
+from elleelleaime.core.benchmarks.benchmark import Benchmark
+from elleelleaime.core.benchmarks.bug import Bug
+
+# Peak memory (in bytes) assumed for a compile/test run when no footprint was recorded
+DEFAULT_FOOTPRINT = 2 << 30
+# Fraction of the available memory that workers may use
+MEMORY_HEADROOM = 0.8
+
+
+def get_cpu_count() -> int:
+    return len(os.sched_getaffinity(0))
+
+
+def get_memory_info() -> Dict[str, int]:
+    """
+    Returns the fields of /proc/meminfo in bytes, or an empty dict if it is not available.
+    """
+    info = {}
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                name, value = line.split(":", 1)
+                fields = value.split()
+                info[name] = int(fields[0]) * (1024 if fields[1:] == ["kB"] else 1)
+    except (OSError, ValueError, IndexError):
+        return {}
+    return info
+
+
+def get_footprint(benchmark: Benchmark, bugs: Iterable[Bug]) -> int:
+    """
+    Returns the largest peak memory (in bytes) recorded in the baselines of the given bugs.
+    """
+    footprints = [benchmark.get_baseline(bug).get("max_rss") for bug in bugs]
+    footprints = [footprint for footprint in footprints if footprint is not None]
+    if len(footprints) == 0:
+        return DEFAULT_FOOTPRINT
+    return max(footprints)
+
+
+def get_auto_workers(footprint: int, memory_limit: Optional[int] = None) -> int:
+    """
+    Returns the number of workers that fit on this machine, i.e. at most one per core,
+    and as many as fit in the available memory given the footprint (or memory limit) of each worker.
+    """
+    n_cpus = get_cpu_count()
+    n_workers = n_cpus
+    available = get_memory_info().get("MemAvailable")
+    if available is not None:
+        per_worker = memory_limit if memory_limit is not None else footprint
+        n_workers = min(n_workers, int(available * MEMORY_HEADROOM // per_worker))
+    n_workers = max(1, n_workers)
+    logging.info(
+        f"Using {n_workers} workers ({n_cpus} cores, {available} bytes available, {footprint} bytes per run)"
+    )
+    return n_workers
+
+
+class ResourceGate:
+    """
+    Delays the start of new tasks while the machine is overloaded, i.e. when the load average exceeds `max_load`
+    or the available memory drops below `min_available_memory`.
+    A task is always allowed to start when no other task is running, so that the evaluation makes progress.
+    """
+
+    def __init__(
+        self,
+        max_load: Optional[float] = None,
+        min_available_memory: Optional[int] = None,
+        interval: float = 5.0,
+    ):
+        self.max_load = max_load if max_load is not None else 1.25 * get_cpu_count()
+        self.min_available_memory = min_available_memory
+        self.interval = interval
+        self.active = 0
+        self.condition = threading.Condition()
+
+    def is_overloaded(self) -> bool:
+        if os.getloadavg()[0] > self.max_load:
+            return True
+        available = get_memory_info().get("MemAvailable")
+        return (
+            self.min_available_memory is not None
+            and available is not None
+            and available < self.min_available_memory
+        )
+
+    @contextlib.contextmanager
+    def slot(self) -> Iterator[None]:
+        with self.condition:
+            start = time.monotonic()
+            while self.active > 0 and self.is_overloaded():
+                self.condition.wait(self.interval)
+            if time.monotonic() - start > self.interval:
+                logging.info(
+                    f"Delayed a task by {time.monotonic() - start:.0f}s because the machine is overloaded"
+                )
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active -= 1
+                self.condition.notify_all()
@@ -0,0 +1,109 @@
+import heapq
+import statistics
+
+from typing import Dict, List
+
+from elleelleaime.core.benchmarks.bug import Bug
+from elleelleaime.core.benchmarks.benchmark import Benchmark
+
+# Rough evaluation time (in seconds) of one candidate, for benchmarks without any recorded baseline
+DEFAULT_CANDIDATE_DURATIONS: Dict[str, float] = {
+    "defects4j": 120.0,
+    "gitbugjava": 300.0,
+    "humanevaljava": 30.0,
+    "quixbugs": 20.0,
+}
+DEFAULT_CANDIDATE_DURATION = 60.0
+
+
+class EvaluationTask:
+    """
+    A group of samples of the same bug, evaluated one after the other by the same worker.
+    """
+
+    def __init__(self, bug: Bug, samples: List[dict], expected_duration: float):
+        self.bug = bug
+        self.samples = samples
+        self.expected_duration = expected_duration
+
+    def __repr__(self) -> str:
+        return f"EvaluationTask({self.bug}, {len(self.samples)} samples, {self.expected_duration:.0f}s)"
+
+
+def count_candidates(sample: dict) -> int:
+    return len([g for g in (sample.get("generation") or []) if g is not None])
+
+
+def get_baseline_duration(baseline: Dict[str, float]) -> float:
+    return baseline.get("compile", 0.0) + baseline.get("test", 0.0)
+
+
+def estimate_candidate_duration(benchmark: Benchmark, bug: Bug) -> float:
+    """
+    Estimates the time (in seconds) to compile and test one candidate of the bug.
+
+    The baseline of the bug is used when it has been recorded. Otherwise, the median baseline of the benchmark is used,
+    or a fixed per-benchmark default if no baseline was recorded at all.
+    """
+    baseline = benchmark.get_baseline(bug)
+    if baseline:
+        return get_baseline_duration(baseline)
+
+    baselines = benchmark.get_manifest("baselines").get("baselines", {})
+    if baselines:
+        return statistics.median(get_baseline_duration(b) for b in baselines.values())
+
+    return DEFAULT_CANDIDATE_DURATIONS.get(
+        benchmark.get_identifier().lower(), DEFAULT_CANDIDATE_DURATION
+    )
+
+
+def schedule(
+    benchmark: Benchmark, samples: List[dict], n_workers: int
+) -> List[EvaluationTask]:
+    """
+    Groups the samples per bug, and returns the resulting tasks longest-expected-first.
+
+    Grouping lets a worker reuse its warm state (e.g. workspaces) across the candidates of a bug.
+    Bugs that would take longer than an even share of the total work are split over several tasks,
+    so that a single bug never serializes the end of the evaluation.
+    """
+    samples_per_bug: Dict[str, List[dict]] = {}
+    for sample in samples:
+        samples_per_bug.setdefault(sample["identifier"], []).append(sample)
+
+    groups = []
+    for identifier, bug_samples in samples_per_bug.items():
+        bug = benchmark.get_bug(identifier)
+        if bug is None:
+            raise ValueError(f"Unknown bug {identifier}")
+        # Samples without candidates still take a little time to process
+        durations = [
+            estimate_candidate_duration(benchmark, bug) * max(count_candidates(s), 0.01)
+            for s in bug_samples
+        ]
+        groups.append((bug, bug_samples, durations))
+
+    share = sum(sum(durations) for _, _, durations in groups) / max(n_workers, 1)
+    tasks = []
+    for bug, bug_samples, durations in groups:
+        task_samples, task_duration = [], 0.0
+        for sample, duration in zip(bug_samples, durations):
+            if task_samples and task_duration + duration > share:
+                tasks.append(EvaluationTask(bug, task_samples, task_duration))
+                task_samples, task_duration = [], 0.0
+            task_samples.append(sample)
+            task_duration += duration
+        tasks.append(EvaluationTask(bug, task_samples, task_duration))
+
+    return sorted(tasks, key=lambda task: task.expected_duration, reverse=True)
+
+
+def predict_makespan(tasks: List[EvaluationTask], n_workers: int) -> float:
+    """
+    Predicts the time (in seconds) to run the tasks in order, each one on the first available worker.
+    """
+    workers = [0.0] * max(n_workers, 1)
+    for task in tasks:
+        heapq.heappush(workers, heapq.heappop(workers) + task.expected_duration)
+    return max(workers)
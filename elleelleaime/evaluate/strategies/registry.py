@@ -1,15 +1,5 @@
 from elleelleaime.evaluate.strategies.strategy import PatchEvaluationStrategy
-from elleelleaime.evaluate.strategies.text.replace import ReplaceEvaluationStrategy
-from elleelleaime.evaluate.strategies.text.instruct import InstructEvaluationStrategy
-from elleelleaime.evaluate.strategies.openai.openai import OpenAIEvaluationStrategy
-from elleelleaime.evaluate.strategies.google.google import GoogleEvaluationStrategy
-from elleelleaime.evaluate.strategies.openrouter.openrouter import (
-    OpenRouterEvaluationStrategy,
-)
-from elleelleaime.evaluate.strategies.anthropic.anthropic import (
-    AnthropicEvaluationStrategy,
-)
-from elleelleaime.evaluate.strategies.mistral.mistral import MistralEvaluationStrategy
+from elleelleaime.core.utils.imports import import_object
 
 
 class PatchEvaluationStrategyRegistry:
@@ -17,18 +7,27 @@ class PatchEvaluationStrategyRegistry:
     Class for storing and retrieving models based on their name.
     """
 
+    # Strategies are only imported and instantiated when they are requested
+    __STRATEGIES: dict[str, str] = {
+        "replace": "elleelleaime.evaluate.strategies.text.replace.ReplaceEvaluationStrategy",
+        "instruct": "elleelleaime.evaluate.strategies.text.instruct.InstructEvaluationStrategy",
+        "openai": "elleelleaime.evaluate.strategies.openai.openai.OpenAIEvaluationStrategy",
+        "google": "elleelleaime.evaluate.strategies.google.google.GoogleEvaluationStrategy",
+        "openrouter": "elleelleaime.evaluate.strategies.openrouter.openrouter.OpenRouterEvaluationStrategy",
+        "anthropic": "elleelleaime.evaluate.strategies.anthropic.anthropic.AnthropicEvaluationStrategy",
+        "mistral": "elleelleaime.evaluate.strategies.mistral.mistral.MistralEvaluationStrategy",
+    }
+
     def __init__(self, **kwargs):
-        self._strategies: dict[str, PatchEvaluationStrategy] = {
-            "replace": ReplaceEvaluationStrategy(**kwargs),
-            "instruct": InstructEvaluationStrategy(**kwargs),
-            "openai": OpenAIEvaluationStrategy(**kwargs),
-            "google": GoogleEvaluationStrategy(**kwargs),
-            "openrouter": OpenRouterEvaluationStrategy(**kwargs),
-            "anthropic": AnthropicEvaluationStrategy(**kwargs),
-            "mistral": MistralEvaluationStrategy(**kwargs),
-        }
+        self.kwargs = kwargs
+        self._strategies: dict[str, PatchEvaluationStrategy] = {}
 
     def get_evaluation(self, name: str) -> PatchEvaluationStrategy:
-        if name.lower().strip() not in self._strategies:
+        if name.lower().strip() not in self.__STRATEGIES:
             raise ValueError(f"Unknown strategy {name}")
-        return self._strategies[name.lower().strip()]
+        name = name.lower().strip()
+        if name not in self._strategies:
+            self._strategies[name] = import_object(self.__STRATEGIES[name])(
+                **self.kwargs
+            )
+        return self._strategies[name]
@@ -1,15 +1,19 @@
 import tempfile
 import subprocess
+import logging
 
 from abc import ABC, abstractmethod
 from typing import Any, List, Optional, final
 
 from elleelleaime.core.benchmarks.bug import Bug
+from elleelleaime.core.utils.java.java import tokenize_java
+from elleelleaime.core.utils.java.server import JavaJarServer
 
 
 class PatchEvaluationStrategy(ABC):
     def __init__(self, **kwargs):
-        pass
+        # AST matching runs in a long-lived JVM per worker instead of a container per candidate
+        self.use_java_server = kwargs.get("use_java_server", True)
 
     @abstractmethod
     def _evaluate_impl(self, bug: Bug, sample: dict) -> Optional[List[dict]]:
@@ -26,6 +30,11 @@ class PatchEvaluationStrategy(ABC):
         return None
 
     def ast_match(self, fixed_code: str, candidate_code: str) -> bool:
+        # Code that only differs in whitespace and comments has the same AST, no need to run the AST matcher
+        fixed_tokens = tokenize_java(fixed_code)
+        if fixed_tokens is not None and fixed_tokens == tokenize_java(candidate_code):
+            return True
+
         # Write the fixed code to a temporary file
         fixed_code_file = tempfile.NamedTemporaryFile(
             mode="w", suffix=".java", delete=True
@@ -40,6 +49,17 @@ class PatchEvaluationStrategy(ABC):
         candidate_code_file.write(candidate_code)
         candidate_code_file.flush()
 
+        if self.use_java_server:
+            try:
+                _, output = JavaJarServer.get_server("gumtree-spoon-ast-diff.jar").call(
+                    [fixed_code_file.name, candidate_code_file.name]
+                )
+                return "no AST change" in output
+            except Exception as e:
+                logging.warning(
+                    f"AST matching server failed, falling back to a one-off run: {e}"
+                )
+
         # Run the AST matcher on the two files
         run = subprocess.run(
             f'docker run --rm --volume ".:/elleelleaime" --volume "{tempfile.gettempdir()}:{tempfile.gettempdir()}" --workdir "/elleelleaime" openjdk:11 java -jar gumtree-spoon-ast-diff.jar {fixed_code_file.name} {candidate_code_file.name}',
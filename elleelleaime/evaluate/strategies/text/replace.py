@@ -9,6 +9,8 @@ from elleelleaime.evaluate.strategies.strategy import PatchEvaluationStrategy
 from elleelleaime.core.benchmarks.bug import Bug
 from elleelleaime.core.utils.java.java import remove_empty_lines, remove_java_comments
 from elleelleaime.core.caching.cache import Cache
+from elleelleaime.core.caching.snapshots import SnapshotStore
+from elleelleaime.core.caching.workspaces import WorkspacePool
 
 
 class ReplaceEvaluationStrategy(PatchEvaluationStrategy):
@@ -21,6 +23,44 @@ class ReplaceEvaluationStrategy(PatchEvaluationStrategy):
         )
         if self.use_cache:
             self.cache = Cache(self.cache_path)
+        # Pristine checkouts are stored once per bug and cloned for each candidate
+        self.use_snapshots = kwargs.get("use_snapshots", False)
+        if self.use_snapshots:
+            self.snapshots = SnapshotStore.get_store(
+                kwargs.get(
+                    "snapshots_path",
+                    Path(
+                        tempfile.gettempdir(),
+                        f"elleelleaime-{getpass.getuser()}",
+                        "snapshots",
+                    ),
+                ),
+                mode=kwargs.get("snapshot_mode", "copy"),
+            )
+        # Warm workspaces are kept per worker and bug, and only the buggy file is restored between candidates
+        self.reuse_workspaces = kwargs.get("reuse_workspaces", False)
+        if self.reuse_workspaces:
+            self.workspaces = WorkspacePool.get_pool(
+                kwargs.get(
+                    "workspaces_path",
+                    Path(
+                        tempfile.gettempdir(),
+                        f"elleelleaime-{getpass.getuser()}",
+                        "workspaces",
+                    ),
+                ),
+                capacity=kwargs.get("workspaces_per_worker", 2),
+            )
+
+    def checkout(self, bug: Bug, path: str, buggy_file: str) -> bool:
+        """
+        Checks out the buggy version of the bug, of which only `buggy_file` will be modified.
+        """
+        if self.use_snapshots:
+            return self.snapshots.checkout(
+                bug, path, fixed=False, writable=[buggy_file]
+            )
+        return bug.checkout(path, fixed=False)
 
     def evaluate_generation(
         self, bug: Bug, sample: dict, generation: Optional[str]
@@ -90,33 +130,37 @@ class ReplaceEvaluationStrategy(PatchEvaluationStrategy):
                 self.cache.save_to_cache_from_bug(bug, generation, result)
             return result
 
+        workspace = None
         try:
             # Note: this diff is inverted, i.e. the target file is the buggy file
             diff = PatchSet(bug.get_ground_truth())
 
-            # Checkout the buggy code
-            bug.checkout(buggy_path, fixed=False)
-
-            # Locate and load the buggy file
+            # Locate the buggy file
             if bug.is_ground_truth_inverted():
-                buggy_file_path = os.path.join(
-                    buggy_path,
-                    (
-                        diff[0].target_file[2:]
-                        if diff[0].target_file.startswith("b/")
-                        else diff[0].target_file
-                    ),
+                buggy_file = (
+                    diff[0].target_file[2:]
+                    if diff[0].target_file.startswith("b/")
+                    else diff[0].target_file
                 )
             else:
-                buggy_file_path = os.path.join(
-                    buggy_path,
-                    (
-                        diff[0].source_file[2:]
-                        if diff[0].source_file.startswith("a/")
-                        else diff[0].source_file
-                    ),
+                buggy_file = (
+                    diff[0].source_file[2:]
+                    if diff[0].source_file.startswith("a/")
+                    else diff[0].source_file
                 )
 
+            # Checkout the buggy code and load the buggy file
+            if self.reuse_workspaces:
+                workspace = self.workspaces.acquire(
+                    bug,
+                    buggy_file,
+                    lambda path: self.checkout(bug, path, buggy_file),
+                )
+                buggy_path = workspace.path
+            else:
+                self.checkout(bug, buggy_path, buggy_file)
+            buggy_file_path = os.path.join(buggy_path, buggy_file)
+
             with open(buggy_file_path, "r", encoding="ISO-8859-1") as f:
                 buggy_code = f.read()
 
@@ -140,6 +184,8 @@ class ReplaceEvaluationStrategy(PatchEvaluationStrategy):
                 errors="replace",
             ) as f:
                 f.write(candidate_code)
+            if workspace is not None:
+                workspace.touch()
 
             # Evaluate the buggy code
             compilation_result = bug.compile(buggy_path)
@@ -157,8 +203,14 @@ class ReplaceEvaluationStrategy(PatchEvaluationStrategy):
             if self.use_cache:
                 self.cache.save_to_cache_from_bug(bug, generation, result)
             return result
+        except BaseException:
+            # The workspace may be left in an inconsistent state
+            if workspace is not None:
+                self.workspaces.discard(bug)
+            raise
         finally:
-            shutil.rmtree(buggy_path)
+            if not self.reuse_workspaces:
+                shutil.rmtree(buggy_path)
 
     def _evaluate_impl(self, bug: Bug, sample: dict) -> Optional[List[dict]]:
         """
@@ -1,19 +1,16 @@
-from .strategies.openai import OpenAICostStrategy
-from .strategies.google import GoogleCostStrategy
-from .strategies.openrouter import OpenRouterCostStrategy
-from .strategies.anthropic import AnthropicCostStrategy
-from .strategies.mistral import MistralCostStrategy
+from elleelleaime.core.utils.imports import import_object
 from typing import Optional
 
 
 class CostCalculator:
 
+    # Cost strategies are only imported when they are requested
     __COST_STRATEGIES = {
-        "openai-chatcompletion": OpenAICostStrategy,
-        "google": GoogleCostStrategy,
-        "openrouter": OpenRouterCostStrategy,
-        "anthropic": AnthropicCostStrategy,
-        "mistral": MistralCostStrategy,
+        "openai-chatcompletion": "elleelleaime.export.cost.strategies.openai.OpenAICostStrategy",
+        "google": "elleelleaime.export.cost.strategies.google.GoogleCostStrategy",
+        "openrouter": "elleelleaime.export.cost.strategies.openrouter.OpenRouterCostStrategy",
+        "anthropic": "elleelleaime.export.cost.strategies.anthropic.AnthropicCostStrategy",
+        "mistral": "elleelleaime.export.cost.strategies.mistral.MistralCostStrategy",
     }
 
     @staticmethod
@@ -21,4 +18,4 @@ class CostCalculator:
         strategy = CostCalculator.__COST_STRATEGIES.get(provider)
         if strategy is None:
             return None
-        return strategy.compute_costs(samples, model_name)
+        return import_object(strategy).compute_costs(samples, model_name)
@@ -10,14 +10,20 @@ class AnthropicCostStrategy(CostStrategy):
     __COST_PER_MILLION_TOKENS = {
         "claude-3-5-sonnet-20240620": {
             "prompt": 3,
+            "cache_write": 3.75,
+            "cache_read": 0.30,
             "completion": 15,
         },
         "claude-3-5-sonnet-20241022": {
             "prompt": 3,
+            "cache_write": 3.75,
+            "cache_read": 0.30,
             "completion": 15,
         },
         "claude-3-haiku-20240307": {
             "prompt": 0.25,
+            "cache_write": 0.30,
+            "cache_read": 0.03,
             "completion": 1.25,
         },
     }
@@ -43,15 +49,25 @@ class AnthropicCostStrategy(CostStrategy):
                         continue
                     prompt_token_count = g["usage"]["input_tokens"]
                     candidates_token_count = g["usage"]["output_tokens"]
+                    # Input tokens exclude the ones written to and read from the prompt cache
+                    cache_write_token_count = (
+                        g["usage"].get("cache_creation_input_tokens") or 0
+                    )
+                    cache_read_token_count = (
+                        g["usage"].get("cache_read_input_tokens") or 0
+                    )
 
-                    prompt_cost = AnthropicCostStrategy.__COST_PER_MILLION_TOKENS[
-                        model_name
-                    ]["prompt"]
-                    completion_cost = AnthropicCostStrategy.__COST_PER_MILLION_TOKENS[
+                    model_costs = AnthropicCostStrategy.__COST_PER_MILLION_TOKENS[
                         model_name
-                    ]["completion"]
+                    ]
+                    prompt_cost = model_costs["prompt"]
+                    completion_cost = model_costs["completion"]
 
-                    costs["prompt_cost"] += prompt_cost * prompt_token_count / 1000000
+                    costs["prompt_cost"] += (
+                        prompt_cost * prompt_token_count
+                        + model_costs["cache_write"] * cache_write_token_count
+                        + model_costs["cache_read"] * cache_read_token_count
+                    ) / 1000000
                     costs["completion_cost"] += (
                         completion_cost * candidates_token_count / 1000000
                     )
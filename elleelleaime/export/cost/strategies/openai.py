@@ -9,14 +9,17 @@ class OpenAICostStrategy(CostStrategy):
     __COST_PER_MILLION_TOKENS = {
         "gpt-4o-2024-08-06": {
             "prompt": 2.5,
+            "cached_prompt": 1.25,
             "completion": 10,
         },
         "gpt-4o-2024-11-20": {
             "prompt": 2.5,
+            "cached_prompt": 1.25,
             "completion": 10,
         },
         "o1-preview-2024-09-12": {
             "prompt": 15,
+            "cached_prompt": 7.5,
             "completion": 60,
         },
     }
@@ -41,15 +44,25 @@ class OpenAICostStrategy(CostStrategy):
                 for g in generation:
                     prompt_token_count = g["usage"]["prompt_tokens"]
                     candidates_token_count = g["usage"]["completion_tokens"]
+                    # Prompt tokens include the ones read from the prompt cache, which are cheaper
+                    cached_token_count = (
+                        g["usage"].get("prompt_tokens_details") or {}
+                    ).get("cached_tokens") or 0
 
                     prompt_cost = OpenAICostStrategy.__COST_PER_MILLION_TOKENS[
                         model_name
                     ]["prompt"]
+                    cached_prompt_cost = OpenAICostStrategy.__COST_PER_MILLION_TOKENS[
+                        model_name
+                    ]["cached_prompt"]
                     completion_cost = OpenAICostStrategy.__COST_PER_MILLION_TOKENS[
                         model_name
                     ]["completion"]
 
-                    costs["prompt_cost"] += prompt_cost * prompt_token_count / 1000000
+                    costs["prompt_cost"] += (
+                        prompt_cost * (prompt_token_count - cached_token_count)
+                        + cached_prompt_cost * cached_token_count
+                    ) / 1000000
                     costs["completion_cost"] += (
                         completion_cost * candidates_token_count / 1000000
                     )
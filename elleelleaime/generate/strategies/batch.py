@@ -0,0 +1,244 @@
+import json
+import time
+import logging
+import urllib.request
+
+from abc import ABC, abstractmethod
+from uuid import uuid4
+from typing import Callable, Dict, List, Optional
+
+
+class BatchClient(ABC):
+    """
+    Client of a provider's batch API, which runs many requests offline at a lower cost.
+
+    Requests are given as a dict of custom ids to request bodies, and split into batches of at most
+    MAX_REQUESTS requests. The batches are submitted at once and polled every `poll_interval` seconds.
+    """
+
+    MAX_REQUESTS: int
+
+    def __init__(self, api_key: Optional[str], base_url: str, poll_interval: float):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.poll_interval = poll_interval
+
+    @abstractmethod
+    def get_headers(self) -> Dict[str, str]:
+        pass
+
+    def _request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[bytes] = None,
+        content_type: str = "application/json",
+    ) -> bytes:
+        headers = self.get_headers()
+        if body is not None:
+            headers["Content-Type"] = content_type
+        request = urllib.request.Request(url, data=body, headers=headers, method=method)
+        with urllib.request.urlopen(request) as response:
+            return response.read()
+
+    def _request_json(self, method: str, url: str, body: Optional[dict] = None) -> dict:
+        return json.loads(
+            self._request(
+                method, url, json.dumps(body).encode("utf-8") if body else None
+            )
+        )
+
+    @abstractmethod
+    def submit(self, requests: Dict[str, dict]) -> str:
+        """
+        Submits a batch of requests, and returns its id.
+        """
+        pass
+
+    @abstractmethod
+    def is_done(self, batch_id: str) -> bool:
+        pass
+
+    @abstractmethod
+    def get_results(self, batch_id: str) -> Dict[str, Optional[dict]]:
+        """
+        Returns the responses of a finished batch by custom id (None for failed requests).
+        """
+        pass
+
+    def wait(self, batch_id: str) -> Dict[str, Optional[dict]]:
+        """
+        Waits until the batch is done, and returns its responses by custom id.
+        """
+        while not self.is_done(batch_id):
+            time.sleep(self.poll_interval)
+        logging.info(f"Batch {batch_id} is done")
+        return self.get_results(batch_id)
+
+    def run(
+        self,
+        requests: Dict[str, dict],
+        on_submit: Optional[Callable[[str, List[str]], None]] = None,
+    ) -> Dict[str, Optional[dict]]:
+        """
+        Runs the requests through the batch API, and returns their responses by custom id.
+        If given, `on_submit` is called with the id and the custom ids of each batch as soon as it is submitted.
+        """
+        custom_ids = list(requests)
+        batch_ids = []
+        for i in range(0, len(custom_ids), self.MAX_REQUESTS):
+            group = {
+                cid: requests[cid] for cid in custom_ids[i : i + self.MAX_REQUESTS]
+            }
+            batch_ids.append(self.submit(group))
+            logging.info(f"Submitted batch {batch_ids[-1]} of {len(group)} requests")
+            if on_submit is not None:
+                on_submit(batch_ids[-1], list(group))
+
+        results: Dict[str, Optional[dict]] = {}
+        for batch_id in batch_ids:
+            results.update(self.wait(batch_id))
+        return results
+
+
+class OpenAIBatchClient(BatchClient):
+    """
+    Client of the OpenAI batch API, for chat completions.
+    """
+
+    MAX_REQUESTS = 50000
+    ENDPOINT = "/v1/chat/completions"
+    FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+    def get_headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def submit(self, requests: Dict[str, dict]) -> str:
+        content = "".join(
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": self.ENDPOINT,
+                    "body": body,
+                }
+            )
+            + "\n"
+            for custom_id, body in requests.items()
+        ).encode("utf-8")
+
+        boundary = uuid4().hex
+        form = (
+            (
+                f"--{boundary}\r\n"
+                'Content-Disposition: form-data; name="purpose"\r\n\r\n'
+                "batch\r\n"
+                f"--{boundary}\r\n"
+                'Content-Disposition: form-data; name="file"; filename="batch.jsonl"\r\n'
+                "Content-Type: application/jsonl\r\n\r\n"
+            ).encode("utf-8")
+            + content
+            + f"\r\n--{boundary}--\r\n".encode("utf-8")
+        )
+        input_file = json.loads(
+            self._request(
+                "POST",
+                f"{self.base_url}/files",
+                form,
+                content_type=f"multipart/form-data; boundary={boundary}",
+            )
+        )
+
+        batch = self._request_json(
+            "POST",
+            f"{self.base_url}/batches",
+            {
+                "input_file_id": input_file["id"],
+                "endpoint": self.ENDPOINT,
+                "completion_window": "24h",
+            },
+        )
+        return batch["id"]
+
+    def is_done(self, batch_id: str) -> bool:
+        batch = self._request_json("GET", f"{self.base_url}/batches/{batch_id}")
+        return batch["status"] in self.FINAL_STATUSES
+
+    def get_results(self, batch_id: str) -> Dict[str, Optional[dict]]:
+        batch = self._request_json("GET", f"{self.base_url}/batches/{batch_id}")
+        if batch["status"] != "completed":
+            logging.error(f"Batch {batch_id} finished with status {batch['status']}")
+        if batch.get("error_file_id"):
+            logging.error(
+                f"Some requests of batch {batch_id} failed, see file {batch['error_file_id']}"
+            )
+
+        results: Dict[str, Optional[dict]] = {}
+        if batch.get("output_file_id"):
+            content = self._request(
+                "GET", f"{self.base_url}/files/{batch['output_file_id']}/content"
+            )
+            for line in content.decode("utf-8").splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                results[entry["custom_id"]] = (
+                    response.get("body") if response.get("status_code") == 200 else None
+                )
+        return results
+
+
+class AnthropicBatchClient(BatchClient):
+    """
+    Client of the Anthropic message batches API.
+    """
+
+    MAX_REQUESTS = 10000
+
+    def get_headers(self) -> Dict[str, str]:
+        return {
+            "x-api-key": str(self.api_key),
+            "anthropic-version": "2023-06-01",
+            "anthropic-beta": "message-batches-2024-09-24,prompt-caching-2024-07-31",
+        }
+
+    def submit(self, requests: Dict[str, dict]) -> str:
+        batch = self._request_json(
+            "POST",
+            f"{self.base_url}/v1/messages/batches",
+            {
+                "requests": [
+                    {"custom_id": custom_id, "params": params}
+                    for custom_id, params in requests.items()
+                ]
+            },
+        )
+        return batch["id"]
+
+    def is_done(self, batch_id: str) -> bool:
+        batch = self._request_json(
+            "GET", f"{self.base_url}/v1/messages/batches/{batch_id}"
+        )
+        return batch["processing_status"] == "ended"
+
+    def get_results(self, batch_id: str) -> Dict[str, Optional[dict]]:
+        batch = self._request_json(
+            "GET", f"{self.base_url}/v1/messages/batches/{batch_id}"
+        )
+        content = self._request("GET", batch["results_url"])
+
+        results: Dict[str, Optional[dict]] = {}
+        failed: List[str] = []
+        for line in content.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["result"]["type"] == "succeeded":
+                results[entry["custom_id"]] = entry["result"]["message"]
+            else:
+                results[entry["custom_id"]] = None
+                failed.append(entry["custom_id"])
+        if failed:
+            logging.error(f"{len(failed)} requests of batch {batch_id} failed")
+        return results
@@ -1,22 +1,40 @@
-from elleelleaime.generate.strategies.strategy import PatchGenerationStrategy
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+from elleelleaime.generate.strategies.ratelimit import estimate_tokens
+from elleelleaime.generate.strategies.batch import BatchClient, AnthropicBatchClient
 
 from dotenv import load_dotenv
-from typing import Any, List
+from typing import Any, List, Optional
 
 import os
+import asyncio
 import anthropic
 import backoff
 
 
-class AnthropicModels(PatchGenerationStrategy):
+class AnthropicModels(AsyncPatchGenerationStrategy):
     def __init__(self, model_name: str, max_tokens: int, **kwargs) -> None:
+        super().__init__("anthropic", **kwargs)
         self.model_name = model_name
         self.max_tokens = max_tokens
         self.temperature = kwargs.get("temperature", 0.0)
         self.n_samples = kwargs.get("n_samples", 1)
+        # Marks prompts as cacheable, so that all samples of a prompt after the first one read it from the cache.
+        # Cache writes cost 25% more than plain input tokens, so it only pays off with several samples per prompt
+        self.prompt_caching = kwargs.get("prompt_caching", self.n_samples > 1)
 
         load_dotenv()
-        self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        self.api_key = os.getenv("ANTHROPIC_API_KEY")
+        self.base_url = kwargs.get("base_url", os.getenv("ANTHROPIC_BASE_URL", None))
+
+    def _create_async_client(self) -> Any:
+        return anthropic.AsyncAnthropic(api_key=self.api_key, base_url=self.base_url)
+
+    def _create_batch_client(self) -> BatchClient:
+        return AnthropicBatchClient(
+            self.api_key,
+            self.base_url or "https://api.anthropic.com",
+            self.batch_poll_interval,
+        )
 
     @backoff.on_exception(
         backoff.expo,
@@ -24,25 +42,71 @@ class AnthropicModels(PatchGenerationStrategy):
         max_tries=5,
         raise_on_giveup=False,
     )
-    def _completions_with_backoff(self, **kwargs):
-        return self.client.messages.create(**kwargs)
-
-    def _generate_impl(self, chunk: List[str]) -> Any:
-        result = []
-
-        for prompt in chunk:
-            result_sample = []
-            for _ in range(self.n_samples):
-                completion = self._completions_with_backoff(
-                    model=self.model_name,
-                    max_tokens=self.max_tokens,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=self.temperature,
-                )
-                if completion:
-                    result_sample.append(completion.to_dict())
-                else:
-                    result_sample.append(completion)
-            result.append(result_sample)
+    async def _completions_with_backoff(self, **kwargs):
+        async with self.governor.request(
+            estimate_tokens(str(kwargs["messages"])) + kwargs["max_tokens"]
+        ) as request:
+            response = await self.async_client.messages.with_raw_response.create(
+                **kwargs,
+                extra_headers=(
+                    {"anthropic-beta": "prompt-caching-2024-07-31"}
+                    if self.prompt_caching
+                    else None
+                ),
+            )
+            request.update(response.headers)
+            completion = response.parse()
+            return completion.to_dict() if completion else completion
+
+    def _get_requests(self, prompt: str) -> List[dict]:
+        content: Any = prompt
+        if self.prompt_caching:
+            content = [
+                {
+                    "type": "text",
+                    "text": prompt,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        return [
+            dict(
+                model=self.model_name,
+                max_tokens=self.max_tokens,
+                messages=[{"role": "user", "content": content}],
+                temperature=self.temperature,
+            )
+            for _ in range(self.n_samples)
+        ]
 
-        return result
+    def _get_generation(self, responses: List[Optional[dict]]) -> Any:
+        # Cache token counts are only reported when the prompt is cached, record them for every response
+        for response in responses:
+            if response is not None and "usage" in response:
+                response["usage"].setdefault("cache_creation_input_tokens", 0)
+                response["usage"].setdefault("cache_read_input_tokens", 0)
+                for key in ["cache_creation_input_tokens", "cache_read_input_tokens"]:
+                    if response["usage"][key] is None:
+                        response["usage"][key] = 0
+        return responses
+
+    async def _completion(self, index: int, **kwargs) -> dict:
+        return await self._request_with_cache(
+            kwargs, index, lambda: self._completions_with_backoff(**kwargs)
+        )
+
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        requests = self._get_requests(prompt)
+        responses = []
+        if self.prompt_caching and len(requests) > 1:
+            # The prompt is only cached once a response to it has started, so the first sample goes alone
+            responses.append(await self._completion(0, **requests[0]))
+        responses.extend(
+            await asyncio.gather(
+                *(
+                    self._completion(index, **params)
+                    for index, params in enumerate(requests)
+                    if index >= len(responses)
+                )
+            )
+        )
+        return self._get_generation(responses)
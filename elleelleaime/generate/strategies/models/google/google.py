@@ -1,12 +1,13 @@
 import google.api_core
 import google.api_core.exceptions
-from elleelleaime.generate.strategies.strategy import PatchGenerationStrategy
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+from elleelleaime.generate.strategies.ratelimit import estimate_tokens
 
 from dotenv import load_dotenv
-from typing import Any, List
+from typing import Any
 
 import os
-import tqdm
+import asyncio
 import google.generativeai as genai
 import google
 import backoff
@@ -14,8 +15,9 @@ import backoff
 import google.api
 
 
-class GoogleModels(PatchGenerationStrategy):
+class GoogleModels(AsyncPatchGenerationStrategy):
     def __init__(self, model_name: str, **kwargs) -> None:
+        super().__init__("google", **kwargs)
         self.model_name = model_name
         self.model = genai.GenerativeModel(self.model_name)
         self.temperature = kwargs.get("temperature", 0.0)
@@ -30,19 +32,27 @@ class GoogleModels(PatchGenerationStrategy):
         )
 
     @backoff.on_exception(backoff.expo, google.api_core.exceptions.ResourceExhausted)
-    def __generate_with_backoff(self, prompt: str) -> dict:
-        completion = self.model.generate_content(
-            prompt, generation_config=self.__get_config()
-        )
+    async def __generate_with_backoff(self, prompt: str) -> dict:
+        async with self.governor.request(estimate_tokens(prompt)):
+            completion = await self.model.generate_content_async(
+                prompt, generation_config=self.__get_config()
+            )
         return completion.to_dict()
 
-    def _generate_impl(self, chunk: List[str]) -> Any:
-        result = []
-
-        for prompt in tqdm.tqdm(chunk, "Generating patches for prompt..."):
-            p_results = []
-            for _ in range(self.n_samples):
-                p_results.append(self.__generate_with_backoff(prompt))
-            result.append(p_results)
+    async def __generate(self, prompt: str, index: int) -> dict:
+        return await self._request_with_cache(
+            {
+                "model": self.model_name,
+                "prompt": prompt,
+                "temperature": self.temperature,
+            },
+            index,
+            lambda: self.__generate_with_backoff(prompt),
+        )
 
-        return result
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        return list(
+            await asyncio.gather(
+                *(self.__generate(prompt, index) for index in range(self.n_samples))
+            )
+        )
@@ -1,15 +1,17 @@
-from elleelleaime.generate.strategies.strategy import PatchGenerationStrategy
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+from elleelleaime.generate.strategies.ratelimit import estimate_tokens
 
 from dotenv import load_dotenv
-from typing import Any, List
+from typing import Any
 
 import os
 import mistralai
 import backoff
 
 
-class MistralModels(PatchGenerationStrategy):
+class MistralModels(AsyncPatchGenerationStrategy):
     def __init__(self, model_name: str, **kwargs) -> None:
+        super().__init__("mistral", **kwargs)
         self.model_name = model_name
         self.temperature = kwargs.get("temperature", 0.0)
         self.n_samples = kwargs.get("n_samples", 1)
@@ -25,21 +27,19 @@ class MistralModels(PatchGenerationStrategy):
             AssertionError,
         ),
     )
-    def _completions_with_backoff(self, **kwargs):
-        response = self.client.chat.complete(**kwargs)
+    async def _completions_with_backoff(self, **kwargs):
+        async with self.governor.request(estimate_tokens(str(kwargs["messages"]))):
+            response = await self.client.chat.complete_async(**kwargs)
         assert response is not None
-        return response
-
-    def _generate_impl(self, chunk: List[str]) -> Any:
-        result = []
-
-        for prompt in chunk:
-            completion = self._completions_with_backoff(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=self.temperature,
-                n=self.n_samples,
-            )
-            result.append(completion.model_dump())
-
-        return result
+        return response.model_dump()
+
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        params = dict(
+            model=self.model_name,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=self.temperature,
+            n=self.n_samples,
+        )
+        return await self._request_with_cache(
+            params, 0, lambda: self._completions_with_backoff(**params)
+        )
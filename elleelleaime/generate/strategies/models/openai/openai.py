@@ -1,49 +1,93 @@
-from elleelleaime.generate.strategies.strategy import PatchGenerationStrategy
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+from elleelleaime.generate.strategies.ratelimit import estimate_tokens
+from elleelleaime.generate.strategies.batch import BatchClient, OpenAIBatchClient
 
 from dotenv import load_dotenv
-from typing import Any, List
+from typing import Any, List, Optional
 
 import os
+import asyncio
 import openai
 import backoff
 
 
-class OpenAIChatCompletionModels(PatchGenerationStrategy):
+class OpenAIChatCompletionModels(AsyncPatchGenerationStrategy):
     def __init__(self, model_name: str, **kwargs) -> None:
+        super().__init__("openai", **kwargs)
         self.model_name = model_name
         self.temperature = kwargs.get("temperature", 0.0)
         self.n_samples = kwargs.get("n_samples", 1)
 
         load_dotenv()
         openai.api_key = os.getenv("OPENAI_API_KEY")
-        self.client = openai.OpenAI(api_key=openai.api_key)
+        self.base_url = kwargs.get("base_url", os.getenv("OPENAI_BASE_URL", None))
+
+    def _create_async_client(self) -> Any:
+        return openai.AsyncOpenAI(api_key=openai.api_key, base_url=self.base_url)
+
+    def _create_batch_client(self) -> BatchClient:
+        return OpenAIBatchClient(
+            openai.api_key,
+            self.base_url or "https://api.openai.com/v1",
+            self.batch_poll_interval,
+        )
 
     @backoff.on_exception(backoff.expo, openai.RateLimitError)
-    def _completions_with_backoff(self, **kwargs):
-        return self.client.chat.completions.create(**kwargs)
-
-    def _generate_impl(self, chunk: List[str]) -> Any:
-        result = []
-
-        for prompt in chunk:
-            # TODO: Temporary fix to handle beta version of o1 models
-            if self.model_name.startswith("o1"):
-                result_sample = []
-                for _ in range(self.n_samples):
-                    completion = self._completions_with_backoff(
-                        model=self.model_name,
-                        messages=[{"role": "user", "content": prompt}],
-                        temperature=self.temperature,
-                    )
-                    result_sample.append(completion.to_dict())
-                result.append(result_sample)
-            else:
-                completion = self._completions_with_backoff(
+    async def _completions_with_backoff(self, **kwargs):
+        async with self.governor.request(
+            estimate_tokens(str(kwargs["messages"]))
+        ) as request:
+            response = (
+                await self.async_client.chat.completions.with_raw_response.create(
+                    **kwargs
+                )
+            )
+            request.update(response.headers)
+            return response.parse().to_dict()
+
+    def _get_requests(self, prompt: str) -> List[dict]:
+        # TODO: Temporary fix to handle beta version of o1 models
+        if self.model_name.startswith("o1"):
+            return [
+                dict(
                     model=self.model_name,
                     messages=[{"role": "user", "content": prompt}],
                     temperature=self.temperature,
-                    n=self.n_samples,
                 )
-                result.append(completion.to_dict())
+                for _ in range(self.n_samples)
+            ]
+        return [
+            dict(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=self.temperature,
+                n=self.n_samples,
+            )
+        ]
 
-        return result
+    def _get_generation(self, responses: List[Optional[dict]]) -> Any:
+        if self.model_name.startswith("o1"):
+            return responses
+        return responses[0]
+
+    async def _completion(self, index: int, **kwargs) -> dict:
+        return await self._request_with_cache(
+            kwargs, index, lambda: self._completions_with_backoff(**kwargs)
+        )
+
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        requests = self._get_requests(prompt)
+        responses = []
+        if len(requests) > 1:
+            # Prompts are cached automatically once processed, so the first sample goes alone
+            responses.append(await self._completion(0, **requests[0]))
+        responses.extend(
+            await asyncio.gather(
+                *(
+                    self._completion(index, **params)
+                    for index, params in enumerate(requests)
+                    if index >= len(responses)
+                )
+            )
+        )
+        return self._get_generation(responses)
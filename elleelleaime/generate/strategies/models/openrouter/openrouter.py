@@ -1,17 +1,20 @@
 import requests.exceptions
-from elleelleaime.generate.strategies.strategy import PatchGenerationStrategy
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+from elleelleaime.generate.strategies.ratelimit import estimate_tokens
 
 from dotenv import load_dotenv
-from typing import Any, List
+from typing import Any
 
 import os
+import asyncio
 import requests
 import json
 import backoff
 
 
-class OpenRouterModels(PatchGenerationStrategy):
+class OpenRouterModels(AsyncPatchGenerationStrategy):
     def __init__(self, model_name: str, **kwargs) -> None:
+        super().__init__("openrouter", **kwargs)
         self.model_name = model_name
         self.temperature = kwargs.get("temperature", 0.0)
         self.n_samples = kwargs.get("n_samples", 1)
@@ -32,8 +35,25 @@ class OpenRouterModels(PatchGenerationStrategy):
         max_tries=5,
         raise_on_giveup=False,
     )
-    def _completions_with_backoff(self, **kwargs):
-        response = requests.post(
+    async def _completions_with_backoff(self, **kwargs):
+        async with self.governor.request(
+            estimate_tokens(str(kwargs["messages"]))
+        ) as request:
+            # There is no async client for OpenRouter, so the blocking request runs in a thread
+            response = await asyncio.to_thread(self._post, **kwargs)
+            request.update(response.headers)
+
+            response = response.json()
+
+            if "error" in response and response["error"]["code"] in {408, 429, 502}:
+                if response["error"]["code"] == 429:
+                    request.set_rate_limited()
+                raise Exception(response["error"])
+
+        return response
+
+    def _post(self, **kwargs) -> requests.Response:
+        return requests.post(
             url="https://openrouter.ai/api/v1/chat/completions",
             headers={
                 "Authorization": f"Bearer {self.openrouter_api_key}",
@@ -45,26 +65,27 @@ class OpenRouterModels(PatchGenerationStrategy):
             data=json.dumps(kwargs),
         )
 
-        response = response.json()
-
-        if "error" in response and response["error"]["code"] in {408, 429, 502}:
-            raise Exception(response["error"])
-
-        return response
-
-    def _generate_impl(self, chunk: List[str]) -> Any:
-        result = []
+    async def _completion(self, index: int, **kwargs) -> dict:
+        return await self._request_with_cache(
+            kwargs,
+            index,
+            lambda: self._completions_with_backoff(**kwargs),
+            # Errors are returned in the response body
+            cacheable=lambda response: response is not None and "error" not in response,
+        )
 
-        for prompt in chunk:
-            result_sample = []
-            for _ in range(self.n_samples):
-                completion = self._completions_with_backoff(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=self.temperature,
-                    provider=self.provider_args,
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        return list(
+            await asyncio.gather(
+                *(
+                    self._completion(
+                        index,
+                        model=self.model_name,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=self.temperature,
+                        provider=self.provider_args,
+                    )
+                    for index in range(self.n_samples)
                 )
-                result_sample.append(completion)
-            result.append(result_sample)
-
-        return result
+            )
+        )
@@ -0,0 +1,325 @@
+import re
+import time
+import asyncio
+import logging
+import threading
+import contextlib
+
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+# Fraction of the account limits that the governor aims for, to stay just under them
+SAFETY_FACTOR = 0.95
+# Seconds of traffic that a token bucket lets through in a burst
+BURST_SECONDS = 6.0
+# Pause after a rate-limited request that does not say how long to wait
+DEFAULT_PAUSE = 1.0
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimates the number of tokens of `text` (about 4 characters per token).
+    """
+    return len(text) // 4 + 1
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """
+    Parses a reset duration or time into seconds from now, e.g. "1.5" (seconds), "6m0s", "20ms"
+    (OpenAI), "2024-10-16T12:00:00Z" (Anthropic) or an epoch in milliseconds (OpenRouter).
+    Returns None if `value` cannot be parsed.
+    """
+    value = value.strip()
+    try:
+        number = float(value)
+        # Epochs in milliseconds (OpenRouter) are absolute times
+        return max(number / 1000 - time.time(), 0) if number > 1e11 else number
+    except ValueError:
+        pass
+
+    units = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if units and "".join(n + u for n, u in units) == value:
+        scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+        return sum(float(n) * scale[u] for n, u in units)
+
+    for parse in (
+        lambda v: datetime.fromisoformat(v.replace("Z", "+00:00")),
+        parsedate_to_datetime,
+    ):
+        try:
+            reset = parse(value)
+        except (ValueError, TypeError):
+            continue
+        if reset.tzinfo is None:
+            reset = reset.replace(tzinfo=timezone.utc)
+        return max((reset - datetime.now(timezone.utc)).total_seconds(), 0)
+    return None
+
+
+def get_error_headers(error: BaseException) -> Optional[Mapping[str, str]]:
+    """
+    Returns the HTTP response headers attached to a provider error, if any.
+    """
+    for attribute in ("response", "raw_response"):
+        headers = getattr(getattr(error, attribute, None), "headers", None)
+        if headers is not None:
+            return headers
+    return None
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Checks whether a provider error is a rate limit (HTTP 429) error.
+    """
+    for status in (
+        getattr(error, "status_code", None),
+        getattr(getattr(error, "response", None), "status_code", None),
+        getattr(getattr(error, "raw_response", None), "status_code", None),
+        getattr(error, "code", None),
+    ):
+        if status == 429:
+            return True
+    return type(error).__name__ in {"RateLimitError", "ResourceExhausted"}
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at `rate_per_minute`, holding up to BURST_SECONDS of traffic.
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self.set_rate(rate_per_minute)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def set_rate(self, rate_per_minute: float) -> None:
+        self.rate = rate_per_minute * SAFETY_FACTOR / 60
+        self.capacity = max(self.rate * BURST_SECONDS, 1.0)
+
+    def refill(self, now: float) -> None:
+        self.level = min(self.level + (now - self.updated) * self.rate, self.capacity)
+        self.updated = now
+
+    def get_wait(self, amount: float) -> float:
+        """
+        Returns the seconds to wait until `amount` is available (0 if it is available now).
+        Amounts larger than the capacity only wait for a full bucket, and are then paid back by the next requests.
+        """
+        missing = min(amount, self.capacity) - self.level
+        return max(missing / self.rate, 0) if self.rate > 0 else 0
+
+    def consume(self, amount: float) -> None:
+        # The level goes negative for amounts larger than the capacity, so that the average rate is kept
+        self.level -= amount
+
+
+class RequestOutcome:
+    """
+    Outcome of a request made through a RateGovernor, filled in by the backend.
+    """
+
+    def __init__(self):
+        self.headers: Optional[Mapping[str, str]] = None
+        self.rate_limited = False
+
+    def update(self, headers: Optional[Mapping[str, str]]) -> None:
+        """
+        Records the rate-limit headers of the response.
+        """
+        self.headers = headers
+
+    def set_rate_limited(self, headers: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Marks the request as rate limited, for providers that report it in the response body.
+        """
+        self.rate_limited = True
+        if headers is not None:
+            self.headers = headers
+
+
+class RateGovernor:
+    """
+    Rate limiter shared by all workers and backends of a provider.
+
+    Requests wait for a concurrency slot and for the token buckets of requests and tokens per minute.
+    The limits are taken from the arguments, or learned from the provider's rate-limit headers.
+    When a request is rate limited, every request waits until `Retry-After` (or the reset time of the
+    exhausted limit), and the concurrency limit is halved. It then grows back by one request per
+    `limit` successful requests (AIMD), up to `max_concurrency`.
+    """
+
+    __GOVERNORS: Dict[str, "RateGovernor"] = {}
+    __GOVERNORS_LOCK = threading.Lock()
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.lock = threading.Lock()
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.last_decrease = 0.0
+        self.buckets: Dict[str, Optional[TokenBucket]] = {
+            "requests": (
+                TokenBucket(requests_per_minute) if requests_per_minute else None
+            ),
+            "tokens": TokenBucket(tokens_per_minute) if tokens_per_minute else None,
+        }
+        # Limits given as arguments take precedence over the ones in headers
+        self.configured = {
+            "requests": requests_per_minute is not None,
+            "tokens": tokens_per_minute is not None,
+        }
+
+    @classmethod
+    def get_governor(
+        cls,
+        provider: str,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ) -> "RateGovernor":
+        """
+        Returns the governor of `provider`, shared by all users in this process.
+        """
+        with cls.__GOVERNORS_LOCK:
+            if provider not in cls.__GOVERNORS:
+                cls.__GOVERNORS[provider] = RateGovernor(
+                    max_concurrency, requests_per_minute, tokens_per_minute
+                )
+            return cls.__GOVERNORS[provider]
+
+    def __try_acquire(self, tokens: int) -> float:
+        """
+        Acquires a slot for a request of `tokens` tokens if possible.
+        Returns 0 on success, or the seconds to wait before trying again.
+        """
+        with self.lock:
+            now = time.monotonic()
+            if self.paused_until > now:
+                return self.paused_until - now
+            if self.in_flight >= int(self.concurrency):
+                return 0.05
+
+            amounts = {"requests": 1, "tokens": tokens}
+            wait = 0.0
+            for name, bucket in self.buckets.items():
+                if bucket is not None:
+                    bucket.refill(now)
+                    wait = max(wait, bucket.get_wait(amounts[name]))
+            if wait > 0:
+                return wait
+
+            for name, bucket in self.buckets.items():
+                if bucket is not None:
+                    bucket.consume(amounts[name])
+            self.in_flight += 1
+            return 0
+
+    async def acquire(self, tokens: int = 0) -> None:
+        while True:
+            wait = self.__try_acquire(tokens)
+            if wait == 0:
+                return
+            await asyncio.sleep(wait)
+
+    def __pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def __update_limits(self, headers: Mapping[str, str]) -> Optional[float]:
+        """
+        Learns the limits from the rate-limit headers, and returns the seconds until an exhausted limit resets.
+        """
+        headers = {key.lower(): value for key, value in headers.items()}
+        reset_wait = None
+        for name in ("requests", "tokens"):
+            prefixes = [f"x-ratelimit-{{}}-{name}", f"anthropic-ratelimit-{name}-{{}}"]
+            if name == "requests":
+                # OpenRouter only reports request limits, without a suffix
+                prefixes.append("x-ratelimit-{}")
+
+            for prefix in prefixes:
+                limit = headers.get(prefix.format("limit"))
+                remaining = headers.get(prefix.format("remaining"))
+                reset = headers.get(prefix.format("reset"))
+                if limit is None and remaining is None:
+                    continue
+
+                try:
+                    if limit is not None and not self.configured[name]:
+                        bucket = self.buckets[name]
+                        if bucket is None:
+                            self.buckets[name] = TokenBucket(float(limit))
+                        else:
+                            bucket.set_rate(float(limit))
+                    if remaining is not None and float(remaining) <= 0 and reset:
+                        wait = parse_duration(reset)
+                        if wait is not None:
+                            reset_wait = max(reset_wait or 0, wait)
+                except ValueError:
+                    logging.debug(f"Ignoring unparsable rate-limit header {prefix}")
+                break
+        return reset_wait
+
+    def release(self, outcome: RequestOutcome) -> None:
+        """
+        Releases the slot of a finished request, adjusting the limits to its outcome.
+        """
+        with self.lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+
+            reset_wait = None
+            if outcome.headers is not None:
+                reset_wait = self.__update_limits(outcome.headers)
+                if reset_wait is not None:
+                    self.__pause(reset_wait)
+
+            if not outcome.rate_limited:
+                self.concurrency = min(
+                    self.concurrency + 1 / self.concurrency, self.max_concurrency
+                )
+                return
+
+            retry_after = None
+            if outcome.headers is not None:
+                headers = {k.lower(): v for k, v in outcome.headers.items()}
+                if "retry-after-ms" in headers:
+                    retry_after = parse_duration(f"{headers['retry-after-ms']}ms")
+                elif "retry-after" in headers:
+                    retry_after = parse_duration(headers["retry-after"])
+            self.__pause(
+                retry_after
+                if retry_after is not None
+                else reset_wait if reset_wait is not None else DEFAULT_PAUSE
+            )
+
+            # Concurrent requests rejected by the same burst only count once
+            if now - self.last_decrease > 1.0:
+                self.concurrency = max(self.concurrency / 2, 1.0)
+                self.last_decrease = now
+                logging.info(
+                    f"Rate limited, reducing concurrency to {int(self.concurrency)}"
+                )
+
+    @contextlib.asynccontextmanager
+    async def request(self, tokens: int = 0) -> AsyncIterator[RequestOutcome]:
+        """
+        Waits for a slot for a request of about `tokens` tokens, and releases it when the context exits.
+        Rate limit errors raised in the context are recorded, along with their headers.
+        """
+        await self.acquire(tokens)
+        outcome = RequestOutcome()
+        try:
+            yield outcome
+        except Exception as e:
+            if is_rate_limit_error(e):
+                outcome.set_rate_limited(get_error_headers(e))
+            raise
+        finally:
+            self.release(outcome)
@@ -1,6 +1,14 @@
 from abc import ABC, abstractmethod
 
-from typing import List, Any, final
+from typing import Awaitable, Callable, Dict, List, Any, Optional, final
+
+import asyncio
+import logging
+import traceback
+
+from elleelleaime.generate.strategies.ratelimit import RateGovernor
+from elleelleaime.core.caching.responses import ResponseCache
+from elleelleaime.generate.strategies.batch import BatchClient
 
 
 class PatchGenerationStrategy(ABC):
@@ -19,12 +27,242 @@ class PatchGenerationStrategy(ABC):
         """
         return None
 
+    def _generate_with_callback(
+        self, chunk: List[str], callback: Callable[[int, Any], None]
+    ) -> Any:
+        """
+        Generates the results for the given prompts, calling `callback` with the index and result of each prompt.
+        By default, the callbacks are made once the whole chunk is generated.
+        """
+        results = self._generate_impl(chunk)
+        for index, result in enumerate(results):
+            callback(index, result)
+        return results
+
     @final
-    def generate(self, chunk: List[str]) -> Any:
+    def generate(
+        self, chunk: List[str], callback: Optional[Callable[[int, Any], None]] = None
+    ) -> Any:
         """
         Returns the generation results for the given prompt.
 
         :param prompt: The prompt to use for generation.
+        :param callback: Called with the index and result of each prompt, as soon as the strategy has it.
         :return: A tuple containing the generation results.
         """
-        return self._generate_impl(chunk)
+        if callback is None:
+            return self._generate_impl(chunk)
+        return self._generate_with_callback(chunk, callback)
+
+
+class AsyncPatchGenerationStrategy(PatchGenerationStrategy):
+    """
+    Generation strategy for API providers, which sends the requests of a whole chunk concurrently.
+
+    API requests go through the rate governor of the `api` (e.g. "openai"), shared by all workers and backends, which allows
+    at most `max_in_flight` pending requests and keeps under the `requests_per_minute` and `tokens_per_minute` limits.
+    Backends implement `_agenerate_prompt`, and wrap each API request in `async with self.governor.request(tokens):`.
+    Responses are looked up in the response cache first, see `_request_with_cache`.
+    Prompts whose generation fails are logged and get a None result, without stopping the others.
+
+    With `batch`, the requests are instead sent through the provider's batch API, for backends that implement
+    `_get_requests`, `_get_generation` and `_create_batch_client`.
+    """
+
+    def __init__(self, api: str, **kwargs) -> None:
+        self.api = api
+        self.max_in_flight: int = kwargs.get("max_in_flight", 8)
+        self.response_cache: Optional[ResponseCache] = (
+            ResponseCache.get_cache(kwargs.get("response_cache_path", None))
+            if kwargs.get("use_response_cache", True)
+            else None
+        )
+        self.governor = RateGovernor.get_governor(
+            api,
+            max_concurrency=self.max_in_flight,
+            requests_per_minute=kwargs.get("requests_per_minute", None),
+            tokens_per_minute=kwargs.get("tokens_per_minute", None),
+        )
+        self.async_client: Any = None
+        self.batch: bool = kwargs.get("batch", False)
+        self.batch_poll_interval: float = kwargs.get("batch_poll_interval", 30)
+        if (
+            self.batch
+            and type(self)._create_batch_client
+            is AsyncPatchGenerationStrategy._create_batch_client
+        ):
+            raise ValueError(f"Batch generation is not supported for {api}")
+
+    def _create_async_client(self) -> Any:
+        """
+        Returns the async client used during a run, or None if the backend needs none.
+        Async clients are bound to the event loop, so a new one is created for each run.
+        """
+        return None
+
+    async def _request_with_cache(
+        self,
+        params: dict,
+        index: int,
+        request: Callable[[], Awaitable[Any]],
+        cacheable: Callable[[Any], bool] = lambda response: response is not None,
+    ) -> Any:
+        """
+        Returns the cached response to the `index`-th request with `params`, or calls `request` and caches its
+        response if it is `cacheable` (e.g. not a failure).
+        """
+        if self.response_cache is None:
+            return await request()
+
+        key = self.response_cache.get_key(self.api, params, index)
+        hit, response = self.response_cache.load(self.api, key)
+        if hit:
+            return response
+
+        response = await request()
+        if cacheable(response):
+            self.response_cache.save(self.api, key, response)
+        return response
+
+    def _get_requests(self, prompt: str) -> List[dict]:
+        """
+        Returns the parameters of the API requests for a prompt, one per sample index.
+        """
+        raise NotImplementedError()
+
+    def _get_generation(self, responses: List[Optional[dict]]) -> Any:
+        """
+        Returns the generation result of a prompt, given the responses to its requests.
+        """
+        raise NotImplementedError()
+
+    def _create_batch_client(self) -> BatchClient:
+        raise NotImplementedError()
+
+    def _generate_batch(self, chunk: List[str]) -> List[Any]:
+        """
+        Generates the results of a chunk through the batch API, only submitting the requests that are not cached.
+
+        Submitted batches are recorded in the response cache until their responses are cached, so a rerun after
+        an interruption waits for the batches holding its requests instead of submitting them again.
+        """
+        requests = [self._get_requests(prompt) for prompt in chunk]
+        responses: Dict[str, Optional[dict]] = {}
+        to_submit: Dict[str, dict] = {}
+        keys: Dict[str, str] = {}
+        for i, prompt_requests in enumerate(requests):
+            for index, params in enumerate(prompt_requests):
+                custom_id = f"{i}-{index}"
+                if self.response_cache is not None:
+                    keys[custom_id] = self.response_cache.get_key(
+                        self.api, params, index
+                    )
+                    hit, response = self.response_cache.load(self.api, keys[custom_id])
+                    if hit:
+                        responses[custom_id] = response
+                        continue
+                to_submit[custom_id] = params
+
+        client = None
+        cache = self.response_cache
+        if to_submit and cache is not None:
+            # Collect the batches of an interrupted run that hold some of the missing requests
+            missing = {keys[custom_id] for custom_id in to_submit}
+            collected: Dict[str, dict] = {}
+            for batch_id, batch_keys in cache.load_batches(self.api).items():
+                if missing.isdisjoint(batch_keys.values()):
+                    continue
+                client = client or self._create_batch_client()
+                logging.info(f"Waiting for batch {batch_id} of an interrupted run")
+                results = client.wait(batch_id)
+                for custom_id, key in batch_keys.items():
+                    response = results.get(custom_id)
+                    if response is not None:
+                        cache.save(self.api, key, response)
+                        collected[key] = response
+                        missing.discard(key)
+                cache.remove_batch(self.api, batch_id)
+
+            for custom_id in list(to_submit):
+                if keys[custom_id] in collected:
+                    responses[custom_id] = collected[keys[custom_id]]
+                    del to_submit[custom_id]
+
+        if to_submit:
+            submitted: List[str] = []
+
+            def on_submit(batch_id: str, custom_ids: List[str]) -> None:
+                submitted.append(batch_id)
+                if cache is not None:
+                    cache.save_batch(
+                        self.api,
+                        batch_id,
+                        {custom_id: keys[custom_id] for custom_id in custom_ids},
+                    )
+
+            client = client or self._create_batch_client()
+            results = client.run(to_submit, on_submit)
+            for custom_id in to_submit:
+                response = results.get(custom_id)
+                responses[custom_id] = response
+                if cache is not None and response is not None:
+                    cache.save(self.api, keys[custom_id], response)
+            if cache is not None:
+                for batch_id in submitted:
+                    cache.remove_batch(self.api, batch_id)
+
+        return [
+            self._get_generation(
+                [responses.get(f"{i}-{index}") for index in range(len(prompt_requests))]
+            )
+            for i, prompt_requests in enumerate(requests)
+        ]
+
+    @abstractmethod
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        """
+        Returns the generation result for a single prompt.
+        """
+        pass
+
+    async def _agenerate_impl(
+        self, chunk: List[str], callback: Optional[Callable[[int, Any], None]] = None
+    ) -> List[Any]:
+        async def generate(index: int, prompt: str) -> Any:
+            # A failed prompt (e.g. a context length error) must not cancel the rest of the chunk
+            try:
+                result = await self._agenerate_prompt(prompt)
+            except Exception:
+                logging.error(
+                    f"Error while generating prompt {index}: {traceback.format_exc()}"
+                )
+                result = None
+            if callback is not None:
+                callback(index, result)
+            return result
+
+        self.async_client = self._create_async_client()
+        try:
+            return list(
+                await asyncio.gather(
+                    *(generate(index, prompt) for index, prompt in enumerate(chunk))
+                )
+            )
+        finally:
+            close = getattr(self.async_client, "close", None)
+            if close is not None and asyncio.iscoroutinefunction(close):
+                await close()
+            self.async_client = None
+
+    def _generate_impl(self, chunk: List[str]) -> Any:
+        if self.batch:
+            return self._generate_batch(chunk)
+        return asyncio.run(self._agenerate_impl(chunk))
+
+    def _generate_with_callback(
+        self, chunk: List[str], callback: Callable[[int, Any], None]
+    ) -> Any:
+        # Batch results are only available once the whole batch is done
+        if self.batch:
+            return super()._generate_with_callback(chunk, callback)
+        return asyncio.run(self._agenerate_impl(chunk, callback))
@@ -25,7 +25,7 @@ class InfillingPrompting(PromptingStrategy):
     }
 
     def __init__(self, **kwargs):
-        super().__init__("infilling")
+        super().__init__("infilling", **kwargs)
 
         self.model_name: str = kwargs.get("model_name", "").strip().lower()
         assert (
@@ -151,7 +151,9 @@ class InfillingPrompting(PromptingStrategy):
         Returns:
             Tuple: A tuple of the form (buggy_code, fixed_code, prompt).
         """
-        result = extract_single_function(bug)
+        result = self.get_asset(
+            bug, "single_function", lambda: extract_single_function(bug)
+        )
 
         if result is None:
             return None, None, None
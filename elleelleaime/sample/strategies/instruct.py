@@ -7,6 +7,7 @@ from elleelleaime.core.utils.java.java import (
     extract_single_function,
     extract_failing_test_cases,
 )
+from elleelleaime.core.utils.checkout import BugCheckout
 
 
 class InstructPrompting(PromptingStrategy):
@@ -15,7 +16,7 @@ class InstructPrompting(PromptingStrategy):
     """
 
     def __init__(self, **kwargs):
-        super().__init__("instruct")
+        super().__init__("instruct", **kwargs)
 
     def instruct(
         self, bug: RichBug
@@ -28,13 +29,21 @@ class InstructPrompting(PromptingStrategy):
         Returns:
             Tuple: A tuple of the form (buggy_code, fixed_code, prompt).
         """
-        result = extract_single_function(bug)
-        if result is None:
-            return None, None, None
-
-        buggy_code, fixed_code = result
-
-        failing_test_cases = extract_failing_test_cases(bug)
+        # All extraction steps share the same checkouts of the bug
+        with BugCheckout(bug) as checkout:
+            result = self.get_asset(
+                bug, "single_function", lambda: extract_single_function(bug, checkout)
+            )
+            if result is None:
+                return None, None, None
+
+            buggy_code, fixed_code = result
+
+            failing_test_cases = self.get_asset(
+                bug,
+                "failing_test_cases",
+                lambda: extract_failing_test_cases(bug, checkout),
+            )
         failing_test_causes = bug.get_failing_tests()
         if len(failing_test_causes) == 0 or len(failing_test_cases) == 0:
             return None, None, None
@@ -1,12 +1,30 @@
 from abc import ABC, abstractmethod
 from elleelleaime.core.benchmarks.bug import Bug
+from elleelleaime.core.caching.assets import AssetStore
 
-from typing import Optional, Union
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
 
 
 class PromptingStrategy(ABC):
     def __init__(self, strategy_name: str, **kwargs):
         self.strategy_name = strategy_name
+        # Extracted code is stored per bug, so prompts can be rebuilt with other options without checkouts
+        self.use_assets = kwargs.get("use_assets", True)
+        if self.use_assets:
+            self.assets = AssetStore.get_store(
+                kwargs.get(
+                    "assets_path", Path(__file__).parent.parent.parent / "assets"
+                )
+            )
+
+    def get_asset(self, bug: Bug, name: str, compute: Callable[[], Any]) -> Any:
+        """
+        Returns the asset `name` of the bug from the asset store, calling `compute` if it is not stored.
+        """
+        if self.use_assets:
+            return self.assets.get_or_compute(bug, name, compute)
+        return compute()
 
     @abstractmethod
     def prompt(self, bug: Bug) -> dict[str, Optional[str]]:
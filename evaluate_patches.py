@@ -3,13 +3,21 @@ from elleelleaime.core.utils.benchmarks import get_benchmark
 from elleelleaime.core.benchmarks.bug import Bug
 from elleelleaime.core.utils.jsonl import stream_jsonl, write_jsonl
 from elleelleaime.evaluate.strategies.registry import PatchEvaluationStrategyRegistry
+from elleelleaime.core.caching.workspaces import WorkspacePool
+from elleelleaime.core.utils import process, resources
+from elleelleaime.evaluate.scheduler import (
+    EvaluationTask,
+    schedule,
+    predict_makespan,
+)
 
 from pathlib import Path
+from typing import List, Optional, Union
 
-import numpy as np
 import fire
 import sys
 import tqdm
+import datetime
 import logging
 import json
 import os
@@ -29,16 +37,48 @@ def evaluate_candidate(bug: Bug, sample: dict, strategy: str, **kwargs) -> dict:
     return sample
 
 
+def evaluate_task(
+    task: EvaluationTask,
+    strategy: str,
+    gate: Optional[resources.ResourceGate] = None,
+    **kwargs,
+) -> List[dict]:
+    """
+    Evaluates the samples of the task one after the other, in the calling worker.
+    If a gate is given, the task waits for the machine not to be overloaded before starting.
+    """
+    if gate is None:
+        return [
+            evaluate_candidate(task.bug, sample, strategy, **kwargs)
+            for sample in task.samples
+        ]
+    with gate.slot():
+        return [
+            evaluate_candidate(task.bug, sample, strategy, **kwargs)
+            for sample in task.samples
+        ]
+
+
 def entry_point(
     benchmark: str,
     samples_path: str,
     strategy: str,
-    n_workers: int = 4,
+    n_workers: Union[int, str] = 4,
+    timeout_multiplier: Optional[float] = 5.0,
+    memory_limit: Optional[Union[int, str]] = None,
+    cpu_limit: Optional[float] = None,
     **kwargs,
 ):
     """
     Evaluates the candidate patches given the samples,
     and writes the results to f"evaluation_{benchmark}_{prompt_strategy}_{model_name}.jsonl"
+
+    Compile and test timeouts are `timeout_multiplier` times the baselines recorded by profile_baselines.py,
+    or the default timeouts for bugs without a baseline (or if `timeout_multiplier` is None).
+
+    Each compile/test command runs under `memory_limit` (bytes, or e.g. "4G") and `cpu_limit` (cores), if given.
+    With `n_workers="auto"`, the number of workers is derived from the cores, the available memory and the
+    peak memory recorded in the baselines, and new tasks are delayed while the machine is overloaded.
     """
     # Get the benchmark, check if it exists, and initialize it
     samples_file_name = os.path.basename(samples_path)
@@ -53,23 +93,51 @@ def entry_point(
     benchmark_obj = get_benchmark(benchmark)
     if benchmark_obj is None:
         raise ValueError(f"Unknown benchmark {benchmark}")
-    benchmark_obj.initialize()
-
-    with ThreadPoolExecutor(max_workers=n_workers) as executor:
-        futures = []
-        for sample in tqdm.tqdm(samples, "Lauching candidate evaluation..."):
-            bug = benchmark_obj.get_bug(sample["identifier"])
-            if bug is None:
-                raise ValueError(f"Unknown bug {sample['identifier']}")
-            futures.append(
-                executor.submit(evaluate_candidate, bug, sample, strategy, **kwargs)
-            )
-
-        logging.info("Evaluating candidates...")
-        results = []
-        for future in tqdm.tqdm(as_completed(futures), total=len(futures)):
-            results.append(future.result())
-        samples = results
+    benchmark_obj.timeout_multiplier = timeout_multiplier
+    # Only load the bugs that have candidates to evaluate
+    benchmark_obj.load_bugs({sample["identifier"] for sample in samples})
+
+    if memory_limit is not None or cpu_limit is not None:
+        process.set_limits(memory_limit, cpu_limit)
+
+    gate = None
+    if n_workers == "auto":
+        footprint = resources.get_footprint(
+            benchmark_obj,
+            [benchmark_obj.get_bug(sample["identifier"]) for sample in samples],
+        )
+        n_workers = resources.get_auto_workers(footprint, process.get_limits().memory)
+        gate = resources.ResourceGate(min_available_memory=footprint)
+    n_workers = int(n_workers)
+
+    # Group the samples per bug and start with the longest tasks
+    tasks = schedule(benchmark_obj, samples, n_workers)
+    makespan = predict_makespan(tasks, n_workers)
+    logging.info(
+        f"Scheduled {len(samples)} samples in {len(tasks)} tasks, predicted to complete in "
+        f"{datetime.timedelta(seconds=round(makespan))} "
+        f"(around {(datetime.datetime.now() + datetime.timedelta(seconds=makespan)):%Y-%m-%d %H:%M})"
+    )
+
+    try:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = []
+            for task in tasks:
+                futures.append(
+                    executor.submit(evaluate_task, task, strategy, gate, **kwargs)
+                )
+
+            logging.info("Evaluating candidates...")
+            results = []
+            with tqdm.tqdm(total=len(samples)) as pbar:
+                for future in as_completed(futures):
+                    task_results = future.result()
+                    results.extend(task_results)
+                    pbar.update(len(task_results))
+            samples = results
+    finally:
+        # Remove the warm workspaces kept by the workers, if any
+        WorkspacePool.clear_pools()
 
     # Write results to jsonl file
     write_jsonl(
@@ -1,25 +1,48 @@
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from elleelleaime.core.utils.jsonl import stream_jsonl, write_jsonl
+from elleelleaime.core.utils.jsonl import (
+    stream_jsonl,
+    stream_jsonl_safe,
+    write_jsonl,
+    JsonlAppender,
+)
 from elleelleaime.generate.strategies.registry import PatchGenerationStrategyRegistry
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+from elleelleaime.core.caching.responses import ResponseCache
 
-from typing import List, Optional
+from typing import Any, Callable, List, Optional
 from pathlib import Path
 import fire
 import sys
 import os
 import tqdm
 import logging
+import traceback
 
 
-def generate_candidate(chunk: List[dict], strategy_name: str, **kwargs) -> List[dict]:
+def generate_candidate(
+    chunk: List[dict],
+    strategy_name: str,
+    on_sample: Optional[Callable[[dict], None]] = None,
+    **kwargs,
+) -> List[dict]:
     """
     Generates the candidate patch for the given sample and model.
+
+    If given, `on_sample` is called with each sample as soon as its generation is done.
     """
 
     generation_strategy = PatchGenerationStrategyRegistry.get_generation(
         strategy_name, **kwargs
     )
 
+    for sample in chunk:
+        if not sample["prompt"]:
+            sample["generation"] = None
+        # Samples without a prompt or already generated are done
+        if sample.get("generation") is not None or not sample["prompt"]:
+            if on_sample is not None:
+                on_sample(sample)
+
     chunk_to_generate = [
         sample
         for sample in chunk
@@ -27,15 +50,17 @@ def generate_candidate(chunk: List[dict], strategy_name: str, **kwargs) -> List[
         and not ("generation" in sample and sample["generation"] is not None)
     ]
     non_empty_prompt_chunk = [sample["prompt"] for sample in chunk_to_generate]
-    generations = generation_strategy.generate(non_empty_prompt_chunk)
+
+    def callback(index: int, generation: Any) -> None:
+        chunk_to_generate[index]["generation"] = generation
+        if on_sample is not None:
+            on_sample(chunk_to_generate[index])
+
+    generations = generation_strategy.generate(non_empty_prompt_chunk, callback)
 
     for generation, sample in zip(generations, chunk_to_generate):
         sample["generation"] = generation
 
-    for sample in chunk:
-        if not sample["prompt"]:
-            sample["generation"] = None
-
     return chunk
 
 
@@ -44,39 +69,67 @@ def entry_point(
     strategy_name: str,
     n_workers: int = 1,
     output_dir: Optional[str] = None,
+    max_in_flight: Optional[int] = None,
+    requests_per_minute: Optional[float] = None,
+    tokens_per_minute: Optional[float] = None,
+    resume: bool = False,
+    use_response_cache: bool = True,
+    response_cache_path: Optional[str] = None,
+    batch: bool = False,
+    batch_poll_interval: Optional[float] = None,
     **kwargs,
 ):
     """
     Generates the candidate patches given the samples and the model,
     and writes the results to f"candidates_{benchmark}_{prompt_strategy}_{model_name}.jsonl"
-    """
-    results = []
 
-    with ThreadPoolExecutor(max_workers=n_workers) as executor:
-        futures = []
+    API backends send the requests of all samples concurrently, with at most `max_in_flight`
+    (8 by default) pending requests, so `n_workers` only applies to the other backends.
+    Their requests are throttled to `requests_per_minute` and `tokens_per_minute`, when given,
+    and to the limits reported by the provider.
 
-        samples = list(stream_jsonl(samples_path))
-        chunks = [samples[i::n_workers] for i in range(n_workers)]
+    Each sample is appended to the output file as soon as its generation is done (API backends)
+    or its chunk is done (other backends). With `resume`, the samples already in the output file are skipped,
+    except those whose generation failed.
+    Once all samples are generated, the output file is rewritten in the order of the samples.
 
-        for chunk in tqdm.tqdm(chunks, desc="Launching workers", total=len(chunks)):
-            futures.append(
-                executor.submit(generate_candidate, chunk, strategy_name, **kwargs)
-            )
+    API responses are cached on disk (in `response_cache_path`, see ResponseCache), so identical reruns send no request.
 
-        logging.info("Generating candidates...")
-        for future in tqdm.tqdm(
-            as_completed(futures),
-            desc="Waiting for chunks to be processed",
-            total=len(futures),
-        ):
-            results.extend(future.result())
+    With `batch`, the OpenAI and Anthropic backends send the requests through the provider's batch API instead,
+    polling it every `batch_poll_interval` seconds (30 by default) until it is done.
+    """
+    samples = list(stream_jsonl(samples_path))
 
-    # Write results to jsonl file
+    # Compute the output file name
     samples_file_name = os.path.basename(samples_path)
     dir_path = output_dir or os.path.dirname(samples_path)
     benchmark = samples_file_name.split("_")[1]
     prompt_strategy = samples_file_name.split("_")[2].split(".")[0]
 
+    generation_kwargs = dict(kwargs)
+    response_cache = None
+    if issubclass(
+        PatchGenerationStrategyRegistry.get_generation_class(strategy_name),
+        AsyncPatchGenerationStrategy,
+    ):
+        n_workers = 1
+        for key, value in [
+            ("max_in_flight", max_in_flight),
+            ("requests_per_minute", requests_per_minute),
+            ("tokens_per_minute", tokens_per_minute),
+            ("use_response_cache", use_response_cache),
+            ("response_cache_path", response_cache_path),
+            ("batch", batch),
+            ("batch_poll_interval", batch_poll_interval),
+        ]:
+            if value is not None:
+                generation_kwargs[key] = value
+        if use_response_cache:
+            response_cache = ResponseCache.get_cache(response_cache_path)
+            response_cache.reset_stats()
+    elif batch:
+        raise ValueError(f"Batch generation is not supported for {strategy_name}")
+
     # FIXME: This is a hack to shorten the kwargs string
     for key in kwargs:
         if Path(str(kwargs[key])).exists():
@@ -84,13 +137,91 @@ def entry_point(
 
     kwargs_str = "_".join([f"{k}={v}" for k, v in kwargs.items()])
     kwargs_str = kwargs_str.replace("/", "-")
-    write_jsonl(
-        os.path.join(
-            dir_path,
-            f"candidates_{benchmark}_{prompt_strategy}_{strategy_name}_{kwargs_str}.jsonl",
-        ),
-        results,
+    output_path = os.path.join(
+        dir_path,
+        f"candidates_{benchmark}_{prompt_strategy}_{strategy_name}_{kwargs_str}.jsonl",
+    )
+
+    # Load the samples already generated, dropping a line truncated by a crash
+    generated = {}
+    if resume and os.path.exists(output_path):
+        for sample in stream_jsonl_safe(output_path):
+            generated[sample["identifier"]] = sample
+        # Rewrite the checkpoint atomically, so a crash meanwhile loses no sample
+        tmp_path = f"{output_path}.tmp"
+        write_jsonl(tmp_path, generated.values())
+        os.replace(tmp_path, output_path)
+        logging.info(f"Resuming, {len(generated)} samples already generated")
+    # Samples whose generation failed are generated again
+    samples_to_generate = [
+        sample
+        for sample in samples
+        if sample["identifier"] not in generated
+        or (
+            sample["prompt"]
+            and generated[sample["identifier"]].get("generation") is None
+        )
+    ]
+
+    failed = False
+    with JsonlAppender(output_path, append=resume) as checkpoint:
+
+        def on_sample(sample: dict) -> None:
+            checkpoint.write(sample)
+            generated[sample["identifier"]] = sample
+
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            futures = []
+
+            chunks = [samples_to_generate[i::n_workers] for i in range(n_workers)]
+
+            for chunk in tqdm.tqdm(chunks, desc="Launching workers", total=len(chunks)):
+                futures.append(
+                    executor.submit(
+                        generate_candidate,
+                        chunk,
+                        strategy_name,
+                        on_sample,
+                        **generation_kwargs,
+                    )
+                )
+
+            logging.info("Generating candidates...")
+            for future in tqdm.tqdm(
+                as_completed(futures),
+                desc="Waiting for chunks to be processed",
+                total=len(futures),
+            ):
+                # A failed chunk does not discard the samples generated by the others
+                try:
+                    future.result()
+                except Exception:
+                    failed = True
+                    logging.error(
+                        f"Error while generating candidates: {traceback.format_exc()}"
+                    )
+
+    if response_cache is not None:
+        logging.info(response_cache.get_report())
+
+    if failed or len(generated) < len(samples):
+        logging.error(
+            f"Generated {len(generated)} of {len(samples)} samples into {output_path}, run again with --resume to generate the rest"
+        )
+        raise RuntimeError(f"Generated only {len(generated)} of {len(samples)} samples")
+
+    n_failed = len(
+        [s for s in generated.values() if s["prompt"] and s.get("generation") is None]
     )
+    if n_failed > 0:
+        logging.warning(
+            f"The generation of {n_failed} samples failed, run again with --resume to retry them"
+        )
+
+    # Write results to jsonl file, in the order of the samples
+    tmp_path = f"{output_path}.tmp"
+    write_jsonl(tmp_path, [generated[sample["identifier"]] for sample in samples])
+    os.replace(tmp_path, output_path)
 
 
 def main():
@@ -2,7 +2,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from elleelleaime.core.utils.benchmarks import get_benchmark
 from elleelleaime.core.utils.jsonl import write_jsonl
 from elleelleaime.core.benchmarks.bug import Bug
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
 from elleelleaime.sample.registry import PromptStrategyRegistry
 
 import fire
@@ -27,18 +27,34 @@ def entry_point(
     benchmark: str,
     prompt_strategy: str,
     n_workers: int = 1,
+    bugs: Optional[Union[str, Iterable[str]]] = None,
     **kwargs,
 ):
     """
     Generates the test samples for the bugs of the given benchmark with the given
     prompt strategy, and writes the results to f"samples_{dataset}_{prompt_strategy}.jsonl"
+
+    If `bugs` is given (a list or a comma-separated string of identifiers), only those bugs are loaded and sampled.
     """
 
     # Get the benchmark, check if it exists, and initialize it
     benchmark_obj = get_benchmark(benchmark)
     if benchmark_obj is None:
         raise ValueError(f"Unknown benchmark {benchmark}")
-    benchmark_obj.initialize()
+    if bugs is None:
+        benchmark_obj.initialize()
+        bugs_to_sample = benchmark_obj.get_bugs()
+    else:
+        if isinstance(bugs, str):
+            bugs = bugs.split(",")
+        bugs = [str(bug).strip() for bug in bugs]
+        benchmark_obj.load_bugs(bugs)
+        bugs_to_sample = []
+        for identifier in bugs:
+            bug = benchmark_obj.get_bug(identifier)
+            if bug is None:
+                raise ValueError(f"Unknown bug {identifier}")
+            bugs_to_sample.append(bug)
 
     # Generate the prompts in parallel
     logging.info("Building the prompts...")
@@ -49,15 +65,13 @@ def entry_point(
 
         # Launch a thread for each bug
         future_to_bug = {}
-        for bug in benchmark_obj.get_bugs():
+        for bug in bugs_to_sample:
             future = executor.submit(generate_sample, bug, prompt_strategy, **kwargs)
             future_to_bug[future] = bug
             futures.append(future)
 
         # Check that all bugs are being processed
-        assert len(futures) == len(
-            benchmark_obj.get_bugs()
-        ), "Some bugs are not being processed"
+        assert len(futures) == len(bugs_to_sample), "Some bugs are not being processed"
 
         # Wait for the results
         for future in tqdm.tqdm(as_completed(futures), total=len(futures)):
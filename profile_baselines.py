@@ -0,0 +1,95 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from elleelleaime.core.utils.benchmarks import get_benchmark
+from elleelleaime.core.benchmarks.bug import Bug
+from typing import Dict, Iterable, Optional, Union
+
+import profile_benchmarks
+import fire
+import traceback
+import sys
+import tqdm
+import logging
+
+
+def profile_bug(bug: Bug) -> Optional[Dict[str, float]]:
+    """
+    Measures the compile and test durations (in seconds) and the peak memory (in bytes) of the fixed version of the bug.
+    Returns None if the fixed version does not compile or does not pass its tests.
+    """
+    baseline = profile_benchmarks.get_baseline(
+        profile_benchmarks.profile_bug(bug, fixed=True)
+    )
+    if baseline is None:
+        logging.warning(
+            f"Fixed version of {bug.get_identifier()} does not compile or fails its tests"
+        )
+    return baseline
+
+
+def entry_point(
+    benchmark: str,
+    n_workers: int = 1,
+    bugs: Optional[Union[str, Iterable[str]]] = None,
+    overwrite: bool = False,
+):
+    """
+    Runs the fixed version of the bugs of the given benchmark and records their compile and test durations
+    in the baselines manifest next to the benchmark. Evaluation timeouts are then derived from these baselines.
+
+    Bugs that already have a baseline are skipped unless `overwrite` is set.
+    Note that concurrent runs compete for resources, so `n_workers` should match the evaluation setup.
+    """
+    benchmark_obj = get_benchmark(benchmark)
+    if benchmark_obj is None:
+        raise ValueError(f"Unknown benchmark {benchmark}")
+    if bugs is None:
+        benchmark_obj.initialize()
+        bugs_to_profile = benchmark_obj.get_bugs()
+    else:
+        if isinstance(bugs, str):
+            bugs = bugs.split(",")
+        bugs = [str(bug).strip() for bug in bugs]
+        benchmark_obj.load_bugs(bugs)
+        bugs_to_profile = []
+        for identifier in bugs:
+            bug = benchmark_obj.get_bug(identifier)
+            if bug is None:
+                raise ValueError(f"Unknown bug {identifier}")
+            bugs_to_profile.append(bug)
+
+    if not overwrite:
+        bugs_to_profile = [
+            bug for bug in bugs_to_profile if not benchmark_obj.get_baseline(bug)
+        ]
+    # Profile with the default timeouts, not with the ones derived from previous baselines
+    benchmark_obj.timeout_multiplier = None
+
+    logging.info(f"Profiling {len(bugs_to_profile)} bugs...")
+    n_recorded = 0
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        future_to_bug = {
+            executor.submit(profile_bug, bug): bug for bug in bugs_to_profile
+        }
+        for future in tqdm.tqdm(as_completed(future_to_bug), total=len(future_to_bug)):
+            bug = future_to_bug[future]
+            try:
+                baseline = future.result()
+            except Exception:
+                logging.error(
+                    f"Error while profiling bug {bug}: {traceback.format_exc()}"
+                )
+                continue
+            if baseline is not None:
+                benchmark_obj.set_baseline(bug, baseline)
+                n_recorded += 1
+
+    logging.info(f"Recorded baselines for {n_recorded}/{len(bugs_to_profile)} bugs")
+
+
+def main():
+    logging.getLogger().setLevel(logging.INFO)
+    fire.Fire(entry_point)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from elleelleaime.core.utils.benchmarks import get_benchmark, benchmarks
+from elleelleaime.core.utils.jsonl import write_jsonl
+from elleelleaime.core.utils import process
+from elleelleaime.core.benchmarks.bug import Bug
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from uuid import uuid4
+
+import fire
+import traceback
+import tempfile
+import getpass
+import shutil
+import time
+import csv
+import sys
+import os
+import tqdm
+import logging
+
+PHASES = ["checkout", "compile", "test"]
+
+
+def get_outcome(result: Any) -> str:
+    if hasattr(result, "is_passing"):
+        result = result.is_passing()
+    if result is None:
+        # E.g. benchmarks that compile as part of testing
+        return "unknown"
+    return "pass" if result else "fail"
+
+
+def profile_phase(phase: str, function: Callable, *args) -> Tuple[dict, Any]:
+    """
+    Runs one phase of a bug, and returns its profile along with the result of `function`.
+    """
+    result, outcome = None, None
+    start = time.monotonic()
+    with process.collect_stats() as stats:
+        try:
+            result = function(*args)
+            outcome = get_outcome(result)
+        except Exception:
+            logging.error(f"Error during {phase}: {traceback.format_exc()}")
+            outcome = "error"
+    wall_time = time.monotonic() - start
+
+    # Commands are wrapped with `timeout`, which exits with 124 when the time runs out
+    if outcome != "pass" and any(
+        s["timed_out"] or s["returncode"] == 124 for s in stats
+    ):
+        outcome = "timeout"
+    return {
+        "phase": phase,
+        "outcome": outcome,
+        "wall_time": wall_time,
+        "max_rss": max((s["max_rss"] for s in stats), default=None),
+        "commands": len(stats),
+    }, result
+
+
+def profile_bug(bug: Bug, fixed: bool) -> List[dict]:
+    """
+    Checks out, compiles and tests one version of the bug, and returns the profile of each phase.
+    """
+    path = os.path.join(
+        tempfile.gettempdir(),
+        f"elleelleaime-{getpass.getuser()}",
+        bug.get_identifier(),
+        str(uuid4()),
+    )
+    rows = []
+    try:
+        for phase, function in zip(PHASES, [bug.checkout, bug.compile, bug.test]):
+            # Later phases are skipped once a phase fails
+            if len(rows) > 0 and rows[-1]["outcome"] not in {"pass", "unknown"}:
+                rows.append({"phase": phase, "outcome": "skipped"})
+                continue
+            args = (path, fixed) if phase == "checkout" else (path,)
+            row, _ = profile_phase(phase, function, *args)
+            rows.append(row)
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+    for row in rows:
+        row.update(
+            {
+                "benchmark": bug.benchmark.get_identifier(),
+                "bug": bug.get_identifier(),
+                "version": "fixed" if fixed else "buggy",
+            }
+        )
+    return rows
+
+
+def get_baseline(rows: List[dict]) -> Optional[Dict[str, float]]:
+    """
+    Returns the timeout baseline of a bug given the profile of its fixed version, i.e. the compile and test
+    durations (in seconds) and the peak memory (in bytes). Returns None if it does not compile or pass its tests.
+    """
+    phases = {row["phase"]: row for row in rows}
+    if (
+        phases["compile"]["outcome"] not in {"pass", "unknown"}
+        or phases["test"]["outcome"] != "pass"
+    ):
+        return None
+
+    baseline = {
+        "compile": phases["compile"]["wall_time"],
+        "test": phases["test"]["wall_time"],
+    }
+    max_rss = [
+        phases[phase]["max_rss"]
+        for phase in ["compile", "test"]
+        if phases[phase]["max_rss"] is not None
+    ]
+    if max_rss:
+        baseline["max_rss"] = max(max_rss)
+    return baseline
+
+
+def entry_point(
+    benchmark: Optional[Union[str, Iterable[str]]] = None,
+    n_workers: int = 4,
+    output: str = "profile_benchmarks.jsonl",
+    record_baselines: bool = False,
+):
+    """
+    Checks out, compiles and tests the buggy and fixed versions of every bug of the given benchmarks
+    (all of them by default), and writes the wall time (seconds), peak RSS (bytes) and outcome of each phase
+    to `output`, as jsonl or csv depending on its extension.
+
+    Peak RSS only covers processes running in our process tree, i.e. not inside docker containers.
+    If `record_baselines` is set, the durations of passing fixed versions are also recorded as timeout baselines.
+    """
+    if benchmark is None:
+        benchmark = list(benchmarks.keys())
+    elif isinstance(benchmark, str):
+        benchmark = benchmark.split(",")
+
+    bugs_to_profile = []
+    for name in benchmark:
+        benchmark_obj = get_benchmark(name.strip())
+        if benchmark_obj is None:
+            raise ValueError(f"Unknown benchmark {name}")
+        benchmark_obj.initialize()
+        # Profile with the default timeouts, not with the ones derived from previous baselines
+        benchmark_obj.timeout_multiplier = None
+        bugs_to_profile.extend(benchmark_obj.get_bugs())
+
+    logging.info(f"Profiling {len(bugs_to_profile)} bugs...")
+    rows = []
+    with ThreadPoolExecutor(max_workers=n_workers) as executor:
+        future_to_bug = {}
+        for bug in bugs_to_profile:
+            for fixed in [False, True]:
+                future = executor.submit(profile_bug, bug, fixed)
+                future_to_bug[future] = (bug, fixed)
+
+        for future in tqdm.tqdm(as_completed(future_to_bug), total=len(future_to_bug)):
+            bug, fixed = future_to_bug[future]
+            bug_rows = future.result()
+            rows.extend(bug_rows)
+
+            if record_baselines and fixed:
+                baseline = get_baseline(bug_rows)
+                if baseline is not None:
+                    bug.benchmark.set_baseline(bug, baseline)
+
+    rows = sorted(
+        rows,
+        key=lambda row: (
+            row["benchmark"],
+            row["bug"],
+            row["version"],
+            PHASES.index(row["phase"]),
+        ),
+    )
+    if output.endswith(".csv"):
+        with open(output, "w", newline="") as f:
+            writer = csv.DictWriter(
+                f,
+                fieldnames=[
+                    "benchmark",
+                    "bug",
+                    "version",
+                    "phase",
+                    "outcome",
+                    "wall_time",
+                    "max_rss",
+                    "commands",
+                ],
+            )
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        write_jsonl(output, rows)
+
+
+def main():
+    logging.getLogger().setLevel(logging.INFO)
+    fire.Fire(entry_point)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,6 +23,28 @@ class TestDefects4J:
         assert len(set([bug.get_identifier() for bug in bugs])) == 835
         assert all(bug.get_ground_truth().strip() != "" for bug in bugs)
 
+    def test_get_benchmark_from_manifest(self):
+        defects4j = get_benchmark("defects4j")
+        assert defects4j is not None
+        defects4j.initialize()
+        assert defects4j.get_manifest("manifest").path.exists()
+
+        # A second initialization is served from the manifest
+        cached = get_benchmark("defects4j")
+        assert cached is not None
+        cached.collect_bugs = lambda: pytest.fail("manifest was not used")
+        cached.initialize()
+
+        bugs = cached.get_bugs()
+        assert len(bugs) == 835
+        assert all(
+            bug.get_ground_truth()
+            == defects4j.get_bug(bug.get_identifier()).get_ground_truth()
+            and bug.get_failing_tests()
+            == defects4j.get_bug(bug.get_identifier()).get_failing_tests()
+            for bug in bugs
+        )
+
     def checkout_bug(self, bug: Bug) -> bool:
         buggy_path = f"{tempfile.gettempdir()}/elleelleaime-{getpass.getuser()}/{bug.get_identifier()}-buggy-{uuid.uuid4()}"
         fixed_path = f"{tempfile.gettempdir()}/elleelleaime-{getpass.getuser()}/{bug.get_identifier()}-fixed-{uuid.uuid4()}"
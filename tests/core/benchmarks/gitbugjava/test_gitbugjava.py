@@ -23,6 +23,20 @@ class TestGitBugJava:
         assert len(set([bug.get_identifier() for bug in bugs])) == 199
         assert all(bug.get_ground_truth().strip() != "" for bug in bugs)
 
+    def test_export_info(self):
+        gitbugjava = get_benchmark("gitbugjava")
+        assert gitbugjava is not None
+
+        # The bulk export must match the output of the per-bug info command
+        bids = ["traccar-traccar-37ed394724c0", "BrightSpots-rcv-688920f27706"]
+        infos = gitbugjava.export_info(bids)
+        assert set(infos.keys()) == set(bids)
+        for bid in bids:
+            run = gitbugjava.run_command(f"info {bid}")
+            assert gitbugjava.parse_info(infos[bid]) == gitbugjava.parse_info(
+                run.stdout.decode("utf-8")
+            )
+
     def checkout_bug(self, bug: Bug) -> bool:
         buggy_path = f"{tempfile.gettempdir()}/elleelleaime-{getpass.getuser()}/{bug.get_identifier()}-buggy-{uuid.uuid4()}"
         fixed_path = f"{tempfile.gettempdir()}/elleelleaime-{getpass.getuser()}/{bug.get_identifier()}-fixed-{uuid.uuid4()}"
@@ -22,6 +22,22 @@ class TestQuixBugs:
         assert len(bugs) == 40
         assert len(set([bug.get_identifier() for bug in bugs])) == 40
 
+    def test_get_bug_without_initialize(self):
+        quixbugs = get_benchmark("quixbugs")
+        assert quixbugs is not None
+
+        # Bugs are loaded on demand
+        bug = quixbugs.get_bug("GCD")
+        assert bug is not None
+        assert bug.get_ground_truth().strip() != ""
+        assert quixbugs.get_bug("NOT_A_BUG") is None
+        assert [bug.get_identifier() for bug in quixbugs.get_bugs()] == ["GCD"]
+
+        # A full initialization keeps the bugs already loaded
+        quixbugs.initialize()
+        assert len(quixbugs.get_bugs()) == 40
+        assert quixbugs.get_bug("GCD") is bug
+
     def checkout_bug(self, bug: Bug) -> bool:
         buggy_path = f"{tempfile.gettempdir()}/elleelleaime-{getpass.getuser()}/{bug.get_identifier()}-buggy-{uuid.uuid4()}"
         fixed_path = f"{tempfile.gettempdir()}/elleelleaime-{getpass.getuser()}/{bug.get_identifier()}-fixed-{uuid.uuid4()}"
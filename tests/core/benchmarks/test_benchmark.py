@@ -0,0 +1,79 @@
+from elleelleaime.core.benchmarks.benchmark import Benchmark
+from elleelleaime.core.benchmarks.bug import Bug
+
+from pathlib import Path
+
+
+class FakeBug(Bug):
+    def checkout(self, path: str, fixed: bool = False) -> bool:
+        return True
+
+    def compile(self, path: str):
+        return None
+
+    def test(self, path: str):
+        return None
+
+
+class FakeBenchmark(Benchmark):
+    def __init__(self, path: Path):
+        super().__init__("fake", path)
+
+    def get_revision(self):
+        return "rev"
+
+    def initialize(self) -> None:
+        pass
+
+
+class TestBenchmarkTimeouts:
+    def test_default_timeouts(self, tmp_path):
+        benchmark = FakeBenchmark(tmp_path / "fake")
+        bug = FakeBug(benchmark, "fake-1", "")
+
+        # Bugs without a baseline get the default timeouts
+        assert (
+            benchmark.get_timeout(bug, "compile")
+            == Benchmark.DEFAULT_TIMEOUTS["compile"]
+        )
+        assert bug.get_test_timeout() == Benchmark.DEFAULT_TIMEOUTS["test"]
+
+    def test_baseline_timeouts(self, tmp_path):
+        benchmark = FakeBenchmark(tmp_path / "fake")
+        bug = FakeBug(benchmark, "fake-1", "")
+        benchmark.set_baseline(bug, {"compile": 20.0, "test": 100.5})
+
+        # Each phase gets `timeout_multiplier` times its own baseline
+        assert benchmark.get_timeout(bug, "compile") == 100
+        assert benchmark.get_timeout(bug, "test") == 503
+        assert bug.get_compile_timeout() == 100
+
+        benchmark.timeout_multiplier = 2.0
+        assert benchmark.get_timeout(bug, "test") == 201
+
+        # Baselines are persisted in a manifest next to the benchmark
+        assert (tmp_path / "fake.baselines.json").exists()
+        reloaded = FakeBenchmark(tmp_path / "fake")
+        assert reloaded.get_baseline(bug) == {"compile": 20.0, "test": 100.5}
+        assert reloaded.get_timeout(bug, "test") == 503
+
+    def test_timeout_bounds(self, tmp_path):
+        benchmark = FakeBenchmark(tmp_path / "fake")
+        bug = FakeBug(benchmark, "fake-1", "")
+        benchmark.set_baseline(bug, {"compile": 1.0, "test": 3600.0})
+
+        # Derived timeouts are at least MIN_TIMEOUT and at most the default timeout
+        assert benchmark.get_timeout(bug, "compile") == Benchmark.MIN_TIMEOUT
+        assert benchmark.get_timeout(bug, "test") == Benchmark.DEFAULT_TIMEOUTS["test"]
+
+    def test_no_multiplier(self, tmp_path):
+        benchmark = FakeBenchmark(tmp_path / "fake")
+        bug = FakeBug(benchmark, "fake-1", "")
+        benchmark.set_baseline(bug, {"compile": 1.0, "test": 1.0})
+
+        benchmark.timeout_multiplier = None
+        assert (
+            benchmark.get_timeout(bug, "compile")
+            == Benchmark.DEFAULT_TIMEOUTS["compile"]
+        )
+        assert benchmark.get_timeout(bug, "test") == Benchmark.DEFAULT_TIMEOUTS["test"]
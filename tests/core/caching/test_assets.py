@@ -0,0 +1,135 @@
+from elleelleaime.core.benchmarks.benchmark import Benchmark
+from elleelleaime.core.benchmarks.bug import Bug
+from elleelleaime.core.caching import assets
+from elleelleaime.core.caching.assets import AssetStore
+from elleelleaime.core.utils.java import java
+
+from pathlib import Path
+
+import subprocess
+import pytest
+
+
+class FakeBug(Bug):
+    def checkout(self, path: str, fixed: bool = False) -> bool:
+        return True
+
+    def compile(self, path: str):
+        return None
+
+    def test(self, path: str):
+        return None
+
+
+class FakeBenchmark(Benchmark):
+    def __init__(self):
+        super().__init__("fake", Path("/nonexistent/fake"))
+
+    def initialize(self) -> None:
+        pass
+
+
+class Counter:
+    def __init__(self, value):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+class TestAssetStore:
+    def test_store_and_load(self, tmp_path):
+        store = AssetStore(tmp_path)
+        bug = FakeBug(FakeBenchmark(), "fake-1", "diff")
+        compute = Counter(["buggy", "fixed"])
+
+        assert store.get_or_compute(bug, "single_function", compute) == [
+            "buggy",
+            "fixed",
+        ]
+        assert store.get_or_compute(bug, "single_function", compute) == [
+            "buggy",
+            "fixed",
+        ]
+        assert compute.calls == 1
+
+        # Assets are keyed on the ground truth of the bug
+        store.get_or_compute(
+            FakeBug(bug.benchmark, "fake-1", "other diff"), "single_function", compute
+        )
+        assert compute.calls == 2
+
+    def test_store_empty(self, tmp_path):
+        store = AssetStore(tmp_path)
+        bug = FakeBug(FakeBenchmark(), "fake-1", "diff")
+        for value in [None, {}]:
+            compute = Counter(value)
+            assert store.get_or_compute(bug, f"asset-{value}", compute) == value
+            assert store.get_or_compute(bug, f"asset-{value}", compute) == value
+            assert compute.calls == 1
+
+    def test_compute_error(self, tmp_path):
+        store = AssetStore(tmp_path)
+        bug = FakeBug(FakeBenchmark(), "fake-1", "diff")
+
+        def fail():
+            raise RuntimeError("extractor failed")
+
+        with pytest.raises(RuntimeError):
+            store.get_or_compute(bug, "single_function", fail)
+        assert not store.get_asset_path(bug, "single_function").exists()
+
+    def test_version_bump(self, tmp_path, monkeypatch):
+        store = AssetStore(tmp_path)
+        bug = FakeBug(FakeBenchmark(), "fake-1", "diff")
+        compute = Counter("value")
+
+        store.get_or_compute(bug, "single_function", compute)
+        monkeypatch.setattr(assets, "ASSETS_VERSION", "bumped")
+        assets.get_extractor_version.cache_clear()
+        try:
+            store.get_or_compute(bug, "single_function", compute)
+        finally:
+            assets.get_extractor_version.cache_clear()
+        assert compute.calls == 2
+
+    def test_unreadable(self, tmp_path):
+        store = AssetStore(tmp_path)
+        bug = FakeBug(FakeBenchmark(), "fake-1", "diff")
+        compute = Counter("value")
+
+        store.get_or_compute(bug, "single_function", compute)
+        store.get_asset_path(bug, "single_function").write_text("{not json")
+
+        assert store.get_or_compute(bug, "single_function", compute) == "value"
+        assert compute.calls == 2
+        assert store.get_or_compute(bug, "single_function", compute) == "value"
+        assert compute.calls == 2
+
+    def test_extractor_failure(self, tmp_path, monkeypatch):
+        store = AssetStore(tmp_path)
+        bug = FakeBug(FakeBenchmark(), "fake-1", "diff")
+
+        class DeadServer:
+            def call_batch(self, requests):
+                raise EOFError("Java server exited")
+
+        # Neither the extractor server nor its fallback container can run
+        monkeypatch.setattr(java.JavaJarServer, "get_server", lambda jar: DeadServer())
+        monkeypatch.setattr(
+            java.subprocess,
+            "run",
+            lambda *args, **kwargs: subprocess.CompletedProcess(
+                args, 125, b"", b"Cannot connect to the Docker daemon"
+            ),
+        )
+
+        with pytest.raises(java.ExtractorError):
+            store.get_or_compute(
+                bug,
+                "failing_test_cases",
+                lambda: java.run_extractor([["-i", "/tmp/FooTest.java"]]),
+            )
+        assert not store.get_asset_path(bug, "failing_test_cases").exists()
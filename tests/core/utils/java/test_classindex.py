@@ -0,0 +1,36 @@
+from elleelleaime.core.utils.java.classindex import JavaClassIndex
+
+
+class TestJavaClassIndex:
+    def test_find(self, tmp_path):
+        test_dir = tmp_path / "src" / "test" / "java" / "org" / "foo"
+        test_dir.mkdir(parents=True)
+        (test_dir / "BarTest.java").write_text("class BarTest {}")
+        (tmp_path / ".git").mkdir()
+        (tmp_path / ".git" / "BazTest.java").write_text("class BazTest {}")
+
+        index = JavaClassIndex(tmp_path)
+
+        assert index.find("org.foo.BarTest") == test_dir / "BarTest.java"
+        assert index.find("foo.BarTest") == test_dir / "BarTest.java"
+        assert index.find("org.foo.BazTest") is None
+        assert index.find("BazTest") is None
+        assert index.find("rg.foo.BarTest") is None
+
+    def test_find_ambiguous(self, tmp_path):
+        for module in ["b", "a"]:
+            test_dir = tmp_path / module / "src" / "test" / "java" / "org"
+            test_dir.mkdir(parents=True)
+            (test_dir / "FooTest.java").write_text("class FooTest {}")
+        main_dir = tmp_path / "org"
+        main_dir.mkdir()
+        (main_dir / "FooTest.java").write_text("class FooTest {}")
+
+        index = JavaClassIndex(tmp_path)
+
+        # Files under a test directory are preferred, then ties are broken by path
+        assert len(index.get_candidates("org.FooTest")) == 3
+        assert (
+            index.find("org.FooTest")
+            == tmp_path / "a" / "src" / "test" / "java" / "org" / "FooTest.java"
+        )
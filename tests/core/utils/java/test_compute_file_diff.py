@@ -0,0 +1,60 @@
+from elleelleaime.core.benchmarks.benchmark import Benchmark
+from elleelleaime.core.utils.java.java import compute_file_diff
+
+import shutil
+import subprocess
+import pytest
+
+SOURCE = "".join(f"line {i}\n" for i in range(1, 21))
+
+
+@pytest.mark.skipif(shutil.which("diff") is None, reason="Requires diff")
+class TestComputeFileDiff:
+    def gnu_diff(self, tmp_path, source: str, target: str) -> str:
+        (tmp_path / "source.java").write_text(source)
+        (tmp_path / "target.java").write_text(target)
+        run = subprocess.run(
+            [
+                "diff",
+                "--unified",
+                "--label",
+                "a/Foo.java",
+                "--label",
+                "b/Foo.java",
+                str(tmp_path / "source.java"),
+                str(tmp_path / "target.java"),
+            ],
+            capture_output=True,
+        )
+        return run.stdout.decode("utf-8")
+
+    @pytest.mark.parametrize(
+        "source,target",
+        [
+            # Single hunk
+            (SOURCE, SOURCE.replace("line 10\n", "line ten\n")),
+            # Several hunks, with additions and removals
+            (
+                SOURCE,
+                SOURCE.replace("line 2\n", "line two\n")
+                .replace("line 10\n", "")
+                .replace("line 18\n", "line 18\nline 18.5\n"),
+            ),
+            # Missing trailing newline on the source, the target or both
+            ("a\nb\nc", "a\nb\nd\n"),
+            ("a\nb\nc\n", "a\nb\nd"),
+            ("a\nb\nc", "a\nb\nd"),
+            ("a\nb\nc", "a\nb\nc\n"),
+            # Empty files
+            ("", "a\n"),
+            ("a\n", ""),
+        ],
+    )
+    def test_same_as_gnu_diff(self, tmp_path, source, target):
+        assert compute_file_diff(
+            source, target, "a/Foo.java", "b/Foo.java"
+        ) == self.gnu_diff(tmp_path, source, target)
+
+    def test_identical_files(self, tmp_path):
+        assert compute_file_diff(SOURCE, SOURCE, "a/Foo.java", "b/Foo.java") == ""
+        assert self.gnu_diff(tmp_path, SOURCE, SOURCE) == ""
@@ -0,0 +1,121 @@
+from elleelleaime.core.benchmarks.benchmark import Benchmark
+from elleelleaime.core.utils.java import java
+from elleelleaime.core.utils.java.server import JavaJarServer
+
+import sys
+import subprocess
+import pytest
+
+# Speaks the protocol of JarServer.java: it echoes the arguments of each request, exits with the status
+# given by "exit <status>", and dies on requests with "--die"
+STUB_SERVER = """
+import sys
+for line in sys.stdin.buffer:
+    args = line.decode("utf-8").rstrip("\\n").split("\\t")
+    if "--die" in args:
+        sys.exit(1)
+    status = int(args[1]) if args[0] == "exit" else 0
+    payload = " ".join(args).encode("utf-8")
+    sys.stdout.buffer.write(f"{status} {len(payload)}\\n".encode("utf-8") + payload)
+    sys.stdout.buffer.flush()
+"""
+
+
+class StubServer(JavaJarServer):
+    def __init__(self):
+        super().__init__("stub.jar")
+        self.starts = 0
+
+    def start(self) -> None:
+        self.starts += 1
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", STUB_SERVER],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+
+    def kill(self) -> None:
+        # There is no container to kill
+        if self.process is not None:
+            self.process.kill()
+            self.process.wait()
+            self.process = None
+
+
+@pytest.fixture
+def server():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+class TestJavaJarServer:
+    def test_call_batch(self, server):
+        requests = [["-i", f"/tmp/Foo{i}.java"] for i in range(50)]
+        requests[3] = ["exit", "2"]
+
+        responses = server.call_batch(requests)
+
+        # The responses are in the order of the requests
+        assert len(responses) == 50
+        assert responses[3] == (2, "exit 2")
+        assert [output for _, output in responses] == [
+            " ".join(args) for args in requests
+        ]
+        assert server.call(["-i", "Bar.java"]) == (0, "-i Bar.java")
+        assert server.starts == 1
+
+    def test_call_batch_server_dies(self, server):
+        with pytest.raises(EOFError):
+            server.call_batch([["a"], ["--die"], ["b"]])
+
+        # A new server is started for the next batch
+        assert server.call_batch([["a"], ["b"]]) == [(0, "a"), (0, "b")]
+        assert server.starts == 2
+
+    def test_run_extractor(self, server, monkeypatch):
+        monkeypatch.setattr(java.JavaJarServer, "get_server", lambda jar: server)
+
+        outputs = java.run_extractor(
+            [["-i", "/tmp/Foo.java"], ["exit", "1"], ["-i", "/tmp/Bar.java"]]
+        )
+
+        # Requests on which the extractor fails get None
+        assert outputs == ["-i /tmp/Foo.java", None, "-i /tmp/Bar.java"]
+
+    def test_run_extractor_fallback(self, server, monkeypatch):
+        monkeypatch.setattr(java.JavaJarServer, "get_server", lambda jar: server)
+        commands = []
+
+        def docker_run(command, **kwargs):
+            commands.append(command)
+            output = command.split("extractor.jar ")[1]
+            return subprocess.CompletedProcess(command, 0, output.encode("utf-8"), b"")
+
+        monkeypatch.setattr(java.subprocess, "run", docker_run)
+
+        # The server dies in the middle of the batch, so every request is run in its own container
+        requests = [
+            ["-i", "/tmp/Foo.java"],
+            ["-i", "/tmp/Bar.java", "--die"],
+            ["-i", "/tmp/Baz.java"],
+        ]
+        outputs = java.run_extractor(requests)
+
+        assert outputs == [" ".join(args) for args in requests]
+        assert len(commands) == 3
+        assert all(command.startswith("docker run") for command in commands)
+
+    def test_run_extractor_fallback_fails(self, server, monkeypatch):
+        monkeypatch.setattr(java.JavaJarServer, "get_server", lambda jar: server)
+        monkeypatch.setattr(
+            java.subprocess,
+            "run",
+            lambda command, **kwargs: subprocess.CompletedProcess(
+                command, 125, b"", b"Cannot connect to the Docker daemon"
+            ),
+        )
+
+        # Containers that cannot run are errors, not requests that the extractor failed on
+        with pytest.raises(java.ExtractorError):
+            java.run_extractor([["-i", "/tmp/Foo.java", "--die"]])
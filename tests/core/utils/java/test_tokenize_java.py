@@ -0,0 +1,43 @@
+from elleelleaime.core.benchmarks.benchmark import Benchmark
+from elleelleaime.core.utils.java.java import tokenize_java
+
+
+class TestTokenizeJava:
+    def test_ignores_whitespace_and_comments(self):
+        code = """public int f(int x) { // comment
+            /* multi
+               line */
+            return x >>> 2 + 1e-5 + 'a' + "s\\"t";
+        }"""
+        compact = """public int f(int x){return x>>>2+1e-5+'a'+"s\\"t";}"""
+
+        assert tokenize_java(code) == tokenize_java(compact)
+        assert tokenize_java(compact) == [
+            "public",
+            "int",
+            "f",
+            "(",
+            "int",
+            "x",
+            ")",
+            "{",
+            "return",
+            "x",
+            ">>>",
+            "2",
+            "+",
+            "1e-5",
+            "+",
+            "'a'",
+            "+",
+            '"s\\"t"',
+            ";",
+            "}",
+        ]
+
+    def test_keeps_literals(self):
+        assert tokenize_java('String s = "a  b";') != tokenize_java('String s = "a b";')
+        assert tokenize_java("int x = 1;") != tokenize_java("int x = 2;")
+
+    def test_untokenizable(self):
+        assert tokenize_java('String s = "unterminated;') is None
@@ -0,0 +1,20 @@
+from elleelleaime.core.utils.files import normalize_line_endings
+
+
+class TestNormalizeLineEndings:
+    def test_normalize_line_endings(self, tmp_path):
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "Foo.java").write_bytes(b"class Foo {\r\n}\r\n")
+        (tmp_path / "src" / "Bar.java").write_bytes(b"\xef\xbb\xbfclass Bar {\n}\n")
+        (tmp_path / "src" / "Baz.java").write_bytes(b"class Baz {\n}\n")
+        (tmp_path / "lib.jar").write_bytes(b"PK\x03\x04\x00\r\n")
+
+        assert normalize_line_endings(str(tmp_path)) == 2
+        assert (tmp_path / "src" / "Foo.java").read_bytes() == b"class Foo {\n}\n"
+        assert (tmp_path / "src" / "Bar.java").read_bytes() == b"class Bar {\n}\n"
+        assert (tmp_path / "src" / "Baz.java").read_bytes() == b"class Baz {\n}\n"
+        # Binary files are left untouched
+        assert (tmp_path / "lib.jar").read_bytes() == b"PK\x03\x04\x00\r\n"
+
+        # Normalized files are not rewritten again
+        assert normalize_line_endings(str(tmp_path)) == 0
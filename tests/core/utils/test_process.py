@@ -0,0 +1,59 @@
+from elleelleaime.core.utils import process
+
+import subprocess
+import shutil
+import sys
+import pytest
+
+
+class TestProcess:
+    def test_run(self):
+        with process.collect_stats() as stats:
+            run = process.run("echo out; echo err >&2", shell=True, capture_output=True)
+
+        assert run.returncode == 0
+        assert run.stdout == b"out\n"
+        assert run.stderr == b"err\n"
+        assert len(stats) == 1
+        assert stats[0]["returncode"] == 0
+        assert stats[0]["max_rss"] > 0
+        assert stats[0]["timed_out"] == False
+
+    def test_run_timeout(self):
+        with process.collect_stats() as stats:
+            with pytest.raises(subprocess.TimeoutExpired):
+                process.run("sleep 10", shell=True, timeout=0.5)
+
+        assert len(stats) == 1
+        assert stats[0]["timed_out"] == True
+        assert stats[0]["wall_time"] < 10
+
+    def test_run_timeout_descendants(self):
+        # The shell's children keep the output pipes open, so they must be killed too
+        with process.collect_stats() as stats:
+            with pytest.raises(subprocess.TimeoutExpired):
+                process.run(
+                    "sleep 10; echo out", shell=True, capture_output=True, timeout=0.5
+                )
+
+        assert stats[0]["timed_out"] == True
+        assert stats[0]["wall_time"] < 5
+
+    def test_run_check(self):
+        with pytest.raises(subprocess.CalledProcessError):
+            process.run("exit 3", shell=True, check=True)
+
+    @pytest.mark.skipif(
+        process.get_systemd_run() is None and shutil.which("prlimit") is None,
+        reason="Memory limits require systemd-run or prlimit",
+    )
+    def test_run_memory_limit(self):
+        command = f"{sys.executable} -c 'x = bytearray(1 << 30)'"
+        process.set_limits(memory="256M")
+        try:
+            limited_run = process.run(command, shell=True, limited=True)
+        finally:
+            process.set_limits()
+
+        assert limited_run.returncode != 0
+        assert process.run(command, shell=True, limited=True).returncode == 0
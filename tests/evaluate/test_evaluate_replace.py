@@ -2,6 +2,7 @@ from evaluate_patches import evaluate_candidate
 from generate_samples import generate_sample
 from elleelleaime.core.utils.benchmarks import get_benchmark
 from elleelleaime.core.benchmarks.benchmark import Benchmark
+from elleelleaime.core.caching.workspaces import WorkspacePool
 
 import pytest
 import os
@@ -244,6 +245,45 @@ class TestEvaluatePatchesReplaceDefects4J:
         assert sample["evaluation"][0]["exact_match"] == False
         assert sample["evaluation"][0]["ast_match"] == False
 
+    def test_patches_in_warm_workspace(self):
+        # Both candidates are evaluated in the same workspace, only the buggy file is restored in between
+        for get_sample, plausible in [
+            (TestEvaluatePatchesReplaceDefects4J.get_incorrect_sample, False),
+            (TestEvaluatePatchesReplaceDefects4J.get_plausible_sample, True),
+        ]:
+            bug, sample = get_sample()
+
+            sample = evaluate_candidate(
+                bug=bug,
+                sample=sample,
+                **self.EVALUATION_KWARGS,
+                reuse_workspaces=True,
+            )
+
+            assert sample["evaluation"] is not None
+            assert len(sample["evaluation"]) == 1
+            assert sample["evaluation"][0]["test"] == plausible
+
+        WorkspacePool.clear_pools()
+
+    def test_plausible_patch_from_snapshot(self):
+        bug, sample = TestEvaluatePatchesReplaceDefects4J.get_plausible_sample()
+
+        sample = evaluate_candidate(
+            bug=bug,
+            sample=sample,
+            **self.EVALUATION_KWARGS,
+            use_snapshots=True,
+        )
+
+        assert sample["evaluation"] is not None
+        assert len(sample["evaluation"]) == 1
+
+        assert sample["evaluation"][0]["compile"] == True
+        assert sample["evaluation"][0]["test"] == True
+        assert sample["evaluation"][0]["exact_match"] == False
+        assert sample["evaluation"][0]["ast_match"] == False
+
 
 @pytest.mark.skipif(
     os.environ.get("CI") is not None,
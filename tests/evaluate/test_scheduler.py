@@ -0,0 +1,65 @@
+from elleelleaime.core.benchmarks.benchmark import Benchmark
+from elleelleaime.core.benchmarks.bug import Bug
+from elleelleaime.evaluate.scheduler import schedule, predict_makespan
+
+from pathlib import Path
+
+
+class FakeBug(Bug):
+    def checkout(self, path: str, fixed: bool = False) -> bool:
+        return True
+
+    def compile(self, path: str):
+        return None
+
+    def test(self, path: str):
+        return None
+
+
+class FakeBenchmark(Benchmark):
+    def __init__(self, baselines: dict):
+        super().__init__("fake", Path("/nonexistent/fake"))
+        self.baselines = baselines
+
+    def initialize(self) -> None:
+        for identifier in self.baselines:
+            self.add_bug(FakeBug(self, identifier, ""))
+
+    def get_baseline(self, bug: Bug) -> dict:
+        return self.baselines[bug.get_identifier()]
+
+
+class TestScheduler:
+    def test_schedule(self):
+        benchmark = FakeBenchmark(
+            {
+                "short": {"compile": 1.0, "test": 9.0},
+                "long": {"compile": 10.0, "test": 90.0},
+            }
+        )
+        benchmark.initialize()
+        samples = [
+            {"identifier": "short", "generation": ["a", "b"]},
+            {"identifier": "short", "generation": ["c", None]},
+            {"identifier": "long", "generation": ["d"]},
+        ]
+
+        tasks = schedule(benchmark, samples, n_workers=1)
+
+        # The samples of each bug are grouped, longest first
+        assert [task.bug.get_identifier() for task in tasks] == ["long", "short"]
+        assert [task.expected_duration for task in tasks] == [100.0, 30.0]
+        assert len(tasks[1].samples) == 2
+        assert predict_makespan(tasks, n_workers=1) == 130.0
+        assert predict_makespan(tasks, n_workers=2) == 100.0
+
+    def test_schedule_splits_long_bugs(self):
+        benchmark = FakeBenchmark({"long": {"compile": 10.0, "test": 90.0}})
+        benchmark.initialize()
+        samples = [{"identifier": "long", "generation": ["a"]} for _ in range(4)]
+
+        tasks = schedule(benchmark, samples, n_workers=2)
+
+        assert len(tasks) == 2
+        assert all(len(task.samples) == 2 for task in tasks)
+        assert predict_makespan(tasks, n_workers=2) == 200.0
@@ -0,0 +1,70 @@
+from elleelleaime.export.cost.cost_calculator import CostCalculator
+
+import pytest
+
+
+class TestCosts:
+    def test_anthropic_cached_tokens(self):
+        samples = [
+            {
+                "identifier": "Chart-1",
+                "generation": [
+                    {
+                        "usage": {
+                            "input_tokens": 10,
+                            "output_tokens": 1000,
+                            "cache_creation_input_tokens": 2000,
+                            "cache_read_input_tokens": 0,
+                        }
+                    },
+                    {
+                        "usage": {
+                            "input_tokens": 10,
+                            "output_tokens": 1000,
+                            "cache_creation_input_tokens": 0,
+                            "cache_read_input_tokens": 2000,
+                        }
+                    },
+                    # Responses from before prompt caching have no cache token counts
+                    {"usage": {"input_tokens": 2010, "output_tokens": 1000}},
+                ],
+            }
+        ]
+
+        costs = CostCalculator.compute_costs(
+            samples, "anthropic", "claude-3-5-sonnet-20241022"
+        )
+
+        assert costs["prompt_cost"] == pytest.approx(
+            (3 * 10 + 3.75 * 2000 + 3 * 10 + 0.30 * 2000 + 3 * 2010) / 1e6
+        )
+        assert costs["completion_cost"] == pytest.approx(15 * 3000 / 1e6)
+
+    def test_openai_cached_tokens(self):
+        samples = [
+            {
+                "identifier": "Chart-1",
+                "generation": {
+                    "usage": {
+                        "prompt_tokens": 2000,
+                        "completion_tokens": 100,
+                        "prompt_tokens_details": {"cached_tokens": 1024},
+                    }
+                },
+            },
+            {
+                "identifier": "Chart-2",
+                "generation": {
+                    "usage": {"prompt_tokens": 2000, "completion_tokens": 100}
+                },
+            },
+        ]
+
+        costs = CostCalculator.compute_costs(
+            samples, "openai-chatcompletion", "gpt-4o-2024-11-20"
+        )
+
+        assert costs["prompt_cost"] == pytest.approx(
+            (2.5 * 976 + 1.25 * 1024 + 2.5 * 2000) / 1e6
+        )
+        assert costs["completion_cost"] == pytest.approx(10 * 200 / 1e6)
@@ -0,0 +1,49 @@
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+
+from typing import Any
+
+import asyncio
+
+
+class FakeAsyncModels(AsyncPatchGenerationStrategy):
+    def __init__(self, api: str, **kwargs) -> None:
+        super().__init__(api, **kwargs)
+        self.pending = 0
+        self.max_pending = 0
+
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        if prompt == "failing":
+            raise RuntimeError("Prompt is too long")
+        async with self.governor.request():
+            self.pending += 1
+            self.max_pending = max(self.max_pending, self.pending)
+            await asyncio.sleep(0.01)
+            self.pending -= 1
+        return prompt.upper()
+
+
+class TestAsyncPatchGenerationStrategy:
+    def test_generate_keeps_order(self):
+        strategy = FakeAsyncModels("fake-order", max_in_flight=3)
+        prompts = [f"prompt {i}" for i in range(20)]
+
+        assert strategy.generate(prompts) == [prompt.upper() for prompt in prompts]
+        assert strategy.max_pending == 3
+
+    def test_generate_twice(self):
+        strategy = FakeAsyncModels("fake-twice")
+
+        assert strategy.generate(["a"]) == ["A"]
+        assert strategy.generate(["b", "c"]) == ["B", "C"]
+
+    def test_generate_failing_prompt(self):
+        strategy = FakeAsyncModels("fake-failing")
+        prompts = [f"prompt {i}" for i in range(40)]
+        prompts[5] = "failing"
+
+        # The other prompts are generated, and the failed one gets a None result
+        results = strategy.generate(prompts)
+        assert results[5] is None
+        assert results[:5] + results[6:] == [
+            prompt.upper() for prompt in prompts[:5] + prompts[6:]
+        ]
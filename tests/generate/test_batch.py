@@ -0,0 +1,227 @@
+from elleelleaime.generate.strategies.batch import (
+    BatchClient,
+    OpenAIBatchClient,
+    AnthropicBatchClient,
+)
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+import re
+import json
+import threading
+import pytest
+
+
+class MockBatchHandler(BaseHTTPRequestHandler):
+    """
+    Mock of the OpenAI and Anthropic batch endpoints, which answers each request with its prompt in upper case.
+    Each batch is reported as in progress the first time it is polled.
+    """
+
+    files: Dict[str, bytes] = {}
+    batches: Dict[str, dict] = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body: Any, raw: bool = False):
+        data = body if raw else json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _answer(self, custom_id: str, params: dict) -> str:
+        return params["messages"][0]["content"].upper()
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/v1/files":
+            lines = re.findall(rb'^\{"custom_id".*$', body, flags=re.MULTILINE)
+            file_id = f"file-{len(self.files)}"
+            self.files[file_id] = b"\n".join(line.rstrip(b"\r") for line in lines)
+            self._send({"id": file_id})
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            batch_id = f"batch-{len(self.batches)}"
+            output = []
+            for line in self.files[request["input_file_id"]].splitlines():
+                entry = json.loads(line)
+                content = self._answer(entry["custom_id"], entry["body"])
+                output.append(
+                    {
+                        "custom_id": entry["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "body": {"choices": [{"message": {"content": content}}]},
+                        },
+                    }
+                )
+            self.files[f"output-{batch_id}"] = "\n".join(
+                json.dumps(x) for x in output
+            ).encode("utf-8")
+            self.batches[batch_id] = {"id": batch_id, "polls": 0}
+            self._send({"id": batch_id, "status": "validating"})
+        elif self.path == "/v1/messages/batches":
+            assert self.headers["x-api-key"] == "key"
+            request = json.loads(body)
+            batch_id = f"msgbatch-{len(self.batches)}"
+            output = [
+                {
+                    "custom_id": r["custom_id"],
+                    "result": {
+                        "type": "succeeded",
+                        "message": {
+                            "content": [
+                                {
+                                    "type": "text",
+                                    "text": self._answer(r["custom_id"], r["params"]),
+                                }
+                            ]
+                        },
+                    },
+                }
+                for r in request["requests"]
+            ]
+            self.files[f"output-{batch_id}"] = "\n".join(
+                json.dumps(x) for x in output
+            ).encode("utf-8")
+            self.batches[batch_id] = {"id": batch_id, "polls": 0}
+            self._send({"id": batch_id, "processing_status": "in_progress"})
+
+    def do_GET(self):
+        base = f"http://{self.headers['Host']}"
+        if m := re.fullmatch(r"/v1/batches/(.+)", self.path):
+            batch = self.batches[m.group(1)]
+            batch["polls"] += 1
+            done = batch["polls"] > 1
+            self._send(
+                {
+                    "id": batch["id"],
+                    "status": "completed" if done else "in_progress",
+                    "output_file_id": f"output-{batch['id']}" if done else None,
+                }
+            )
+        elif m := re.fullmatch(r"/v1/files/(.+)/content", self.path):
+            self._send(self.files[m.group(1)], raw=True)
+        elif m := re.fullmatch(r"/v1/messages/batches/([^/]+)", self.path):
+            batch = self.batches[m.group(1)]
+            batch["polls"] += 1
+            self._send(
+                {
+                    "id": batch["id"],
+                    "processing_status": (
+                        "ended" if batch["polls"] > 1 else "in_progress"
+                    ),
+                    "results_url": f"{base}/v1/messages/batches/{batch['id']}/results",
+                }
+            )
+        elif m := re.fullmatch(r"/v1/messages/batches/([^/]+)/results", self.path):
+            self._send(self.files[f"output-{m.group(1)}"], raw=True)
+
+
+@pytest.fixture
+def server():
+    MockBatchHandler.files = {}
+    MockBatchHandler.batches = {}
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockBatchHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def request(prompt: str) -> dict:
+    return {"model": "m", "messages": [{"role": "user", "content": prompt}]}
+
+
+class TestBatchClients:
+    def test_openai(self, server):
+        client = OpenAIBatchClient("key", f"{server}/v1", poll_interval=0.01)
+        client.MAX_REQUESTS = 2
+
+        results = client.run({f"0-{i}": request(f"prompt {i}") for i in range(3)})
+
+        # The requests are split into two batches
+        assert len(MockBatchHandler.batches) == 2
+        assert {
+            custom_id: result["choices"][0]["message"]["content"]
+            for custom_id, result in results.items()
+        } == {"0-0": "PROMPT 0", "0-1": "PROMPT 1", "0-2": "PROMPT 2"}
+
+    def test_anthropic(self, server):
+        client = AnthropicBatchClient("key", server, poll_interval=0.01)
+
+        results = client.run({"0-0": request("a"), "1-0": request("b")})
+
+        assert {
+            custom_id: result["content"][0]["text"]
+            for custom_id, result in results.items()
+        } == {"0-0": "A", "1-0": "B"}
+
+
+class FakeBatchModels(AsyncPatchGenerationStrategy):
+    def __init__(self, base_url: str, **kwargs) -> None:
+        super().__init__("fake-batch", **kwargs)
+        self.base_url = base_url
+
+    def _create_batch_client(self) -> BatchClient:
+        return AnthropicBatchClient("key", self.base_url, poll_interval=0.01)
+
+    def _get_requests(self, prompt: str) -> List[dict]:
+        return [request(prompt), request(prompt)]
+
+    def _get_generation(self, responses: List[Optional[dict]]) -> Any:
+        return [response["content"][0]["text"] for response in responses]
+
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        raise AssertionError("Batch generation must not send online requests")
+
+
+class TestBatchGeneration:
+    def test_generate_batch(self, server, tmp_path):
+        strategy = FakeBatchModels(
+            server, batch=True, response_cache_path=tmp_path / "responses"
+        )
+
+        assert strategy.generate(["a", "b"]) == [["A", "A"], ["B", "B"]]
+        assert len(MockBatchHandler.batches) == 1
+
+        # Cached responses are not submitted again
+        assert strategy.generate(["b", "c"]) == [["B", "B"], ["C", "C"]]
+        assert len(MockBatchHandler.batches) == 2
+        assert strategy.generate(["a", "c"]) == [["A", "A"], ["C", "C"]]
+        assert len(MockBatchHandler.batches) == 2
+
+    def test_resume_batch(self, server, tmp_path, monkeypatch):
+        cache_path = tmp_path / "responses"
+        strategy = FakeBatchModels(server, batch=True, response_cache_path=cache_path)
+
+        # The run is interrupted while waiting for the batch
+        def interrupt(self, batch_id):
+            raise KeyboardInterrupt()
+
+        with monkeypatch.context() as m:
+            m.setattr(AnthropicBatchClient, "wait", interrupt)
+            with pytest.raises(KeyboardInterrupt):
+                strategy.generate(["a", "b"])
+        assert len(MockBatchHandler.batches) == 1
+        assert len(list((cache_path / "fake-batch" / "batches").iterdir())) == 1
+
+        # The rerun waits for the submitted batch instead of submitting the requests again
+        assert strategy.generate(["b", "c"]) == [["B", "B"], ["C", "C"]]
+        assert len(MockBatchHandler.batches) == 2
+        assert strategy.generate(["a", "b", "c"]) == [
+            ["A", "A"],
+            ["B", "B"],
+            ["C", "C"],
+        ]
+        assert len(MockBatchHandler.batches) == 2
+        assert list((cache_path / "fake-batch" / "batches").iterdir()) == []
+
+    def test_batch_not_supported(self):
+        from tests.generate.test_async_strategy import FakeAsyncModels
+
+        with pytest.raises(ValueError):
+            FakeAsyncModels("fake-no-batch", batch=True)
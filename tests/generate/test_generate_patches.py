@@ -0,0 +1,149 @@
+from generate_patches import entry_point
+from elleelleaime.core.utils.jsonl import stream_jsonl, write_jsonl
+from elleelleaime.generate.strategies.registry import PatchGenerationStrategyRegistry
+from elleelleaime.generate.strategies.strategy import AsyncPatchGenerationStrategy
+
+from typing import Any
+
+import generate_patches
+import pytest
+
+
+class FlakyModels(AsyncPatchGenerationStrategy):
+    """
+    Fake backend that fails on the prompts in `failing`.
+    """
+
+    failing: set = set()
+    calls: list = []
+
+    def __init__(self, model_name: str, **kwargs) -> None:
+        super().__init__("flaky", **kwargs)
+
+    async def _request(self, prompt: str) -> Any:
+        async with self.governor.request():
+            FlakyModels.calls.append(prompt)
+            if prompt in FlakyModels.failing:
+                raise RuntimeError(f"Failed on {prompt}")
+        return prompt.upper()
+
+    async def _agenerate_prompt(self, prompt: str) -> Any:
+        return await self._request_with_cache(
+            {"prompt": prompt}, 0, lambda: self._request(prompt)
+        )
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    FlakyModels.failing = set()
+    FlakyModels.calls = []
+    monkeypatch.setattr(
+        PatchGenerationStrategyRegistry,
+        "get_generation_class",
+        classmethod(lambda cls, name: FlakyModels),
+    )
+    monkeypatch.setattr(
+        PatchGenerationStrategyRegistry,
+        "get_generation",
+        classmethod(lambda cls, name, **kwargs: FlakyModels(**kwargs)),
+    )
+    return FlakyModels
+
+
+class TestGeneratePatches:
+    def test_resume(self, tmp_path, flaky):
+        samples = [
+            {"identifier": f"Bug-{i}", "prompt": f"prompt {i}" if i != 2 else None}
+            for i in range(5)
+        ]
+        samples_path = tmp_path / "samples_fake_instruct_.jsonl"
+        write_jsonl(str(samples_path), samples)
+        output_path = tmp_path / "candidates_fake_instruct_flaky_model_name=m.jsonl"
+
+        # A failed prompt does not stop the others
+        flaky.failing = {"prompt 3"}
+        entry_point(
+            str(samples_path),
+            "flaky",
+            model_name="m",
+            max_in_flight=1,
+            use_response_cache=False,
+        )
+        generated = {s["identifier"]: s for s in stream_jsonl(str(output_path))}
+        assert generated["Bug-3"]["generation"] is None
+        assert generated["Bug-4"]["generation"] == "PROMPT 4"
+        assert generated["Bug-0"]["generation"] == "PROMPT 0"
+        assert generated["Bug-2"]["generation"] is None
+
+        # A truncated line left by a crash is dropped
+        with open(output_path, "a") as f:
+            f.write('{"identifier": "Bug-4", "gen')
+
+        # Resuming only generates the failed samples, and writes them in order
+        flaky.failing = set()
+        flaky.calls = []
+        entry_point(
+            str(samples_path),
+            "flaky",
+            model_name="m",
+            resume=True,
+            use_response_cache=False,
+        )
+        assert flaky.calls == ["prompt 3"]
+        assert [s["identifier"] for s in stream_jsonl(str(output_path))] == [
+            s["identifier"] for s in samples
+        ]
+        assert [s["generation"] for s in stream_jsonl(str(output_path))] == [
+            "PROMPT 0",
+            "PROMPT 1",
+            None,
+            "PROMPT 3",
+            "PROMPT 4",
+        ]
+
+    def test_response_cache(self, tmp_path, flaky):
+        samples = [
+            {"identifier": f"Bug-{i}", "prompt": f"prompt {i}"} for i in range(3)
+        ]
+        samples_path = tmp_path / "samples_fake_instruct_.jsonl"
+        write_jsonl(str(samples_path), samples)
+        output_path = tmp_path / "candidates_fake_instruct_flaky_model_name=m.jsonl"
+        cache_path = str(tmp_path / "responses")
+
+        entry_point(
+            str(samples_path), "flaky", model_name="m", response_cache_path=cache_path
+        )
+        assert len(flaky.calls) == 3
+
+        # An identical rerun is served from the cache
+        flaky.calls = []
+        entry_point(
+            str(samples_path), "flaky", model_name="m", response_cache_path=cache_path
+        )
+        assert flaky.calls == []
+        assert [s["generation"] for s in stream_jsonl(str(output_path))] == [
+            "PROMPT 0",
+            "PROMPT 1",
+            "PROMPT 2",
+        ]
+
+    def test_partial_run(self, tmp_path, flaky, monkeypatch):
+        samples = [
+            {"identifier": f"Bug-{i}", "prompt": f"prompt {i}"} for i in range(3)
+        ]
+        samples_path = tmp_path / "samples_fake_instruct_.jsonl"
+        write_jsonl(str(samples_path), samples)
+        output_path = tmp_path / "candidates_fake_instruct_flaky_model_name=m.jsonl"
+
+        def crash(chunk, strategy_name, on_sample, **kwargs):
+            on_sample({**chunk[0], "generation": "done"})
+            raise RuntimeError("Worker crashed")
+
+        monkeypatch.setattr(generate_patches, "generate_candidate", crash)
+
+        # A partial run fails, after checkpointing the samples generated before the crash
+        with pytest.raises(RuntimeError):
+            entry_point(
+                str(samples_path), "flaky", model_name="m", use_response_cache=False
+            )
+        assert [s["identifier"] for s in stream_jsonl(str(output_path))] == ["Bug-0"]
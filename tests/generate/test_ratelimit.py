@@ -0,0 +1,101 @@
+from elleelleaime.generate.strategies.ratelimit import (
+    RateGovernor,
+    RequestOutcome,
+    TokenBucket,
+    parse_duration,
+)
+
+import time
+import asyncio
+import pytest
+
+
+class RateLimitError(Exception):
+    def __init__(self, headers: dict):
+        super().__init__("429")
+        self.status_code = 429
+        self.headers = headers
+
+    @property
+    def response(self):
+        return self
+
+
+class TestParseDuration:
+    def test_parse_duration(self):
+        assert parse_duration("1.5") == 1.5
+        assert parse_duration("6m0s") == 360
+        assert parse_duration("20ms") == pytest.approx(0.02)
+        assert parse_duration("1h2m3s") == 3723
+        assert parse_duration("2000-01-01T00:00:00Z") == 0
+        assert parse_duration("soon") is None
+
+
+class TestRateGovernor:
+    def test_rate_limited_halves_concurrency_and_pauses(self):
+        governor = RateGovernor(max_concurrency=8)
+
+        async def run():
+            with pytest.raises(RateLimitError):
+                async with governor.request():
+                    raise RateLimitError({"retry-after-ms": "200"})
+
+        asyncio.run(run())
+        assert governor.concurrency == 4
+        assert governor.paused_until > time.monotonic()
+
+        # Successful requests wait for the pause, then grow the concurrency back
+        start = time.monotonic()
+        asyncio.run(governor.acquire())
+        assert time.monotonic() - start >= 0.1
+        governor.release(RequestOutcome())
+        assert governor.concurrency == 4.25
+
+    def test_learns_limits_from_headers(self):
+        governor = RateGovernor(max_concurrency=8)
+
+        async def run():
+            async with governor.request() as request:
+                request.update(
+                    {
+                        "x-ratelimit-limit-requests": "600",
+                        "x-ratelimit-remaining-requests": "0",
+                        "x-ratelimit-reset-requests": "150ms",
+                        "x-ratelimit-limit-tokens": "60000",
+                        "x-ratelimit-remaining-tokens": "59000",
+                    }
+                )
+
+        asyncio.run(run())
+        assert governor.buckets["requests"].rate == pytest.approx(600 * 0.95 / 60)
+        assert governor.buckets["tokens"].rate == pytest.approx(60000 * 0.95 / 60)
+        # The exhausted request limit pauses until it resets
+        assert 0 < governor.paused_until - time.monotonic() <= 0.15
+
+    def test_token_bucket_throttles(self):
+        # 60 requests per minute (about one per second), with a burst of about 6 requests
+        governor = RateGovernor(max_concurrency=100, requests_per_minute=60)
+
+        async def run(n: int):
+            for _ in range(n):
+                async with governor.request():
+                    pass
+
+        start = time.monotonic()
+        asyncio.run(run(5))
+        assert time.monotonic() - start < 0.5
+        asyncio.run(run(2))
+        assert time.monotonic() - start >= 0.5
+
+    def test_token_bucket_charges_large_requests(self):
+        # 600 tokens per minute, i.e. a rate of 9.5 tokens per second and a capacity of 57 tokens
+        bucket = TokenBucket(600)
+        now = bucket.updated
+
+        # A request larger than the capacity only waits for a full bucket, but is charged in full
+        assert bucket.get_wait(570) == 0
+        bucket.consume(570)
+        bucket.refill(now)
+        assert bucket.get_wait(570) == pytest.approx(60)
+        bucket.refill(now + 30)
+        assert bucket.get_wait(570) == pytest.approx(30)
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+import subprocess
+import pytest
+import json
+import sys
+
+# Modules that must only be imported once a backend that needs them is selected
+HEAVY_MODULES = [
+    "torch",
+    "transformers",
+    "peft",
+    "pandas",
+    "openai",
+    "anthropic",
+    "mistralai",
+    "google.generativeai",
+]
+
+# Maximum time (in seconds) to import an entry point
+IMPORT_TIME_BUDGET = 2.0
+
+
+def run_python(code: str) -> dict:
+    run = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        check=True,
+    )
+    return json.loads(run.stdout.decode("utf-8").splitlines()[-1])
+
+
+class TestStartup:
+    @pytest.mark.parametrize(
+        "entry_point",
+        [
+            "generate_samples",
+            "generate_patches",
+            "evaluate_patches",
+            "export_results",
+            "profile_baselines",
+            "profile_benchmarks",
+        ],
+    )
+    def test_entry_point_import(self, entry_point: str):
+        result = run_python(
+            f"""
+import json, sys, time
+start = time.perf_counter()
+import {entry_point}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+"""
+        )
+
+        loaded = [module for module in HEAVY_MODULES if module in result["modules"]]
+        assert loaded == [], f"{entry_point} eagerly imports {loaded}"
+        assert (
+            result["elapsed"] < IMPORT_TIME_BUDGET
+        ), f"Importing {entry_point} took {result['elapsed']:.2f}s"
+
+    def test_generation_registry_imports_only_selected_backend(self):
+        pytest.importorskip("openai")
+        result = run_python(
+            """
+import json, sys
+from elleelleaime.generate.strategies.registry import PatchGenerationStrategyRegistry
+PatchGenerationStrategyRegistry.get_generation_class("openai-chatcompletion")
+print(json.dumps({"modules": sorted(sys.modules)}))
+"""
+        )
+
+        assert "openai" in result["modules"]
+        loaded = [
+            module
+            for module in HEAVY_MODULES
+            if module != "openai" and module in result["modules"]
+        ]
+        assert loaded == [], f"Selecting openai-chatcompletion imports {loaded}"